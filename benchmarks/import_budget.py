@@ -0,0 +1,130 @@
+"""
+Import-time budget for the package's entry points.
+
+Runs a fresh interpreter with `python -X importtime`, sums the cumulative
+import time of the entry modules, and checks that no format library
+(PyMuPDF, python-docx, python-pptx, Pillow) is imported before a document
+of that format is actually opened. The exit status is 1 if the budget is
+exceeded or a format library is imported eagerly.
+
+Run from the project root:
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --budget-ms 150 --repeat 5
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+# Modules a CLI run or a worker cold start imports
+ENTRY_MODULES = (
+    "src.storage.file_storage",
+    "src.storage.sql_storage",
+    "src.pipeline.batch_extractor",
+    "src.pipeline.async_pipeline",
+    "src.pipeline.incremental",
+    "src.pipeline.worker_service",
+)
+
+# Format libraries that must only be imported when their format is first used
+HEAVY_MODULES = ("fitz", "pymupdf", "docx", "pptx", "PIL")
+
+# Import time allowed for all entry modules together, stdlib dependencies
+# included. Measured at 200-240 ms once format libraries were imported lazily
+# and the storage modules stopped ingesting a sample on import, down from
+# about 530 ms; the headroom absorbs slower machines and CI noise.
+IMPORT_BUDGET_MS = 350.0
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class ImportReport:
+    """
+    Import timings of one interpreter run.
+    """
+
+    total_ms: float = 0.0  # Import time of everything the entry modules pulled in
+    modules: Dict[str, float] = field(default_factory=dict)  # module -> cumulative ms, every import
+
+    @property
+    def heavy(self) -> List[str]:
+        """Format libraries that were imported."""
+        return [name for name in self.modules if name.split(".")[0] in HEAVY_MODULES]
+
+    def slowest(self, count: int = 10) -> List[tuple]:
+        """The count modules with the largest cumulative import time."""
+        return sorted(self.modules.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def _startup_modules() -> set:
+    """
+    Names of the modules a bare interpreter imports before running any code.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-c", "import sys; print(' '.join(sys.modules))"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    return set(completed.stdout.split())
+
+
+def measure_imports(modules: Sequence[str] = ENTRY_MODULES) -> ImportReport:
+    """
+    Imports modules in a fresh interpreter under -X importtime.
+
+    :param modules: Module names to import.
+    :return: An ImportReport for the run.
+    :raises RuntimeError: If the import fails.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {', '.join(modules)} failed:\n{completed.stderr}")
+
+    report = ImportReport()
+    startup = _startup_modules()
+    for line in completed.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        module = name.strip()
+        report.modules[module] = int(cumulative) / 1000
+        # Top level lines are either interpreter start-up (site, encodings, ...)
+        # or the -c statement; only count what the statement imported
+        if name == f" {module}" and module not in startup:
+            report.total_ms += int(cumulative) / 1000
+    return report
+
+
+def best_of(repeat: int, modules: Sequence[str] = ENTRY_MODULES) -> ImportReport:
+    """
+    Measures several times and keeps the fastest run, which is the least disturbed by noise.
+    """
+    return min((measure_imports(modules) for _ in range(repeat)), key=lambda report: report.total_ms)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the import-time budget of the package entry points.")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="Allowed cumulative import time")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs to take the fastest of")
+    args = parser.parse_args(argv)
+
+    report = best_of(args.repeat)
+    print(f"Entry modules imported in {report.total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    for module, cumulative_ms in report.slowest():
+        print(f"  {cumulative_ms:8.1f} ms  {module}")
+    if report.heavy:
+        print(f"Format libraries imported eagerly: {', '.join(report.heavy)}", file=sys.stderr)
+    if report.total_ms > args.budget_ms:
+        print(f"Import budget exceeded by {report.total_ms - args.budget_ms:.1f} ms", file=sys.stderr)
+    return 1 if report.heavy or report.total_ms > args.budget_ms else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Benchmark harness for the loaders, extractors, and storage backends.
+
+Generates synthetic documents of a configurable size, times each stage
+separately, and prints the results as JSON. Pass --baseline to compare
+against an earlier run; the exit status is 1 if any stage regressed.
+
+Run from the project root:
+    python -m benchmarks.run_benchmarks --pages 50 --images 20 --tables 10 --output bench.json
+    python -m benchmarks.run_benchmarks --baseline bench.json
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.synthetic import GENERATORS
+from src.extractors.data_extractor import DataExtractor
+from src.loaders.registry import registry
+from src.storage.file_storage import FileStorage
+from src.storage.sql_storage import SQLStorage
+from src.pipeline.image_pipeline import ImagePipeline
+
+
+EXTRACT_METHODS = ("extract_text", "extract_links", "extract_images", "extract_tables", "extract_all")
+
+
+def peak_alloc_kb(func: Callable[[], object]) -> int:
+    """
+    Measures the Python memory one call allocates at its peak.
+
+    Unlike the process's peak RSS, which only ever grows, this is the peak
+    above what was allocated before the call, so every stage gets its own
+    figure. Memory held by C libraries (MuPDF, lxml) is not traced.
+
+    :param func: The operation to measure.
+    :return: Peak traced allocation during the call, in KiB.
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        if started:
+            tracemalloc.stop()
+    return max(0, peak - baseline) // 1024
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Returns a nearest-rank percentile.
+
+    :param samples: Sorted timings.
+    :param pct: Percentile between 0 and 100.
+    :return: The sample at that percentile.
+    """
+    rank = max(1, math.ceil(pct / 100 * len(samples)))
+    return samples[rank - 1]
+
+
+def measure(func: Callable[[], object], repeat: int, items: int) -> Dict:
+    """
+    Times a callable several times and summarizes the latencies.
+
+    :param func: The operation to time.
+    :param repeat: Number of timed runs.
+    :param items: Units of work per run (pages or slides), used for throughput.
+    :return: Latency percentiles in milliseconds, throughput, and peak allocation.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    samples.sort()
+    mean = sum(samples) / len(samples)
+    return {
+        "runs": repeat,
+        "mean_ms": mean * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p90_ms": percentile(samples, 90) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": samples[-1] * 1000,
+        "pages_per_s": items / mean if mean else None,
+        "peak_alloc_kb": peak_alloc_kb(func),  # One extra untimed run, since tracing slows it down
+    }
+
+
+def bench_format(fmt: str, work_dir: str, pages: int, images: int, tables: int, repeat: int) -> Dict[str, Dict]:
+    """
+    Benchmarks loading, each extract method, both storage backends, and the image pipeline for one format.
+
+    :param fmt: "pdf", "docx", or "pptx".
+    :param work_dir: Scratch directory for the synthetic file and storage output.
+    :param pages: Pages (or slides) in the synthetic document.
+    :param images: Images in the synthetic document.
+    :param tables: Tables in the synthetic document.
+    :param repeat: Number of timed runs per stage.
+    :return: Measurements keyed by "<format>.<stage>".
+    """
+    path = os.path.join(work_dir, f"synthetic.{fmt}")
+    GENERATORS[fmt](path, pages, images, tables)
+    loader_cls = registry.loader_class(fmt)
+    results = {}
+
+    results[f"{fmt}.load"] = measure(lambda: loader_cls(path).load_file(), repeat, pages)
+    results[f"{fmt}.load"]["file_bytes"] = os.path.getsize(path)
+
+    # Extraction is timed against an already loaded document
+    extractor = DataExtractor(loader_cls(path))
+    extractor.document  # Trigger the lazy load outside the timed region
+    for method in EXTRACT_METHODS:
+        results[f"{fmt}.{method}"] = measure(getattr(extractor, method), repeat, pages)
+    extracted = extractor.extract_all()
+    extractor.close()
+
+    if fmt in ("docx", "pptx"):
+        fast = DataExtractor(loader_cls(path, engine="fast"))
+        fast.document
+        results[f"{fmt}.extract_all_fast"] = measure(fast.extract_all, repeat, pages)
+        fast.close()
+
+    output_dir = os.path.join(work_dir, f"files_{fmt}")
+    file_storage = FileStorage(output_folder=output_dir)
+    results[f"{fmt}.file_storage"] = measure(lambda: file_storage.save_result(extracted), repeat, pages)
+
+    sql_storage = SQLStorage(os.path.join(work_dir, f"bench_{fmt}.sqlite"))
+    results[f"{fmt}.sql_storage"] = measure(lambda: sql_storage.save_result(extracted), repeat, pages)
+    sql_storage.close()
+
+    # Thumbnail to 256 px and re-encode to WebP, the settings used for UI previews
+    with ImagePipeline(min_side=8, max_side=256, output_format="webp") as image_pipeline:
+        stage = measure(lambda: image_pipeline.process(extracted.images), repeat, pages)
+        stats = image_pipeline.stats
+        stage["images_per_s"] = stats.images_per_second
+        stage["bytes_saved"] = (stats.bytes_in - stats.bytes_out) // repeat
+        results[f"{fmt}.image_pipeline"] = stage
+    return results
+
+
+def run_benchmarks(pages: int, images: int, tables: int, repeat: int, formats: List[str]) -> Dict:
+    """
+    Runs the benchmarks for the requested formats.
+
+    Nothing is printed while timing; the pipeline reports progress through
+    logging, which stays as the caller configured it.
+
+    :return: A report with the run parameters, environment, and measurements.
+    """
+    report = {
+        "params": {"pages": pages, "images": images, "tables": tables, "repeat": repeat},
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        for fmt in formats:
+            report["results"].update(bench_format(fmt, work_dir, pages, images, tables, repeat))
+    return report
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Compares median latencies against a baseline report.
+
+    :param report: The current report.
+    :param baseline: A report from an earlier run with the same parameters.
+    :param tolerance: Allowed slowdown as a fraction, e.g. 0.2 for 20%.
+    :return: A description of each stage that regressed.
+    """
+    regressions = []
+    for name, current in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous and current["p50_ms"] > previous["p50_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p50 {current['p50_ms']:.2f} ms vs baseline {previous['p50_ms']:.2f} ms"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark document loading, extraction, and storage.")
+    parser.add_argument("--pages", type=int, default=20, help="Pages (or slides) per synthetic document")
+    parser.add_argument("--images", type=int, default=10, help="Images per synthetic document")
+    parser.add_argument("--tables", type=int, default=5, help="Tables per synthetic document")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per stage")
+    parser.add_argument("--formats", nargs="+", default=sorted(GENERATORS), choices=sorted(GENERATORS))
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", help="JSON report from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p50 slowdown (default: 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.pages, args.images, args.tables, args.repeat, args.formats)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("params") != report["params"]:
+            print("Warning: baseline was recorded with different parameters", file=sys.stderr)
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
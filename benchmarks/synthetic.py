@@ -0,0 +1,155 @@
+import io
+import random
+import fitz  # PyMuPDF
+import docx
+from docx.shared import Inches
+from pptx import Presentation
+from pptx.util import Inches as PptInches
+from PIL import Image
+
+
+# Filler text for synthetic pages
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua ut enim ad minim veniam quis nostrud"
+).split()
+
+
+def _paragraph(rng: random.Random, words: int = 60) -> str:
+    """
+    Builds a paragraph of random filler words.
+
+    :param rng: Random number generator, seeded for reproducible output.
+    :param words: Number of words in the paragraph.
+    :return: The paragraph text.
+    """
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _png(rng: random.Random, size: int = 64) -> bytes:
+    """
+    Builds a small PNG filled with random noise, so every image is distinct.
+
+    :param rng: Random number generator, seeded for reproducible output.
+    :param size: Width and height in pixels.
+    :return: PNG byte data.
+    """
+    image = Image.frombytes("RGB", (size, size), bytes(rng.getrandbits(8) for _ in range(size * size * 3)))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _table(rng: random.Random, rows: int = 5, cols: int = 4):
+    """
+    Builds a table of random words.
+
+    :param rng: Random number generator, seeded for reproducible output.
+    :return: Table as a list of rows.
+    """
+    return [[rng.choice(WORDS) for _ in range(cols)] for _ in range(rows)]
+
+
+def make_pdf(path: str, pages: int, images: int, tables: int, seed: int = 0) -> None:
+    """
+    Writes a synthetic PDF.
+
+    Images and tables are spread round-robin over the pages. Tables are drawn
+    as ruled grids of text, the way they appear in generated reports.
+
+    :param path: Output file path.
+    :param pages: Number of pages.
+    :param images: Total number of images.
+    :param tables: Total number of tables.
+    :param seed: Seed for the random content.
+    """
+    rng = random.Random(seed)
+    document = fitz.open()
+    for _ in range(pages):
+        page = document.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 550, 300), _paragraph(rng, 200), fontsize=9)
+        page.insert_link({"kind": fitz.LINK_URI, "from": fitz.Rect(50, 40, 200, 50), "uri": "https://example.com"})
+
+    for idx in range(images):
+        page = document[idx % pages]
+        offset = 60 * (idx // pages % 8)
+        page.insert_image(fitz.Rect(50 + offset, 320, 100 + offset, 370), stream=_png(rng))
+
+    for idx in range(tables):
+        page = document[idx % pages]
+        top = 400 + 90 * (idx // pages % 4)
+        for row_idx, row in enumerate(_table(rng, rows=4)):
+            for col_idx, cell in enumerate(row):
+                rect = fitz.Rect(50 + 100 * col_idx, top + 20 * row_idx, 150 + 100 * col_idx, top + 20 * (row_idx + 1))
+                page.draw_rect(rect, color=(0, 0, 0), width=0.5)
+                page.insert_textbox(rect + (2, 2, -2, -2), cell, fontsize=8)
+
+    document.save(path)
+    document.close()
+
+
+def make_docx(path: str, pages: int, images: int, tables: int, seed: int = 0) -> None:
+    """
+    Writes a synthetic DOCX, with about one page of paragraphs per requested page.
+
+    :param path: Output file path.
+    :param pages: Number of pages' worth of paragraphs.
+    :param images: Number of images.
+    :param tables: Number of tables.
+    :param seed: Seed for the random content.
+    """
+    rng = random.Random(seed)
+    document = docx.Document()
+    for _ in range(pages * 5):
+        document.add_paragraph(_paragraph(rng))
+    for _ in range(images):
+        document.add_picture(io.BytesIO(_png(rng)), width=Inches(0.5))
+    for _ in range(tables):
+        rows = _table(rng)
+        table = document.add_table(rows=len(rows), cols=len(rows[0]))
+        for row, values in zip(table.rows, rows):
+            for cell, value in zip(row.cells, values):
+                cell.text = value
+    document.save(path)
+
+
+def make_pptx(path: str, pages: int, images: int, tables: int, seed: int = 0) -> None:
+    """
+    Writes a synthetic PPTX with one slide per requested page.
+
+    :param path: Output file path.
+    :param pages: Number of slides.
+    :param images: Total number of images, spread over the slides.
+    :param tables: Total number of tables, spread over the slides.
+    :param seed: Seed for the random content.
+    """
+    rng = random.Random(seed)
+    presentation = Presentation()
+    layout = presentation.slide_layouts[6]  # Blank
+    slides = [presentation.slides.add_slide(layout) for _ in range(pages)]
+    for slide in slides:
+        box = slide.shapes.add_textbox(PptInches(0.5), PptInches(0.5), PptInches(9), PptInches(2))
+        box.text_frame.text = _paragraph(rng)
+        box.click_action.hyperlink.address = "https://example.com"
+
+    for idx in range(images):
+        slide = slides[idx % pages]
+        slide.shapes.add_picture(io.BytesIO(_png(rng)), PptInches(0.5 + idx // pages % 8), PptInches(3), PptInches(0.8))
+
+    for idx in range(tables):
+        rows = _table(rng)
+        slide = slides[idx % pages]
+        frame = slide.shapes.add_table(len(rows), len(rows[0]), PptInches(0.5), PptInches(4.5), PptInches(8), PptInches(2))
+        for row, values in zip(frame.table.rows, rows):
+            for cell, value in zip(row.cells, values):
+                cell.text = value
+
+    presentation.save(path)
+
+
+# File extension -> generator
+GENERATORS = {
+    "pdf": make_pdf,
+    "docx": make_docx,
+    "pptx": make_pptx,
+}
@@ -1,9 +1,19 @@
-import io
-from PIL import Image
-from src.loaders.pdf_loader import PDFLoader
+import os
+from src.loaders.file_loader import FileLoader
 from src.loaders.docx_loader import DOCXLoader
 from src.loaders.ppt_loader import PPTLoader
-from typing import List, Union, Optional
+from src.extractors.extraction_cache import ExtractionCache
+from src.extractors.handlers import FormatHandler, handler_for
+from src.extractors.records import FIELDS, ExtractionResult, PageRecord, field_mask, link_url
+from src.instrumentation.metrics import instrumented
+from typing import AbstractSet, Iterable, Iterator, List, Optional, Set
+
+# Bump whenever extraction output changes, so cached results are not reused
+EXTRACTOR_VERSION = "6"
+
+__all__ = [
+    "DataExtractor", "ExtractionResult", "PageRecord", "FIELDS", "link_url", "compare_engines", "EXTRACTOR_VERSION"
+]
 
 
 class DataExtractor:
@@ -14,127 +24,295 @@ class DataExtractor:
     - PDFs using PyMuPDF
     - DOCX using python-docx
     - PPTX using python-pptx
+
+    DOCX and PPTX loaders created with engine="fast" return a FastOOXMLDocument,
+    which streams the package XML instead; its output matches the default engines.
+
+    The format-specific work is done by the FormatHandler registered for the
+    loaded document's type (see src/extractors/handlers.py).
+
+    Every extract method accepts pages, a range or other iterable of zero-based
+    page or slide indices; extract_all() and iter_pages() also accept fields,
+    a subset of FIELDS. Pages and fields that are not requested are never
+    parsed or decoded.
     """
 
-    def __init__(self, file_loader: Union[PDFLoader, DOCXLoader, PPTLoader]) -> None:
+    def __init__(
+        self, file_loader: FileLoader, cache: Optional[ExtractionCache] = None
+    ) -> None:
         """
         Initialize DataExtractor with a FileLoader instance.
 
-        :param file_loader: An instance of PDFLoader, DOCXLoader, or PPTLoader.
+        Construction does no I/O: the cache is consulted and the document
+        opened only when data is first requested.
+
+        :param file_loader: A FileLoader, e.g. PDFLoader, DOCXLoader, or PPTLoader.
+        :param cache: Optional ExtractionCache consulted before the file is parsed.
         """
         self.file_loader = file_loader
-        self.document = self.file_loader.load_file()
+        self.cache = cache
+        self.cache_key: Optional[str] = None
+        self._cached_result: Optional[ExtractionResult] = None
+        self._cache_checked = False
+        self._handler: Optional[FormatHandler] = None
+
+    @property
+    def document(self):
+        """
+        The loaded document, opened by the loader on first access.
 
-    def extract_text(self) -> Optional[str]:
+        On a cache hit it is only accessed if page-level data is requested.
         """
-        Extracts text from the loaded document.
+        return self.file_loader.document
 
-        :return: Extracted text as a string, or None if extraction fails.
+    @property
+    def load_error(self) -> Optional[str]:
+        """
+        Why the document cannot be extracted, or None if it can.
+
+        A cached result counts as extractable without opening the document.
         """
-        if not self.document:
+        if self.cached_result is not None or self.document:
             return None
+        return self.file_loader.load_error or "Could not load file"
 
-        # Extract text from PDF
-        if isinstance(self.file_loader, PDFLoader):
-            return "\n".join([page.get_text() for page in self.document])
+    @property
+    def handler(self) -> Optional[FormatHandler]:
+        """
+        The extraction handler for the loaded document, or None if it failed to load.
 
-        # Extract text from DOCX
-        if isinstance(self.file_loader, DOCXLoader):
-            return "\n".join([para.text for para in self.document.paragraphs])
+        A new handler is created if the document was closed and reopened.
+        """
+        document = self.document
+        if not document:
+            return None
+        if self._handler is None or self._handler.document is not document:
+            self._handler = handler_for(document, self.file_loader.file_path)
+        return self._handler
 
-        # Extract text from PPT
-        if isinstance(self.file_loader, PPTLoader):
-            return "\n".join(
-                [shape.text for slide in self.document.slides for shape in slide.shapes if hasattr(shape, "text")]
-            )
+    @property
+    def cached_result(self) -> Optional[ExtractionResult]:
+        """
+        The cached result for this file, looked up on first access.
+
+        :return: The cached ExtractionResult, or None without a cache or on a miss.
+        """
+        if not self._cache_checked:
+            self._cache_checked = True
+            file_path = self.file_loader.file_path
+            if self.cache is not None and file_path and os.path.isfile(file_path):
+                self.cache_key = self.cache.key_for(file_path, EXTRACTOR_VERSION)
+                self._cached_result = self.cache.get(self.cache_key)
+        return self._cached_result
+
+    def close(self) -> None:
+        """
+        Closes the underlying document. It is reopened if data is requested again.
+        """
+        self.file_loader.close()
+
+    def __enter__(self) -> "DataExtractor":
+        return self
 
-        return None
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
 
-    def extract_links(self) -> List[str]:
+    @instrumented("extract_text")
+    def extract_text(self, pages: Optional[Iterable[int]] = None) -> Optional[str]:
         """
-        Extracts hyperlinks from the loaded document.
+        Extracts text from the loaded document.
 
-        :return: A list of extracted hyperlinks.
+        :param pages: Zero-based page or slide indices to extract; all pages if omitted.
+        :return: Extracted text as a string, or None if extraction fails.
         """
-        links = []
+        if pages is not None:
+            return self._extract_all(pages=pages, fields=["text"]).text
+        if self.cached_result is not None:
+            return self.cached_result.text
 
-        # Extract links from PDF
-        if isinstance(self.file_loader, PDFLoader):
-            for page in self.document:
-                links.extend(page.get_links())  # Extracts hyperlinks from PDF
+        handler = self.handler
+        return handler.extract_text() if handler else None
 
-        # Extract links from DOCX
-        elif isinstance(self.file_loader, DOCXLoader):
-            for rel in self.document.part.rels.values():
-                if "hyperlink" in rel.reltype:
-                    links.append(rel.target_ref)  # Extract hyperlink reference
+    @instrumented("extract_links")
+    def extract_links(self, pages: Optional[Iterable[int]] = None) -> List[str]:
+        """
+        Extracts hyperlinks from the loaded document.
 
-        # Extract links from PPT
-        elif isinstance(self.file_loader, PPTLoader):
-            for slide in self.document.slides:
-                for shape in slide.shapes:
-                    if hasattr(shape, "hyperlink") and shape.hyperlink.address:
-                        links.append(shape.hyperlink.address)  # Extract hyperlink from shape
+        :param pages: Zero-based page or slide indices to extract; all pages if omitted.
+        :return: A list of extracted hyperlinks.
+        """
+        if pages is not None:
+            return self._extract_all(pages=pages, fields=["links"]).links
+        if self.cached_result is not None:
+            return list(self.cached_result.links)
 
-        return links  # Returns list of extracted hyperlinks
+        handler = self.handler
+        return handler.extract_links() if handler else []
 
-    def extract_images(self) -> List[bytes]:
+    @instrumented("extract_images")
+    def extract_images(self, pages: Optional[Iterable[int]] = None) -> List[bytes]:
         """
         Extracts images from the loaded document.
 
+        PDF images referenced from several pages are only extracted once.
+
+        :param pages: Zero-based page or slide indices to extract; all pages if omitted.
         :return: A list of extracted image byte data.
         """
-        images = []
-
-        # Extract images from PDF
-        if isinstance(self.file_loader, PDFLoader):
-            for page in self.document:
-                for img in page.get_images(full=True):
-                    xref = img[0]
-                    base_image = self.document.extract_image(xref)
-                    images.append(base_image["image"])  # Extract the image bytes
+        if pages is not None:
+            return self._extract_all(pages=pages, fields=["images"]).images
+        if self.cached_result is not None:
+            return list(self.cached_result.images)
 
-        # Extract images from DOCX
-        elif isinstance(self.file_loader, DOCXLoader):
-            for rel in self.document.part.rels.values():
-                if "image" in rel.reltype:
-                    image_part = self.document.part.rels[rel.rId].target_part
-                    images.append(image_part.blob)  # Extract image as bytes
+        handler = self.handler
+        return handler.extract_images() if handler else []
 
-        # Extract images from PPT
-        elif isinstance(self.file_loader, PPTLoader):
-            for slide in self.document.slides:
-                for shape in slide.shapes:
-                    if hasattr(shape, "image"):
-                        images.append(shape.image.blob)  # Extract image as bytes
-
-        return images  # Returns list of images in bytes format
-
-    def extract_tables(self) -> List[List[List[str]]]:
+    @instrumented("extract_tables")
+    def extract_tables(self, pages: Optional[Iterable[int]] = None) -> List[List[List[str]]]:
         """
         Extracts tables from the loaded document.
 
+        :param pages: Zero-based page or slide indices to extract; all pages if omitted.
         :return: A list of tables, where each table is represented as a list of lists.
         """
-        tables = []
+        if pages is not None:
+            return self._extract_all(pages=pages, fields=["tables"]).tables
+        if self.cached_result is not None:
+            return list(self.cached_result.tables)
+
+        handler = self.handler
+        return handler.extract_tables() if handler else []
+
+    @instrumented("iter_pages")
+    def iter_pages(
+        self,
+        workers: int = 1,
+        shard_size: Optional[int] = None,
+        pages: Optional[Iterable[int]] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Iterator[PageRecord]:
+        """
+        Yields extracted data one page at a time.
+
+        PDFs yield one record per page and PPTX files one per slide. DOCX has no
+        fixed pages, so the whole document is yielded as a single record. Only
+        the current page's data is held in memory, so large documents can be
+        processed with bounded memory.
+
+        With workers > 1, PDF pages are split into page-range shards that are
+        extracted in separate processes and yielded back in page order.
+
+        :param workers: Number of worker processes to use for PDFs.
+        :param shard_size: Pages per shard (defaults to about four shards per worker).
+        :param pages: Zero-based page or slide indices to extract, e.g. range(5); all pages if
+                      omitted. Other pages are not parsed (PDF, fast engine) or are skipped (DOCX, PPTX).
+        :param fields: Names of the fields to extract, e.g. ["text", "links"]; all if omitted.
+                       Fields left out are not extracted and stay empty in the records.
+        :return: An iterator of PageRecord objects.
+        :raises ValueError: If fields names an unknown field.
+        """
+        mask = field_mask(fields)
+        handler = self.handler
+        if handler is None:
+            return
+        yield from handler.iter_pages(_page_set(pages), workers, shard_size, mask)
+
+    @instrumented("extract_all")
+    def extract_all(
+        self, workers: int = 1, pages: Optional[Iterable[int]] = None, fields: Optional[Iterable[str]] = None
+    ) -> ExtractionResult:
+        """
+        Extracts text, hyperlinks, images, and tables in a single pass.
+
+        Each page, slide, or paragraph is visited once, so callers that need
+        every field pay for one traversal instead of four. When a cache is
+        configured, a hit is returned without parsing and a complete result
+        (all pages, all fields) is stored on a miss; requests for a page range
+        bypass the cache. PDF and PPTX results also carry their page records,
+        which SQLStorage uses to keep page numbers.
+
+        :param workers: Number of worker processes to split PDF pages across.
+        :param pages: Zero-based page or slide indices to extract; all pages if omitted.
+        :param fields: Names of the fields to extract, e.g. ["text"]; all if omitted.
+                       Fields left out stay empty (text stays None).
+        :return: An ExtractionResult holding the extracted data.
+        :raises ValueError: If fields names an unknown field.
+        """
+        return self._extract_all(workers, pages, fields)
+
+    def _extract_all(
+        self, workers: int = 1, pages: Optional[Iterable[int]] = None, fields: Optional[Iterable[str]] = None
+    ) -> ExtractionResult:
+        """
+        Does the work of extract_all() without instrumentation, so the extract_*
+        methods can delegate to it and still report a single call.
+        """
+        mask = field_mask(fields)
+        if pages is None and self.cached_result is not None:
+            cached = self.cached_result
+            return ExtractionResult(
+                source=self.file_loader.file_path,
+                text=cached.text if "text" in mask else None,
+                links=list(cached.links) if "links" in mask else [],
+                images=list(cached.images) if "images" in mask else [],
+                tables=list(cached.tables) if "tables" in mask else [],
+                pages=[_masked_record(record, mask) for record in cached.pages],
+            )
 
-        # Extract tables from DOCX
-        if isinstance(self.file_loader, DOCXLoader):
-            for table in self.document.tables:
-                table_data = [[cell.text for cell in row.cells] for row in table.rows]
-                tables.append(table_data)
+        handler = self.handler
+        if handler is None:
+            return ExtractionResult(source=self.file_loader.file_path)
 
-        # Extract tables from PPT
-        elif isinstance(self.file_loader, PPTLoader):
-            for slide in self.document.slides:
-                for shape in slide.shapes:
-                    if hasattr(shape, "has_table") and shape.has_table:
-                        table = shape.table  # Now safe to access
-                        table_data = [[cell.text for cell in row.cells] for row in table.rows]
-                        tables.append(table_data)
+        wanted = _page_set(pages)
+        result = handler.extract_all(workers, wanted, mask)
+        if self.cache is not None and self.cache_key is not None and wanted is None and mask == set(FIELDS):
+            self.cache.put(self.cache_key, result)
+        return result
 
-        return tables  # Returns a list of extracted tables
 
+def _masked_record(record: PageRecord, mask: AbstractSet[str]) -> PageRecord:
+    """
+    Copies a page record, leaving the fields outside a field mask empty.
+
+    :param record: A page record of a cached result.
+    :param mask: Field names to keep.
+    :return: A new PageRecord.
+    """
+    return PageRecord(
+        record.index,
+        record.text if "text" in mask else "",
+        list(record.links) if "links" in mask else [],
+        list(record.images) if "images" in mask else [],
+        list(record.tables) if "tables" in mask else [],
+    )
+
+
+def _page_set(pages: Optional[Iterable[int]]) -> Optional[Set[int]]:
+    """
+    Converts a page selection to the set of indices handlers expect.
+
+    :param pages: Zero-based page indices, e.g. range(5), or None for all pages.
+    :return: The set of indices, or None for all pages.
+    """
+    return None if pages is None else set(pages)
+
+
+def compare_engines(file_path: str) -> List[str]:
+    """
+    Extracts a DOCX or PPTX file with both the default and the fast engine.
+
+    :param file_path: Path to the DOCX or PPTX file.
+    :return: Names of the ExtractionResult fields that differ; empty when the engines agree.
+    :raises ValueError: If the file is not a DOCX or PPTX file.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    loader_cls = {".docx": DOCXLoader, ".pptx": PPTLoader}.get(extension)
+    if loader_cls is None:
+        raise ValueError(f"Engines can only be compared for DOCX and PPTX files: '{file_path}'")
+
+    with DataExtractor(loader_cls(file_path)) as default, DataExtractor(loader_cls(file_path, engine="fast")) as fast:
+        expected, actual = default.extract_all(), fast.extract_all()
+    return [name for name in ("text", "links", "images", "tables") if getattr(expected, name) != getattr(actual, name)]
 
 
 # pdf_extractor = DataExtractor(PDFLoader("data/sample.pdf"))
@@ -0,0 +1,180 @@
+import os
+import pickle
+import hashlib
+import tempfile
+from collections import OrderedDict
+from typing import Dict
+
+
+class ExtractionCache:
+    """
+    On-disk cache of extraction results keyed by file content.
+
+    Entries are keyed by a SHA-256 hash of the file bytes plus the extractor
+    version, so identical files are only parsed once no matter where they live,
+    and bumping the version invalidates results from older extraction logic.
+    The total size of the cache is capped; the least recently used entries are
+    evicted first. Several processes may share a cache directory: lookups go to
+    disk, and once this process's running size estimate exceeds the cap the
+    directory is rescanned before evicting, so entries written by other
+    processes count towards the cap.
+
+    Entries are pickled, so the cache directory must only be writable by trusted users.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 * 1024 * 1024) -> None:
+        """
+        Initialize the cache, indexing any entries already on disk.
+
+        :param cache_dir: Directory holding the cache entries.
+        :param max_bytes: Maximum total size of all entries, in bytes.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # key -> entry size, ordered from least to most recently used
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0  # Sum of the sizes in _entries
+        self._rescan()
+
+    @property
+    def total_bytes(self) -> int:
+        """Total size of the cached entries this process knows of, in bytes."""
+        return self._total_bytes
+
+    def key_for(self, file_path: str, version: str) -> str:
+        """
+        Computes the cache key for a file from its contents.
+
+        :param file_path: Path to the file.
+        :param version: Extractor version the result is produced by.
+        :return: Hex digest identifying the file contents and extractor version.
+        """
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        digest.update(f":{version}".encode())
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        """
+        Looks up a cached result.
+
+        :param key: Key returned by key_for().
+        :return: The cached ExtractionResult, or None on a miss.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+            os.utime(path)  # Record the access so eviction order survives restarts and is shared
+        except (OSError, pickle.UnpicklingError, EOFError):
+            # Entry missing, evicted by another process, or corrupt; treat as a miss
+            self._total_bytes -= self._entries.pop(key, 0)
+            self.misses += 1
+            return None
+
+        if key not in self._entries:  # Written by another process
+            self._set_entry(key, os.path.getsize(path))
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result) -> None:
+        """
+        Stores a result, evicting least recently used entries if over the size cap.
+
+        :param key: Key returned by key_for().
+        :param result: The ExtractionResult to cache.
+        """
+        path = self._path(key)
+        # A unique temporary file per call, so threads and processes writing the same entry never share one
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)  # Atomic, so readers never see a partial entry
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        self._set_entry(key, os.path.getsize(path))
+        self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the cache counters.
+
+        :return: Dictionary with hits, misses, evictions, entries, and total bytes.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+        }
+
+    def _evict(self) -> None:
+        """
+        Removes least recently used entries until the cache fits its size cap.
+
+        The directory is only rescanned once the running estimate is over the
+        cap, so writes below it cost no directory listing.
+        """
+        if self._total_bytes <= self.max_bytes:
+            return
+        self._rescan()
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def _set_entry(self, key: str, size: int) -> None:
+        """
+        Records an entry as the most recently used one.
+
+        :param key: Cache key.
+        :param size: Size of the entry file, in bytes.
+        """
+        self._total_bytes += size - self._entries.get(key, 0)
+        self._entries[key] = size
+        self._entries.move_to_end(key)
+
+    def _rescan(self) -> None:
+        """
+        Re-indexes the entries on disk, including ones other processes added.
+
+        Entries are ordered by modification time, which get() refreshes on
+        every hit; ties keep this process's order.
+        """
+        rank = {key: position for position, key in enumerate(self._entries)}
+        existing = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".pkl"):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    continue  # Evicted by another process meanwhile
+                key = name[:-4]
+                existing.append((stat.st_mtime_ns, rank.get(key, -1), key, stat.st_size))
+        self._entries = OrderedDict((key, size) for _, _, key, size in sorted(existing))
+        self._total_bytes = sum(self._entries.values())
+
+    def _path(self, key: str) -> str:
+        """
+        Returns the file path of a cache entry.
+
+        :param key: Cache key.
+        :return: Path to the pickled entry.
+        """
+        return os.path.join(self.cache_dir, f"{key}.pkl")
@@ -0,0 +1,542 @@
+import sys
+import math
+from collections import deque
+from abc import ABC, abstractmethod
+from typing import AbstractSet, Iterator, List, Optional, Set, Tuple, Type, Union
+from src.loaders.pdf_loader import PDFLoader
+from src.loaders.ooxml_fast import FastOOXMLDocument
+from src.extractors.records import FIELDS, ExtractionResult, PageRecord
+from src.extractors.pdf_tables import extract_page_tables
+
+
+class FormatHandler(ABC):
+    """
+    Abstract base class for format-specific extraction.
+
+    DataExtractor picks a handler by the type of the loaded document and
+    delegates every extract method to it. Supporting a new format means
+    registering a loader for its signature and a handler for its document type.
+    """
+
+    # Loaded document class this handler understands. Third-party classes are
+    # named as "module.Class" so the library is only imported by its loader.
+    document_type: Union[type, str] = object
+
+    # Whether page records are real pages or slides; False when the whole document is one record (DOCX)
+    paged = True
+
+    def __init__(self, document, file_path: Optional[str]) -> None:
+        """
+        :param document: The loaded document.
+        :param file_path: Path the document was loaded from, if any.
+        """
+        self.document = document
+        self.file_path = file_path
+
+    @property
+    def page_count(self) -> Optional[int]:
+        """Number of page records iter_pages() yields for the whole document, or None if unknown."""
+        return None
+
+    @abstractmethod
+    def extract_text(self) -> str:
+        """Returns the document's text."""
+        pass
+
+    @abstractmethod
+    def extract_links(self) -> List:
+        """Returns the document's hyperlinks."""
+        pass
+
+    @abstractmethod
+    def extract_images(self) -> List[bytes]:
+        """Returns the document's image bytes."""
+        pass
+
+    @abstractmethod
+    def extract_tables(self) -> List[List[List[str]]]:
+        """Returns the document's tables as lists of rows."""
+        pass
+
+    @abstractmethod
+    def iter_pages(
+        self,
+        wanted: Optional[Set[int]] = None,
+        workers: int = 1,
+        shard_size: Optional[int] = None,
+        fields: AbstractSet[str] = FIELDS,
+    ) -> Iterator[PageRecord]:
+        """
+        Yields extracted data one page (or slide) at a time.
+
+        Pages outside wanted and fields outside the mask are never extracted;
+        the records leave skipped fields empty.
+
+        :param wanted: Page indices to extract, or None for all pages.
+        :param workers: Number of worker processes, for formats that support sharding.
+        :param shard_size: Pages per shard, for formats that support sharding.
+        :param fields: Field names to extract (see records.FIELDS).
+        :return: An iterator of PageRecord objects.
+        """
+        pass
+
+    def extract_all(
+        self, workers: int = 1, wanted: Optional[Set[int]] = None, fields: AbstractSet[str] = FIELDS
+    ) -> ExtractionResult:
+        """
+        Collects the requested fields in one walk over the pages.
+
+        :param workers: Number of worker processes, for formats that support sharding.
+        :param wanted: Page indices to extract, or None for all pages.
+        :param fields: Field names to extract; the text of a result without "text" is None.
+        :return: An ExtractionResult holding the extracted data, and its page records if paged.
+        """
+        result = ExtractionResult(source=self.file_path)
+        texts = []
+        for record in self.iter_pages(wanted, workers, fields=fields):
+            texts.append(record.text)
+            result.links.extend(record.links)
+            result.images.extend(record.images)
+            result.tables.extend(record.tables)
+            if self.paged:
+                result.pages.append(record)
+        if "text" in fields:
+            result.text = "\n".join(texts)
+        return result
+
+
+# Registered handlers, checked in order against the loaded document's type
+HANDLERS: List[Type[FormatHandler]] = []
+
+
+def register_handler(handler_cls: Type[FormatHandler]) -> Type[FormatHandler]:
+    """
+    Class decorator that registers a FormatHandler for its document_type.
+
+    :param handler_cls: The handler class.
+    :return: The same class.
+    """
+    HANDLERS.append(handler_cls)
+    return handler_cls
+
+
+def handler_for(document, file_path: Optional[str]) -> FormatHandler:
+    """
+    Creates the handler for a loaded document.
+
+    :param document: The loaded document.
+    :param file_path: Path the document was loaded from, if any.
+    :return: A FormatHandler instance.
+    :raises TypeError: If no handler is registered for the document's type.
+    """
+    for handler_cls in HANDLERS:
+        document_type = _resolve_type(handler_cls.document_type)
+        if document_type is not None and isinstance(document, document_type):
+            return handler_cls(document, file_path)
+    raise TypeError(f"No extraction handler registered for {type(document).__name__}")
+
+
+def _resolve_type(document_type: Union[type, str]) -> Optional[type]:
+    """
+    Looks up a handler's document_type without importing anything.
+
+    A class named by a dotted path can only have instances once its module
+    has been imported, so a module that is not loaded yet means no match.
+
+    :param document_type: A class, or a "module.Class" path.
+    :return: The class, or None if its module has not been imported.
+    """
+    if isinstance(document_type, type):
+        return document_type
+    module_name, _, class_name = document_type.rpartition(".")
+    module = sys.modules.get(module_name)
+    return getattr(module, class_name, None) if module is not None else None
+
+
+@register_handler
+class PDFHandler(FormatHandler):
+    """
+    Extracts PDFs with PyMuPDF, page by page.
+    """
+
+    document_type = "fitz.Document"
+
+    @property
+    def page_count(self) -> int:
+        return self.document.page_count
+
+    def extract_text(self) -> str:
+        return "\n".join([page.get_text() for page in self.document])
+
+    def extract_links(self) -> List[dict]:
+        links = []
+        for page in self.document:
+            links.extend(page.get_links())  # Extracts hyperlinks from PDF
+        return links
+
+    def extract_images(self) -> List[bytes]:
+        images = []
+        seen_xrefs = set()
+        for page in self.document:
+            for img in page.get_images(full=True):
+                xref = img[0]
+                if xref in seen_xrefs:
+                    continue  # Same image object already extracted from an earlier page
+                seen_xrefs.add(xref)
+                images.append(self.document.extract_image(xref)["image"])  # Extract the image bytes
+        return images
+
+    def extract_tables(self) -> List[List[List[str]]]:
+        return [table for page in self.document for table in extract_page_tables(page)]
+
+    def iter_pages(
+        self,
+        wanted: Optional[Set[int]] = None,
+        workers: int = 1,
+        shard_size: Optional[int] = None,
+        fields: AbstractSet[str] = FIELDS,
+    ) -> Iterator[PageRecord]:
+        page_count = self.document.page_count
+        if wanted is not None:
+            indices = sorted(i for i in wanted if 0 <= i < page_count)
+        elif workers > 1 and page_count > 1 and self.document.name:
+            # Shards reopen the file by name; documents opened from memory run serially
+            yield from self._iter_shards(workers, shard_size, fields)
+            return
+        else:
+            indices = range(page_count)
+
+        seen_xrefs = set()
+        for index in indices:
+            yield self.page_record(self.document.load_page(index), seen_xrefs, fields)
+
+    def _iter_shards(
+        self, workers: int, shard_size: Optional[int], fields: AbstractSet[str] = FIELDS
+    ) -> Iterator[PageRecord]:
+        """
+        Extracts page-range shards of the PDF in a process pool.
+
+        Each worker reopens the file itself, since fitz documents cannot be
+        shared between processes. All shards are queued at once, and each
+        shard's pages are yielded as soon as it and the shards before it are
+        done, so the first pages arrive while later shards are still running.
+        Shards not yet started are cancelled if the caller stops early.
+
+        Each shard skips images repeated within it, and returns the xref of
+        every image it kept; images an earlier shard already produced are
+        dropped here, so the result matches a serial pass.
+
+        :param workers: Number of worker processes.
+        :param shard_size: Pages per shard, or None to pick one automatically.
+        :param fields: Field names to extract.
+        :return: An iterator of PageRecord objects in page order.
+        """
+        page_count = self.document.page_count
+        if not shard_size:
+            shard_size = max(1, math.ceil(page_count / (workers * 4)))
+        starts = range(0, page_count, shard_size)
+        stops = [min(start + shard_size, page_count) for start in starts]
+
+        from concurrent.futures import ProcessPoolExecutor  # Pulls in multiprocessing; only needed here
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(starts))) as pool:
+            futures = deque(
+                pool.submit(_extract_pdf_shard, self.document.name, start, stop, fields)
+                for start, stop in zip(starts, stops)
+            )
+            seen_xrefs = set()
+            try:
+                while futures:
+                    # Shards are waited for in submission order, so pages stay in order;
+                    # popping drops each shard's pages once they have been yielded
+                    for record, xrefs in futures.popleft().result():
+                        record.images = [image for image, xref in zip(record.images, xrefs) if xref not in seen_xrefs]
+                        seen_xrefs.update(xrefs)
+                        yield record
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def page_record(
+        self, page, seen_xrefs: Set[int], fields: AbstractSet[str] = FIELDS, xrefs: Optional[List[int]] = None
+    ) -> PageRecord:
+        """
+        Extracts the requested fields from one PDF page.
+
+        The page's text is parsed once and shared by the text and table
+        extraction, and only if either is requested. Images whose xref is in seen_xrefs were already extracted
+        from an earlier page and are skipped, so a logo repeated on every page
+        is only decoded once per document.
+
+        :param page: A fitz.Page object.
+        :param seen_xrefs: Image xrefs already extracted; updated in place.
+        :param fields: Field names to extract.
+        :param xrefs: If given, the xref of each extracted image is appended, in the order of record.images.
+        :return: A PageRecord for the page.
+        """
+        record = PageRecord(page.number)
+        if "text" in fields or "tables" in fields:
+            import fitz  # Already loaded by PDFLoader
+
+            textpage = page.get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+            if "text" in fields:
+                record.text = page.get_text(textpage=textpage)
+            if "tables" in fields:
+                record.tables = extract_page_tables(page, textpage)
+        if "links" in fields:
+            record.links = page.get_links()
+        if "images" not in fields:
+            return record
+        for img in page.get_images(full=True):
+            xref = img[0]
+            if xref in seen_xrefs:
+                continue
+            seen_xrefs.add(xref)
+            record.images.append(self.document.extract_image(xref)["image"])
+            if xrefs is not None:
+                xrefs.append(xref)
+        return record
+
+
+@register_handler
+class DOCXHandler(FormatHandler):
+    """
+    Extracts DOCX files through python-docx's object model.
+
+    DOCX has no fixed pages, so the whole document is a single page record.
+    """
+
+    document_type = "docx.document.Document"
+    paged = False
+    page_count = 1
+
+    def extract_text(self) -> str:
+        return "\n".join([para.text for para in self.document.paragraphs])
+
+    def extract_links(self) -> List[str]:
+        return [rel.target_ref for rel in self.document.part.rels.values() if "hyperlink" in rel.reltype]
+
+    def extract_images(self) -> List[bytes]:
+        return [rel.target_part.blob for rel in self.document.part.rels.values() if "image" in rel.reltype]
+
+    def extract_tables(self) -> List[List[List[str]]]:
+        return [[[cell.text for cell in row.cells] for row in table.rows] for table in self.document.tables]
+
+    def iter_pages(
+        self,
+        wanted: Optional[Set[int]] = None,
+        workers: int = 1,
+        shard_size: Optional[int] = None,
+        fields: AbstractSet[str] = FIELDS,
+    ) -> Iterator[PageRecord]:
+        if wanted is not None and 0 not in wanted:
+            return
+        result = self.extract_all(fields=fields)
+        yield PageRecord(0, result.text or "", result.links, result.images, result.tables)
+
+    def extract_all(
+        self, workers: int = 1, wanted: Optional[Set[int]] = None, fields: AbstractSet[str] = FIELDS
+    ) -> ExtractionResult:
+        """
+        Walks paragraphs, relationships, and tables once each, skipping
+        whatever the field mask leaves out.
+        """
+        result = ExtractionResult(source=self.file_path)
+        if wanted is not None and 0 not in wanted:
+            return result
+        if "text" in fields:
+            result.text = self.extract_text()
+
+        # Hyperlinks and images both live in the document part's relationships
+        if "links" in fields or "images" in fields:
+            for rel in self.document.part.rels.values():
+                if "hyperlink" in rel.reltype and "links" in fields:
+                    result.links.append(rel.target_ref)
+                elif "image" in rel.reltype and "images" in fields:
+                    result.images.append(rel.target_part.blob)
+
+        if "tables" in fields:
+            result.tables = self.extract_tables()
+        return result
+
+
+@register_handler
+class PPTXHandler(FormatHandler):
+    """
+    Extracts PPTX files through python-pptx's object model, slide by slide.
+    """
+
+    document_type = "pptx.presentation.Presentation"
+
+    @property
+    def page_count(self) -> int:
+        return len(self.document.slides)
+
+    def extract_text(self) -> str:
+        return "\n".join(
+            [shape.text for slide in self.document.slides for shape in slide.shapes if hasattr(shape, "text")]
+        )
+
+    def extract_links(self) -> List[str]:
+        links = []
+        for slide in self.document.slides:
+            for shape in slide.shapes:
+                address = shape.click_action.hyperlink.address
+                if address:
+                    links.append(address)  # Extract the shape's click-through hyperlink
+        return links
+
+    def extract_images(self) -> List[bytes]:
+        return [
+            shape.image.blob for slide in self.document.slides for shape in slide.shapes if hasattr(shape, "image")
+        ]
+
+    def extract_tables(self) -> List[List[List[str]]]:
+        return [
+            [[cell.text for cell in row.cells] for row in shape.table.rows]
+            for slide in self.document.slides
+            for shape in slide.shapes
+            if hasattr(shape, "has_table") and shape.has_table
+        ]
+
+    def iter_pages(
+        self,
+        wanted: Optional[Set[int]] = None,
+        workers: int = 1,
+        shard_size: Optional[int] = None,
+        fields: AbstractSet[str] = FIELDS,
+    ) -> Iterator[PageRecord]:
+        for index, slide in enumerate(self.document.slides):
+            if wanted is None or index in wanted:
+                record = PageRecord(index)
+                record.text = "\n".join(self._visit_shapes(slide, record, fields))
+                yield record
+
+    def extract_all(
+        self, workers: int = 1, wanted: Optional[Set[int]] = None, fields: AbstractSet[str] = FIELDS
+    ) -> ExtractionResult:
+        """
+        Walks each slide's shapes once. Shape texts are joined across slides
+        directly, so slides without text add no blank lines.
+        """
+        result = ExtractionResult(source=self.file_path)
+        texts = []
+        for index, slide in enumerate(self.document.slides):
+            if wanted is not None and index not in wanted:
+                continue
+            record = PageRecord(index)
+            slide_texts = self._visit_shapes(slide, record, fields)
+            record.text = "\n".join(slide_texts)
+            texts.extend(slide_texts)
+            result.links.extend(record.links)
+            result.images.extend(record.images)
+            result.tables.extend(record.tables)
+            result.pages.append(record)
+        if "text" in fields:
+            result.text = "\n".join(texts)
+        return result
+
+    def _visit_shapes(self, slide, record: PageRecord, fields: AbstractSet[str] = FIELDS) -> List[str]:
+        """
+        Walks a slide's shapes once, filling in links, images, and tables.
+
+        :param slide: A python-pptx Slide object.
+        :param record: The PageRecord to populate.
+        :param fields: Field names to extract; image blobs are only read if "images" is included.
+        :return: The text of each text-bearing shape, in order.
+        """
+        texts = []
+        for shape in slide.shapes:
+            if "text" in fields and hasattr(shape, "text"):
+                texts.append(shape.text)
+            if "links" in fields:
+                address = shape.click_action.hyperlink.address
+                if address:
+                    record.links.append(address)
+            if "images" in fields and hasattr(shape, "image"):
+                record.images.append(shape.image.blob)
+            if "tables" in fields and hasattr(shape, "has_table") and shape.has_table:
+                record.tables.append([[cell.text for cell in row.cells] for row in shape.table.rows])
+        return texts
+
+
+@register_handler
+class FastOOXMLHandler(FormatHandler):
+    """
+    Extracts DOCX and PPTX files loaded with engine="fast".
+
+    Each extract method is one streaming pass over the package.
+    """
+
+    document_type = FastOOXMLDocument
+
+    @property
+    def paged(self) -> bool:
+        return self.document.paged
+
+    @property
+    def page_count(self) -> int:
+        return len(self.document.slide_parts()) if self.paged else 1
+
+    def extract_text(self) -> str:
+        return self.extract_all().text
+
+    def extract_links(self) -> List[str]:
+        return self.extract_all().links
+
+    def extract_images(self) -> List[bytes]:
+        return self.extract_all().images
+
+    def extract_tables(self) -> List[List[List[str]]]:
+        return self.extract_all().tables
+
+    def iter_pages(
+        self,
+        wanted: Optional[Set[int]] = None,
+        workers: int = 1,
+        shard_size: Optional[int] = None,
+        fields: AbstractSet[str] = FIELDS,
+    ) -> Iterator[PageRecord]:
+        for index, texts, links, images, tables in self.document.iter_units(wanted, fields):
+            yield PageRecord(index, "\n".join(texts), links, images, tables)
+
+    def extract_all(
+        self, workers: int = 1, wanted: Optional[Set[int]] = None, fields: AbstractSet[str] = FIELDS
+    ) -> ExtractionResult:
+        result = ExtractionResult(source=self.file_path)
+        texts = []
+        for index, unit_texts, links, images, tables in self.document.iter_units(wanted, fields):
+            texts.extend(unit_texts)
+            result.links.extend(links)
+            result.images.extend(images)
+            result.tables.extend(tables)
+            if self.paged:
+                result.pages.append(PageRecord(index, "\n".join(unit_texts), links, images, tables))
+        if "text" in fields:
+            result.text = "\n".join(texts)
+        return result
+
+
+def _extract_pdf_shard(
+    file_path: str, start: int, stop: int, fields: AbstractSet[str] = FIELDS
+) -> List[Tuple[PageRecord, List[int]]]:
+    """
+    Worker entry point: reopens a PDF and extracts pages [start, stop).
+
+    :param file_path: Path to the PDF file.
+    :param start: First page index of the shard.
+    :param stop: Page index one past the end of the shard.
+    :param fields: Field names to extract.
+    :return: (PageRecord, xrefs of its images) pairs for the shard, in page order.
+    :raises ValueError: If the PDF cannot be opened.
+    """
+    with PDFLoader(file_path) as loader:
+        if loader.document is None:
+            raise ValueError(f"Could not load PDF: '{file_path}'")
+        handler = PDFHandler(loader.document, file_path)
+        seen_xrefs = set()  # Per shard; the parent drops images an earlier shard already produced
+        pages = []
+        for index in range(start, stop):
+            xrefs = []
+            pages.append((handler.page_record(loader.document.load_page(index), seen_xrefs, fields, xrefs), xrefs))
+        return pages
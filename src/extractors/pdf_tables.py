@@ -0,0 +1,185 @@
+import statistics
+from typing import List, Optional, Sequence, Tuple
+
+# Minimum number of distinct ruling positions (horizontal rules by y, vertical rules
+# by x) on a page before PyMuPDF's table finder is run, with at least two of each
+# orientation. A lone box has four, so it is not taken for a table.
+MIN_RULING_SEGMENTS = 5
+
+# Rectangles thinner than this, in points, are drawn rules rather than boxes
+MAX_RULE_THICKNESS = 2.0
+
+# Word-layout fallback: a table needs at least this many rows and columns
+MIN_ROWS = 2
+MIN_COLUMNS = 2
+
+# Cells in real tables are short; two-column prose has long "cells"
+MAX_MEDIAN_WORDS_PER_CELL = 4
+
+Word = Tuple[float, float, float, float, str]  # x0, y0, x1, y1, text
+
+
+def extract_page_tables(page, textpage=None) -> List[List[List[str]]]:
+    """
+    Extracts the tables on one PDF page.
+
+    Pages with ruling lines go through PyMuPDF's table finder when this
+    PyMuPDF version has one. Otherwise the page's words are clustered into
+    rows and aligned columns. Text-only pages are rejected after a cheap
+    check of their drawings and word gaps, without running either finder.
+
+    :param page: A fitz.Page object.
+    :param textpage: The page's fitz.TextPage, if already built, so the text is not parsed twice.
+    :return: Tables as lists of rows of cell strings, in page order.
+    """
+    if hasattr(page, "find_tables") and _has_ruling_lines(page):
+        tables = [
+            [["" if cell is None else cell for cell in row] for row in table.extract()]
+            for table in page.find_tables().tables
+        ]
+        tables = [table for table in tables if len(table) >= MIN_ROWS]
+        if tables:
+            return tables
+
+    words = [word[:5] for word in page.get_text("words", textpage=textpage)]
+    return cluster_word_tables(words)
+
+
+def _has_ruling_lines(page) -> bool:
+    """
+    Checks whether a page draws enough straight rules to hold a ruled table.
+
+    Horizontal and vertical lines count, as do line-thin rectangles (how many
+    producers draw rules) and the edges of stroked rectangles (cell borders).
+    Filled rectangles such as highlights and shading do not. Rules are counted
+    by distinct position, so a single box or frame is not enough.
+
+    :param page: A fitz.Page object.
+    :return: True if the page has at least MIN_RULING_SEGMENTS distinct rules, two of each orientation.
+    """
+    drawings = page.get_cdrawings() if hasattr(page, "get_cdrawings") else page.get_drawings()
+    rows, columns = set(), set()  # y of horizontal rules, x of vertical rules
+    for path in drawings:
+        stroked = "s" in (path.get("type") or "")
+        for item in path.get("items", ()):
+            if item[0] == "re":
+                x0, y0, x1, y1 = item[1]
+                if abs(y1 - y0) < MAX_RULE_THICKNESS:
+                    rows.add(round((y0 + y1) / 2))
+                elif abs(x1 - x0) < MAX_RULE_THICKNESS:
+                    columns.add(round((x0 + x1) / 2))
+                elif stroked:
+                    rows.update((round(y0), round(y1)))
+                    columns.update((round(x0), round(x1)))
+            elif item[0] == "l":
+                (x0, y0), (x1, y1) = item[1], item[2]
+                if abs(y0 - y1) < 1:
+                    rows.add(round(y0))
+                elif abs(x0 - x1) < 1:
+                    columns.add(round(x0))
+            if len(rows) >= 2 and len(columns) >= 2 and len(rows) + len(columns) >= MIN_RULING_SEGMENTS:
+                return True
+    return False
+
+
+def cluster_word_tables(words: Sequence[Word]) -> List[List[List[str]]]:
+    """
+    Finds tables in a page's word layout.
+
+    Words are grouped into rows by vertical position and split into cells at
+    wide horizontal gaps. Runs of consecutive multi-cell rows whose cells line
+    up on shared left edges become tables.
+
+    :param words: The page's words as (x0, y0, x1, y1, text) tuples.
+    :return: Tables as lists of rows of cell strings.
+    """
+    if len(words) < MIN_ROWS * MIN_COLUMNS:
+        return []
+
+    line_height = statistics.median(y1 - y0 for _, y0, _, y1, _ in words) or 1.0
+    rows = _split_cells(_group_rows(words, line_height), gap=1.5 * line_height)
+    if sum(len(cells) >= MIN_COLUMNS for _, cells in rows) < MIN_ROWS:
+        return []  # No table-like lines; the common case for text pages
+
+    tables = []
+    run: List[List[List[Word]]] = []
+    last_y: Optional[float] = None
+    for y, cells in rows:
+        contiguous = last_y is not None and y - last_y <= 2.5 * line_height
+        if len(cells) >= MIN_COLUMNS and (contiguous or not run):
+            run.append(cells)
+        else:
+            tables.extend(_align_columns(run, line_height))
+            run = [cells] if len(cells) >= MIN_COLUMNS else []
+        last_y = y
+    tables.extend(_align_columns(run, line_height))
+    return tables
+
+
+def _group_rows(words: Sequence[Word], line_height: float) -> List[Tuple[float, List[Word]]]:
+    """
+    Groups words whose vertical centers are within half a line of each other.
+
+    :return: List of (row center y, words sorted left to right), top to bottom.
+    """
+    rows: List[Tuple[float, List[Word]]] = []
+    for word in sorted(words, key=lambda w: ((w[1] + w[3]) / 2, w[0])):
+        center = (word[1] + word[3]) / 2
+        if rows and center - rows[-1][0] <= line_height / 2:
+            rows[-1][1].append(word)
+        else:
+            rows.append((center, [word]))
+    return [(center, sorted(row, key=lambda w: w[0])) for center, row in rows]
+
+
+def _split_cells(rows: List[Tuple[float, List[Word]]], gap: float) -> List[Tuple[float, List[List[Word]]]]:
+    """
+    Splits each row into cells wherever the space between two words exceeds gap.
+    """
+    split = []
+    for center, row in rows:
+        cells = [[row[0]]]
+        for previous, word in zip(row, row[1:]):
+            if word[0] - previous[2] > gap:
+                cells.append([word])
+            else:
+                cells[-1].append(word)
+        split.append((center, cells))
+    return split
+
+
+def _align_columns(run: List[List[List[Word]]], line_height: float) -> List[List[List[str]]]:
+    """
+    Turns a run of multi-cell rows into a table if their cells share column edges.
+
+    Column edges are the left x positions used by at least half the rows.
+    Each cell is placed in the rightmost column starting at or before it.
+
+    :return: A list holding the table, or an empty list if the run is not a table.
+    """
+    if len(run) < MIN_ROWS:
+        return []
+    cells = [cell for row in run for cell in row]
+    if statistics.median(len(cell) for cell in cells) > MAX_MEDIAN_WORDS_PER_CELL:
+        return []  # Long runs of words: columns of prose rather than a table
+
+    tolerance = line_height / 2
+    edges: List[List[float]] = []
+    for x in sorted(cell[0][0] for cell in cells):
+        if edges and x - edges[-1][-1] <= tolerance:
+            edges[-1].append(x)
+        else:
+            edges.append([x])
+    columns = [min(group) for group in edges if len(group) * 2 >= len(run)]
+    if len(columns) < MIN_COLUMNS:
+        return []
+
+    table = []
+    for row in run:
+        values = [""] * len(columns)
+        for cell in row:
+            index = max([i for i, x in enumerate(columns) if x <= cell[0][0] + tolerance] or [0])
+            text = " ".join(word[4] for word in cell)
+            values[index] = f"{values[index]} {text}" if values[index] else text
+        table.append(values)
+    return [table]
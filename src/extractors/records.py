@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+from typing import FrozenSet, Iterable, List, Optional
+
+# Names of the extractable fields, usable in a field mask
+FIELDS = ("text", "links", "images", "tables")
+
+
+@dataclass
+class PageRecord:
+    """
+    Data extracted from a single page (PDF), slide (PPTX), or whole document (DOCX).
+    """
+
+    index: Optional[int]  # Zero-based page or slide number; None for data covering the whole document
+    text: str = ""
+    links: List[str] = field(default_factory=list)
+    images: List[bytes] = field(default_factory=list)
+    tables: List[List[List[str]]] = field(default_factory=list)
+
+
+@dataclass
+class ExtractionResult:
+    """
+    Structured result of a single-pass extraction.
+
+    Holds everything the individual extract_* methods return, gathered
+    in one walk over the document, plus the page records of paged formats.
+    """
+
+    source: Optional[str] = None
+    text: Optional[str] = None
+    links: List[str] = field(default_factory=list)
+    images: List[bytes] = field(default_factory=list)
+    tables: List[List[List[str]]] = field(default_factory=list)
+    truncated: Optional[str] = None  # Limit that stopped extraction early, e.g. "timeout"; None if complete
+    # The per-page records the fields were collected from, so storages can keep page numbers.
+    # Empty for formats without pages (DOCX); the records share their lists' items with the fields.
+    pages: List[PageRecord] = field(default_factory=list)
+
+
+def field_mask(fields: Optional[Iterable[str]] = None) -> FrozenSet[str]:
+    """
+    Validates a field mask.
+
+    :param fields: Field names to extract, e.g. ["text", "links"], or None for all fields.
+    :return: The requested field names.
+    :raises ValueError: If a name is not one of FIELDS.
+    """
+    if fields is None:
+        return frozenset(FIELDS)
+    if isinstance(fields, str):
+        fields = [fields]
+    mask = frozenset(fields)
+    unknown = mask.difference(FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown field(s) {sorted(unknown)}; expected any of {list(FIELDS)}")
+    return mask
+
+
+def link_url(link) -> Optional[str]:
+    """
+    Returns the URL of an extracted link.
+
+    PyMuPDF reports PDF links as dictionaries; links to other pages have no URI.
+
+    :param link: A link as returned by DataExtractor.
+    :return: The URL, or None if the link has no external target.
+    """
+    if isinstance(link, dict):
+        return link.get("uri")
+    return link
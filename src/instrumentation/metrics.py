@@ -0,0 +1,321 @@
+import os
+import json
+import time
+import inspect
+import threading
+import functools
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class MetricEvent:
+    """
+    One timed call of an instrumented operation.
+    """
+
+    operation: str  # e.g. "load_file", "extract_images", "sql_storage.save_results"
+    doc_type: str  # File extension of the document, e.g. "pdf"
+    seconds: float
+    items: int = 0  # Pages, links, images, tables, or rows handled
+    bytes: int = 0  # Bytes read or written
+    error: Optional[str] = None  # Exception type name if the call raised
+    peak_alloc_bytes: Optional[int] = None  # Set by tracemalloc when the call was profiled
+    timestamp: float = field(default_factory=time.time)
+
+
+class MetricsSink(ABC):
+    """
+    Abstract base class for destinations of metric events.
+    """
+
+    @abstractmethod
+    def emit(self, event: MetricEvent) -> None:
+        """
+        Receives one metric event.
+
+        :param event: The event to record.
+        """
+        pass
+
+
+class InMemorySink(MetricsSink):
+    """
+    Aggregates events in memory per operation and document type.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # (operation, doc_type) -> {"calls", "errors", "seconds", "max_seconds", "items", "bytes"}
+        self.totals: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+    def emit(self, event: MetricEvent) -> None:
+        with self._lock:
+            totals = self.totals.setdefault(
+                (event.operation, event.doc_type),
+                {"calls": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0, "items": 0, "bytes": 0},
+            )
+            totals["calls"] += 1
+            totals["errors"] += event.error is not None
+            totals["seconds"] += event.seconds
+            totals["max_seconds"] = max(totals["max_seconds"], event.seconds)
+            totals["items"] += event.items
+            totals["bytes"] += event.bytes
+
+    def snapshot(self) -> Dict[Tuple[str, str], Dict[str, float]]:
+        """
+        Returns a copy of the current totals.
+
+        :return: Totals keyed by (operation, doc_type).
+        """
+        with self._lock:
+            return {key: dict(values) for key, values in self.totals.items()}
+
+
+class JSONLinesSink(MetricsSink):
+    """
+    Appends every event to a file as one JSON object per line.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: File to append events to.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, event: MetricEvent) -> None:
+        line = json.dumps(asdict(event)) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class PrometheusSink(InMemorySink):
+    """
+    Aggregates events in memory and renders them in the Prometheus text exposition format.
+    """
+
+    # Metric name suffix, totals key, type, help text
+    METRICS = (
+        ("calls_total", "calls", "counter", "Number of calls per operation."),
+        ("errors_total", "errors", "counter", "Number of calls that raised."),
+        ("seconds_total", "seconds", "counter", "Total time spent per operation."),
+        ("seconds_max", "max_seconds", "gauge", "Slowest single call per operation."),
+        ("items_total", "items", "counter", "Pages, links, images, tables, or rows handled."),
+        ("bytes_total", "bytes", "counter", "Bytes read or written."),
+    )
+
+    def __init__(self, prefix: str = "docextract") -> None:
+        """
+        :param prefix: Prefix for every metric name.
+        """
+        super().__init__()
+        self.prefix = prefix
+
+    def render(self) -> str:
+        """
+        Renders the current totals.
+
+        :return: Metrics in Prometheus text format.
+        """
+        totals = self.snapshot()
+        lines = []
+        for suffix, key, metric_type, help_text in self.METRICS:
+            name = f"{self.prefix}_operation_{suffix}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for (operation, doc_type), values in sorted(totals.items()):
+                lines.append(f'{name}{{operation="{operation}",doc_type="{doc_type}"}} {values[key]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """
+        Writes the rendered metrics to a file, e.g. for the node_exporter textfile collector.
+
+        :param path: Destination file; replaced atomically.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+
+class Instrumentation:
+    """
+    Dispatches metric events to the registered sinks.
+
+    With no sinks and no profiler registered, instrumented calls run the
+    wrapped function directly and cost a single attribute check.
+    """
+
+    def __init__(self) -> None:
+        self.sinks: List[MetricsSink] = []
+        self.profiler = None  # Optional ProfilingHook
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any sink or profiler is registered."""
+        return bool(self.sinks) or self.profiler is not None
+
+    def add_sink(self, sink: MetricsSink) -> MetricsSink:
+        """
+        Registers a sink.
+
+        :param sink: The sink to add.
+        :return: The same sink, for convenience.
+        """
+        self.sinks.append(sink)
+        return sink
+
+    def remove_sink(self, sink: MetricsSink) -> None:
+        """
+        Unregisters a sink.
+
+        :param sink: The sink to remove.
+        """
+        self.sinks.remove(sink)
+
+    def emit(self, event: MetricEvent) -> None:
+        """
+        Sends an event to every sink.
+
+        :param event: The event to record.
+        """
+        for sink in self.sinks:
+            sink.emit(event)
+
+
+# Process-wide instrumentation used by the instrumented() decorator
+metrics = Instrumentation()
+
+
+def document_type(obj, args: tuple) -> str:
+    """
+    Works out which document type an instrumented call is handling.
+
+    :param obj: The instance whose method was called (loader, extractor, or storage).
+    :param args: The call's positional arguments; a result's source is used if present.
+    :return: The lower-case file extension, or "unknown".
+    """
+    path = getattr(args[0], "source", None) if args else None
+    if path is None:
+        path = getattr(obj, "file_path", None)
+    if path is None:
+        holder = getattr(obj, "extractor", None) or obj
+        loader = getattr(holder, "file_loader", None)
+        path = getattr(loader, "file_path", None)
+    if not isinstance(path, str):
+        return "unknown"
+    return os.path.splitext(path)[1].lstrip(".").lower() or "unknown"
+
+
+def count_items(obj, args: tuple, result) -> Tuple[int, int]:
+    """
+    Default measure of what an instrumented call produced.
+
+    :param obj: The instance whose method was called.
+    :param args: The call's positional arguments.
+    :param result: The call's return value.
+    :return: Tuple of (items, bytes).
+    """
+    if isinstance(result, (str, bytes)):
+        return 1, len(result)
+    if isinstance(result, list):
+        return len(result), sum(len(item) for item in result if isinstance(item, (str, bytes)))
+    if hasattr(result, "images") and hasattr(result, "tables"):
+        # ExtractionResult or PageRecord
+        items = len(result.links) + len(result.images) + len(result.tables)
+        return items, len(result.text or "") + sum(len(img) for img in result.images)
+    return 0, 0
+
+
+def count_file(obj, args: tuple, result) -> Tuple[int, int]:
+    """
+    Measure for loaders: one document and the size of the file read.
+
+    :param obj: The loader whose load_file() was called.
+    :param args: The call's positional arguments.
+    :param result: The loaded document, or None if loading failed.
+    :return: Tuple of (items, bytes).
+    """
+    if result is None:
+        return 0, 0
+    if getattr(obj, "data", None) is not None:
+        return 1, len(obj.data)
+    return 1, os.path.getsize(obj.file_path)
+
+
+def count_written(obj, args: tuple, result) -> Tuple[int, int]:
+    """
+    Measure for storage writes: counts the data passed in rather than the return value.
+
+    :param obj: The storage whose method was called.
+    :param args: The call's positional arguments; the first is the data written.
+    :param result: The call's return value.
+    :return: Tuple of (items, bytes).
+    """
+    return count_items(obj, args, args[0]) if args else (0, 0)
+
+
+def instrumented(operation: str, measure: Callable[[object, tuple, object], Tuple[int, int]] = count_items):
+    """
+    Decorator that times a method and reports it to the registered sinks.
+
+    Generator methods are timed over their full iteration, with one item
+    counted per yielded value.
+
+    :param operation: Name reported for the operation.
+    :param measure: Function mapping (instance, positional args, return value) to (items, bytes).
+    :return: The decorator.
+    """
+    def decorator(func):
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(self, *args, **kwargs):
+                if not metrics.enabled:
+                    yield from func(self, *args, **kwargs)
+                    return
+                event = MetricEvent(operation, document_type(self, args), 0.0)
+                start = time.perf_counter()
+                if metrics.profiler is not None and metrics.profiler.should_profile(operation):
+                    values = metrics.profiler.run_generator(event, func, self, *args, **kwargs)
+                else:
+                    values = func(self, *args, **kwargs)
+                try:
+                    for value in values:
+                        event.items += 1
+                        event.bytes += measure(self, args, value)[1]
+                        yield value
+                except Exception as e:
+                    event.error = type(e).__name__
+                    raise
+                finally:
+                    values.close()  # Lets a profiled generator record its event before it is emitted
+                    event.seconds = time.perf_counter() - start
+                    metrics.emit(event)
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not metrics.enabled:
+                return func(self, *args, **kwargs)
+
+            doc_type = document_type(self, args)
+            event = MetricEvent(operation, doc_type, 0.0)
+            start = time.perf_counter()
+            try:
+                if metrics.profiler is not None and metrics.profiler.should_profile(operation):
+                    result = metrics.profiler.run(event, func, self, *args, **kwargs)
+                else:
+                    result = func(self, *args, **kwargs)
+                event.items, event.bytes = measure(self, args, result)
+                return result
+            except Exception as e:
+                event.error = type(e).__name__
+                raise
+            finally:
+                event.seconds = time.perf_counter() - start
+                metrics.emit(event)
+        return wrapper
+    return decorator
@@ -0,0 +1,127 @@
+import os
+import time
+import random
+import cProfile
+import tracemalloc
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+class ProfilingHook:
+    """
+    Profiles a random sample of instrumented calls.
+
+    Sampled calls run under cProfile, with stats dumped to a .prof file that can
+    be opened with pstats or snakeviz, and optionally under tracemalloc, whose
+    peak allocation is attached to the call's MetricEvent.
+
+    Register it with: metrics.profiler = ProfilingHook("profiles")
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        sample_rate: float = 0.01,
+        operations: Iterable[str] = ("extract_all", "iter_pages"),
+        use_cprofile: bool = True,
+        use_tracemalloc: bool = False,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize the ProfilingHook.
+
+        :param output_dir: Directory the .prof files are written to.
+        :param sample_rate: Fraction of calls to profile, between 0 and 1.
+        :param operations: Operation names eligible for profiling.
+        :param use_cprofile: Record a cProfile of each sampled call.
+        :param use_tracemalloc: Record the peak Python allocation of each sampled call.
+        :param seed: Seed for the sampler, for reproducible sampling.
+        """
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.operations = set(operations)
+        self.use_cprofile = use_cprofile
+        self.use_tracemalloc = use_tracemalloc
+        self.profiles: List[str] = []  # Paths of the .prof files written so far
+        self._random = random.Random(seed)
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def should_profile(self, operation: str) -> bool:
+        """
+        Decides whether to profile a call.
+
+        :param operation: The operation being called.
+        :return: True if this call was sampled.
+        """
+        return operation in self.operations and self._random.random() < self.sample_rate
+
+    def run(self, event, func, *args, **kwargs):
+        """
+        Runs a call under the configured profilers.
+
+        :param event: The MetricEvent for the call; its peak_alloc_bytes is filled in.
+        :param func: The function to call.
+        :return: The function's return value.
+        """
+        profiler, started_tracing = self._start()
+        try:
+            if profiler is not None:
+                return profiler.runcall(func, *args, **kwargs)
+            return func(*args, **kwargs)
+        finally:
+            self._finish(event, profiler, started_tracing)
+
+    def run_generator(self, event, func, *args, **kwargs) -> Iterator:
+        """
+        Iterates a generator call under the configured profilers.
+
+        cProfile only runs while the generator computes its next value, so the
+        consumer's work between values is left out. tracemalloc covers the whole
+        iteration, as the generator's allocations can outlive each step.
+
+        :param event: The MetricEvent for the call; its peak_alloc_bytes is filled in.
+        :param func: The generator function to call.
+        :return: An iterator over the generator's values.
+        """
+        profiler, started_tracing = self._start()
+        try:
+            iterator = func(*args, **kwargs)
+            while True:
+                if profiler is not None:
+                    profiler.enable()
+                try:
+                    value = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    if profiler is not None:
+                        profiler.disable()
+                yield value
+        finally:
+            self._finish(event, profiler, started_tracing)
+
+    def _start(self) -> Tuple[Optional[cProfile.Profile], bool]:
+        """
+        Prepares the profilers for a sampled call.
+
+        :return: Tuple of (cProfile profiler or None, whether tracemalloc was started here).
+        """
+        started_tracing = self.use_tracemalloc and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.use_tracemalloc:
+            tracemalloc.reset_peak()
+        return (cProfile.Profile() if self.use_cprofile else None), started_tracing
+
+    def _finish(self, event, profiler: Optional[cProfile.Profile], started_tracing: bool) -> None:
+        """
+        Records the peak allocation and writes the profile of a sampled call.
+        """
+        if self.use_tracemalloc:
+            event.peak_alloc_bytes = tracemalloc.get_traced_memory()[1]
+        if started_tracing:
+            tracemalloc.stop()
+        if profiler is not None:
+            name = f"{event.operation}-{event.doc_type}-{os.getpid()}-{time.time_ns()}.prof"
+            path = os.path.join(self.output_dir, name)
+            profiler.dump_stats(path)
+            self.profiles.append(path)
@@ -1,45 +1,90 @@
 # DOCX Loader
 
-from src.loaders.file_loader import FileLoader
-import docx
-from docx.document import Document
+import logging
+from typing import TYPE_CHECKING
+from src.loaders.file_loader import LOAD_ERRORS, DocumentData, FileLoader, read_signature
+from src.loaders.ooxml_fast import FastDOCXDocument
+from src.instrumentation.metrics import count_file, instrumented
+
+if TYPE_CHECKING:
+    from docx.document import Document  # python-docx is imported by load_file() on first use
+
+logger = logging.getLogger(__name__)
 
 
 class DOCXLoader(FileLoader):
     """
     Concrete class for loading DOCX files.
 
-    This class validates and loads a DOCX file using python-docx.
+    This class validates and loads a DOCX file using python-docx, or with the
+    streaming zipfile/iterparse reader when engine="fast".
     """
 
-    def __init__(self, file_path: str) -> None:
+    FORMAT = "docx"
+    EXTENSIONS = (".docx",)
+    ENGINES = ("python-docx", "fast")
+
+    # Main-part content types of Word documents, templates, and macro-enabled documents
+    CONTENT_TYPES = (
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.template.main+xml",
+        "application/vnd.ms-word.document.macroEnabled.main+xml",
+    )
+
+    def __init__(
+        self, file_path: str | None = None, engine: str = "python-docx", data: DocumentData | None = None
+    ) -> None:
         """
         Initialize the DOCXLoader with a file path.
 
-        :param file_path: Path to the DOCX file.
+        :param file_path: Path to the DOCX file. May be omitted when data is given.
+        :param engine: "python-docx" for the full object model, or "fast" for FastDOCXDocument.
+        :param data: The DOCX file's contents as bytes, a buffer, an mmap, or a binary file object.
+        :raises ValueError: If the engine is not supported.
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unsupported DOCX engine: '{engine}'")
+        super().__init__(file_path, data)  # Call parent constructor
+        self.engine = engine
+
+    @classmethod
+    def sniff(cls, header: bytes, content_types: str | None) -> bool:
+        """
+        DOCX files are ZIP packages whose content types declare a WordprocessingML main part.
         """
-        super().__init__(file_path)  # Call parent constructor
+        return content_types is not None and any(t in content_types for t in cls.CONTENT_TYPES)
 
     def validate_file(self) -> bool:
         """
         Validate if the file is a proper DOCX format.
 
-        :return: True if the file is a valid DOCX, False otherwise.
+        :return: True if the file is a Word ZIP package, False otherwise.
+        :raises OSError: If the file cannot be read.
         """
-        return self.file_path.lower().endswith(".docx")  # Simple format check
+        return self.sniff(*read_signature(self.file_path, self.data))  # Magic-byte check
 
-    def load_file(self) -> Document | None:
+    @instrumented("load_file", measure=count_file)
+    def load_file(self) -> "Document | FastDOCXDocument | None":
         """
         Loads the DOCX file and returns a python-docx document object.
 
-        :return: A Document object if successful, else None.
+        :return: A Document (or FastDOCXDocument for the fast engine) if successful, else None.
         """
+        if not self.check_signature("Not a DOCX file"):
+            return None
+
         try:
-            document = docx.Document(self.file_path)  # Open DOCX file
-            print("DOCX successfully loaded")
+            source = self.open_source()
+            if self.engine == "fast":
+                document = FastDOCXDocument(source)
+            else:
+                import docx
+
+                document = docx.Document(source)  # Open DOCX file
+            logger.debug("DOCX successfully loaded: %s", self.file_path)
             return document
-        except Exception as e:
-            print(f"Error loading DOCX: {e}")  # Handle exceptions gracefully
+        except LOAD_ERRORS as e:
+            self.load_failed(f"{type(e).__name__}: {e}")
             return None
 
 
@@ -1,4 +1,131 @@
+import io
+import logging
+import mmap
+import zipfile
 from abc import ABC, abstractmethod
+from typing import BinaryIO, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the start of a file to identify its format
+HEADER_SIZE = 1024
+
+# In-memory document contents a loader accepts in place of a path
+DocumentData = Union[bytes, bytearray, memoryview, mmap.mmap, BinaryIO]
+
+
+def as_buffer(data: DocumentData) -> Union[bytes, memoryview]:
+    """
+    Turns in-memory document contents into a buffer without copying where possible.
+
+    bytes are returned as they are. bytearrays, memoryviews and mmaps are
+    wrapped in a read-only byte memoryview. io.BytesIO objects expose their
+    buffer directly, and other binary file objects backed by a real file
+    are memory-mapped; only streams that are neither are read into memory.
+
+    :param data: The document's contents.
+    :return: bytes or a read-only memoryview over the contents.
+    :raises TypeError: If data is not a buffer or a binary file object.
+    """
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, (bytearray, memoryview, mmap.mmap)):
+        view = memoryview(data)
+        return (view if view.format == "B" and view.ndim == 1 else view.cast("B")).toreadonly()
+    if isinstance(data, io.BytesIO):
+        return data.getbuffer().toreadonly()
+    if not hasattr(data, "read"):
+        raise TypeError(f"Expected bytes, a buffer, or a binary file object, got {type(data).__name__}")
+    try:
+        if data.tell() == 0:
+            return memoryview(mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ))
+    except (AttributeError, OSError, ValueError):
+        pass  # Not backed by a mappable file (pipe, socket, custom stream, or empty file)
+    return data.read()
+
+
+class BufferReader(io.RawIOBase):
+    """
+    Read-only, seekable file object over a buffer, without copying it.
+
+    Lets zipfile (and so python-docx, python-pptx and the fast engine) read a
+    package held in a memoryview or mmap; io.BytesIO would copy the whole buffer.
+    """
+
+    def __init__(self, buffer: Union[bytes, memoryview]) -> None:
+        super().__init__()
+        self._buffer = memoryview(buffer)
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._buffer)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._buffer) if size is None or size < 0 else self._position + size
+        chunk = self._buffer[self._position:end].tobytes()
+        self._position += len(chunk)
+        return chunk
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def readinto(self, target) -> int:
+        chunk = self.read(len(target))
+        target[:len(chunk)] = chunk
+        return len(chunk)
+
+
+def read_signature(
+    file_path: Optional[str], data: Optional[Union[bytes, memoryview]] = None
+) -> Tuple[bytes, Optional[str]]:
+    """
+    Reads what is needed to identify a file's format without parsing it.
+
+    For ZIP packages (DOCX, PPTX) the [Content_Types].xml member is read as well,
+    which only touches the central directory and that one small member.
+
+    :param file_path: Path to the file; ignored when data is given.
+    :param data: The file's contents as returned by as_buffer(), if already in memory.
+    :return: Tuple of (first HEADER_SIZE bytes, content types XML or None if not a ZIP package).
+    :raises OSError: If the file is missing or cannot be read, so callers can tell that from a wrong format.
+    """
+    if data is not None:
+        header = bytes(data[:HEADER_SIZE])
+    else:
+        with open(file_path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+
+    if not header.startswith(b"PK\x03\x04"):
+        return header, None
+    try:
+        with zipfile.ZipFile(BufferReader(data) if data is not None else file_path) as package:
+            return header, package.read("[Content_Types].xml").decode("utf-8", "replace")
+    except (zipfile.BadZipFile, KeyError, OSError):
+        return header, None
+
+# Errors the parsers raise for corrupt, truncated, or hostile documents. Anything
+# else (a bug, MemoryError, KeyboardInterrupt) propagates instead of being
+# reported as a bad file.
+LOAD_ERRORS = (
+    OSError,  # Unreadable file
+    ValueError,  # Includes zlib and codec errors
+    KeyError,  # Part missing from an OOXML package
+    SyntaxError,  # XML parse errors from ElementTree and lxml
+    RuntimeError,  # PyMuPDF's FileDataError and other MuPDF errors
+    zipfile.BadZipFile,
+)
+
 
 class FileLoader(ABC):
     """
@@ -6,15 +133,108 @@ class FileLoader(ABC):
 
     This class defines a structure for all file loaders, ensuring 
     they implement validation and file-loading mechanisms.
+
+    Nothing is opened when a loader is constructed. The document is loaded
+    on first access to the document property and released by close(), or
+    by leaving a with-block.
     """
 
-    def __init__(self, file_path: str) -> None:
+    FORMAT: Optional[str] = None  # Format name used by the loader registry, e.g. "pdf"
+    EXTENSIONS: Tuple[str, ...] = ()  # File extensions conventionally used for the format
+
+    def __init__(self, file_path: Optional[str] = None, data: Optional[DocumentData] = None) -> None:
         """
         Initialize the FileLoader with the given file path.
 
-        :param file_path: Path to the file to be loaded.
+        :param file_path: Path to the file to be loaded. May be omitted when data is given.
+        :param data: The file's contents as bytes, a bytearray, memoryview or mmap, or a
+                     binary file object. The document is then opened from memory, without
+                     a temporary file, and file_path only names it.
+        :raises ValueError: If neither file_path nor data is given.
         """
+        if file_path is None and data is None:
+            raise ValueError("A file path or the file's data is required")
         self.file_path = file_path  # Store the file path
+        self.data = as_buffer(data) if data is not None else None  # Zero-copy view of the contents
+        self._document = None
+        self._loaded = False
+        self.load_error: Optional[str] = None  # Why the last load_file() returned None
+
+    @property
+    def document(self):
+        """
+        The loaded document, opened on first access and reused afterwards.
+
+        :return: Loaded file data, or None if loading failed.
+        """
+        if not self._loaded:
+            self.load_error = None
+            self._document = self.load_file()
+            self._loaded = True
+        return self._document
+
+    def open_source(self) -> Union[str, BinaryIO]:
+        """
+        What zipfile-based parsers should open: the path, or a reader over the in-memory data.
+
+        :return: The file path or a seekable binary file object.
+        """
+        return self.file_path if self.data is None else BufferReader(self.data)
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the document has been opened."""
+        return self._loaded
+
+    def close(self) -> None:
+        """
+        Releases the loaded document. It is reopened if accessed again.
+        """
+        if self._document is not None and hasattr(self._document, "close"):
+            self._document.close()  # PyMuPDF documents hold an open file handle
+        self._document = None
+        self._loaded = False
+
+    @classmethod
+    def sniff(cls, header: bytes, content_types: Optional[str]) -> bool:
+        """
+        Checks a file signature against the format this loader handles.
+
+        :param header: The first HEADER_SIZE bytes of the file.
+        :param content_types: The [Content_Types].xml of a ZIP package, or None.
+        :return: True if the file is in this loader's format.
+        """
+        return False
+
+    def check_signature(self, message: str) -> bool:
+        """
+        Runs validate_file() before loading, recording why the file cannot be loaded.
+
+        :param message: Reason recorded when the file is readable but not in this loader's format.
+        :return: True if the file may be loaded.
+        """
+        try:
+            if self.validate_file():
+                return True
+            self.load_failed(message)
+        except OSError as e:  # Missing or unreadable, as opposed to the wrong format
+            self.load_failed(f"{type(e).__name__}: {e}")
+        return False
+
+    def load_failed(self, message: str) -> None:
+        """
+        Records why the document could not be loaded; load_file() then returns None.
+
+        :param message: Description of the failure, e.g. "FileDataError: cannot open broken document".
+        """
+        self.load_error = message
+        logger.error("Could not load '%s': %s", self.file_path or "<memory>", message)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
 
     @abstractmethod
     def validate_file(self) -> bool:
@@ -22,6 +242,7 @@ class FileLoader(ABC):
         Validate the file format to ensure compatibility.
 
         :return: True if the file format is valid, False otherwise.
+        :raises OSError: If the file cannot be read.
         """
         pass
 
@@ -0,0 +1,314 @@
+# Fast DOCX/PPTX engine
+
+import posixpath
+import zipfile
+from abc import ABC, abstractmethod
+from typing import IO, Dict, Iterator, List, Optional, Set, Tuple, Union
+from xml.etree.ElementTree import iterparse, parse
+from src.extractors.records import FIELDS
+
+# OOXML namespaces
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Top-level slide shape elements, as iterated by python-pptx's slide.shapes
+SHAPE_TAGS = {f"{P}sp", f"{P}grpSp", f"{P}graphicFrame", f"{P}cxnSp", f"{P}pic", f"{P}contentPart"}
+
+# Index, text, links, images, and tables found in one slide (or a whole DOCX body)
+Unit = Tuple[int, List[str], List[str], List[bytes], List[List[List[str]]]]
+
+
+class Relationship:
+    """
+    One entry of a part's .rels file.
+    """
+
+    def __init__(self, rel_type: str, target: str, external: bool, part_name: Optional[str]) -> None:
+        self.rel_type = rel_type
+        self.target = target  # Target exactly as written, e.g. a URL or "media/image1.png"
+        self.external = external
+        self.part_name = part_name  # Zip member the target resolves to, for internal targets
+
+
+class FastOOXMLDocument(ABC):
+    """
+    Reads a DOCX or PPTX package straight from its zip members.
+
+    XML parts are parsed incrementally with iterparse and discarded as soon as
+    each paragraph, table, or shape has been read, so no object model is built
+    for the document. Image blobs are read directly from the zip members.
+    """
+
+    paged = True  # Whether units are slides; False when the whole document is one unit (DOCX)
+
+    def __init__(self, file: Union[str, IO[bytes]]) -> None:
+        """
+        Open the package.
+
+        :param file: Path to the DOCX or PPTX file, or a binary file object holding it.
+        """
+        self.file_path = file if isinstance(file, str) else getattr(file, "name", "<memory>")
+        self.package = zipfile.ZipFile(file)
+
+    def close(self) -> None:
+        """Closes the underlying zip file."""
+        self.package.close()
+
+    @abstractmethod
+    def iter_units(self, wanted: Optional[Set[int]] = None, fields: Optional[Set[str]] = None) -> Iterator[Unit]:
+        """
+        Yields the extracted data of each slide, or of the whole document for DOCX.
+
+        Unwanted slides are not parsed, and fields left out of the mask are
+        neither parsed nor read from the package; their lists stay empty.
+
+        :param wanted: Slide indices to extract, or None for all slides (DOCX has one unit, index 0).
+        :param fields: Field names to extract (see records.FIELDS), or None for all fields.
+        :return: Iterator of (index, text fragments, links, images, tables) tuples.
+        """
+        pass
+
+    def main_part(self) -> str:
+        """
+        Finds the package's main part (word/document.xml or ppt/presentation.xml).
+
+        :return: Zip member name of the main part.
+        """
+        for rel in self.relationships("").values():
+            if rel.rel_type.endswith("/officeDocument"):
+                return rel.part_name
+        raise ValueError(f"No main document part in '{self.file_path}'")
+
+    def relationships(self, part_name: str) -> Dict[str, Relationship]:
+        """
+        Reads the relationships of a part, in document order.
+
+        :param part_name: Zip member name of the part, or "" for the package itself.
+        :return: Relationships keyed by their rId.
+        """
+        directory, name = posixpath.split(part_name)
+        rels_name = posixpath.join(directory, "_rels", f"{name}.rels")
+        if rels_name not in self.package.namelist():
+            return {}
+
+        with self.package.open(rels_name) as f:
+            root = parse(f).getroot()
+
+        rels = {}
+        for element in root.iter(f"{PKG}Relationship"):
+            target = element.get("Target", "")
+            external = element.get("TargetMode") == "External"
+            part = None
+            if not external:
+                part = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join(directory, target))
+            rels[element.get("Id")] = Relationship(element.get("Type", ""), target, external, part)
+        return rels
+
+    def read_part(self, rel: Relationship) -> Optional[bytes]:
+        """
+        Reads the bytes of an internal relationship target, such as an image.
+
+        :param rel: The relationship.
+        :return: The target's bytes, or None for external or missing targets.
+        """
+        if rel.external or rel.part_name not in self.package.namelist():
+            return None
+        return self.package.read(rel.part_name)
+
+    def iter_children(self, part_name: str, depth: int) -> Iterator:
+        """
+        Streams the elements found at a given depth of an XML part.
+
+        Each element is yielded once fully parsed and then cleared, so memory
+        use is bounded by the largest single element rather than the whole part.
+
+        :param part_name: Zip member name of the XML part.
+        :param depth: Depth of the elements to yield; the root element is depth 1.
+        :return: Iterator of elements.
+        """
+        with self.package.open(part_name) as f:
+            level = 0
+            parent = None
+            for event, element in iterparse(f, events=("start", "end")):
+                if event == "start":
+                    level += 1
+                    if level == depth - 1:
+                        parent = element
+                    continue
+                if level == depth:
+                    yield element
+                    parent.remove(element)  # Drop the parsed subtree
+                level -= 1
+
+
+def _docx_run_text(run) -> str:
+    """
+    Text of a w:r element, matching python-docx's Run.text.
+    """
+    parts = []
+    for child in run:
+        if child.tag == f"{W}t":
+            parts.append(child.text or "")
+        elif child.tag in (f"{W}tab", f"{W}ptab"):
+            parts.append("\t")
+        elif child.tag == f"{W}cr":
+            parts.append("\n")
+        elif child.tag == f"{W}br":
+            parts.append("\n" if child.get(f"{W}type", "textWrapping") == "textWrapping" else "")
+        elif child.tag == f"{W}noBreakHyphen":
+            parts.append("-")
+    return "".join(parts)
+
+
+def _docx_paragraph_text(paragraph) -> str:
+    """
+    Text of a w:p element, matching python-docx's Paragraph.text.
+    """
+    parts = []
+    for child in paragraph:
+        if child.tag == f"{W}r":
+            parts.append(_docx_run_text(child))
+        elif child.tag == f"{W}hyperlink":
+            parts.extend(_docx_run_text(run) for run in child.findall(f"{W}r"))
+    return "".join(parts)
+
+
+def _docx_table(table) -> List[List[str]]:
+    """
+    Cell texts of a w:tbl element, matching python-docx's row.cells.
+
+    Horizontally merged cells repeat once per spanned grid column, and
+    vertically merged continuation cells repeat the text of the cell above.
+    """
+    rows = []
+    above: Dict[int, Tuple[str, int]] = {}  # Grid offset -> (text, span) in the previous row
+    for tr in table.findall(f"{W}tr"):
+        grid_before = tr.find(f"{W}trPr/{W}gridBefore")
+        offset = int(grid_before.get(f"{W}val", "0")) if grid_before is not None else 0
+        cells, current = [], {}
+        for tc in tr.findall(f"{W}tc"):
+            span_element = tc.find(f"{W}tcPr/{W}gridSpan")
+            span = int(span_element.get(f"{W}val", "1")) if span_element is not None else 1
+            v_merge = tc.find(f"{W}tcPr/{W}vMerge")
+            if v_merge is not None and v_merge.get(f"{W}val", "continue") == "continue" and offset in above:
+                text, span = above[offset]
+            else:
+                text = "\n".join(_docx_paragraph_text(p) for p in tc.findall(f"{W}p"))
+            current[offset] = (text, span)
+            cells.extend([text] * span)
+            offset += span
+        rows.append(cells)
+        above = current
+    return rows
+
+
+class FastDOCXDocument(FastOOXMLDocument):
+    """
+    Streams a DOCX body without building python-docx's object model.
+    """
+
+    paged = False
+
+    def iter_units(self, wanted: Optional[Set[int]] = None, fields: Optional[Set[str]] = None) -> Iterator[Unit]:
+        if wanted is not None and 0 not in wanted:
+            return
+        fields = FIELDS if fields is None else fields
+        main = self.main_part()
+        texts, links, images, tables = [], [], [], []
+        if "text" in fields or "tables" in fields:
+            # document -> body -> paragraphs and tables at depth 3
+            for element in self.iter_children(main, depth=3):
+                if element.tag == f"{W}p" and "text" in fields:
+                    texts.append(_docx_paragraph_text(element))
+                elif element.tag == f"{W}tbl" and "tables" in fields:
+                    tables.append(_docx_table(element))
+
+        if "links" in fields or "images" in fields:
+            for rel in self.relationships(main).values():
+                if "hyperlink" in rel.rel_type and "links" in fields:
+                    links.append(rel.target)
+                elif "image" in rel.rel_type and "images" in fields:
+                    blob = self.read_part(rel)
+                    if blob is not None:
+                        images.append(blob)
+
+        yield 0, texts, links, images, tables
+
+
+def _pptx_paragraph_text(paragraph) -> str:
+    """
+    Text of an a:p element, matching python-pptx's _Paragraph.text.
+    """
+    parts = []
+    for child in paragraph:
+        if child.tag in (f"{A}r", f"{A}fld"):
+            parts.append(child.findtext(f"{A}t", default=""))
+        elif child.tag == f"{A}br":
+            parts.append("\v")
+    return "".join(parts)
+
+
+def _pptx_text_body(body) -> str:
+    """
+    Text of a p:txBody or a:txBody element, matching python-pptx's TextFrame.text.
+    """
+    if body is None:
+        return ""
+    return "\n".join(_pptx_paragraph_text(p) for p in body.findall(f"{A}p"))
+
+
+class FastPPTXDocument(FastOOXMLDocument):
+    """
+    Streams PPTX slides without building python-pptx's object model.
+    """
+
+    def slide_parts(self) -> List[Tuple[str, Dict[str, Relationship]]]:
+        """
+        Lists the slides in presentation order.
+
+        :return: List of (slide zip member, slide relationships).
+        """
+        main = self.main_part()
+        rels = self.relationships(main)
+        with self.package.open(main) as f:
+            root = parse(f).getroot()
+        slides = []
+        for slide_id in root.iter(f"{P}sldId"):
+            part_name = rels[slide_id.get(f"{R}id")].part_name
+            slides.append((part_name, self.relationships(part_name)))
+        return slides
+
+    def iter_units(self, wanted: Optional[Set[int]] = None, fields: Optional[Set[str]] = None) -> Iterator[Unit]:
+        fields = FIELDS if fields is None else fields
+        for index, (part_name, rels) in enumerate(self.slide_parts()):
+            if wanted is not None and index not in wanted:
+                continue
+            texts, links, images, tables = [], [], [], []
+            # sld -> cSld -> spTree -> top-level shapes at depth 4
+            for shape in self.iter_children(part_name, depth=4):
+                if shape.tag not in SHAPE_TAGS:
+                    continue
+                properties = shape.find(f"*/{P}cNvPr")
+                click = properties.find(f"{A}hlinkClick") if properties is not None else None
+                if click is not None and click.get(f"{R}id") in rels and "links" in fields:
+                    links.append(rels[click.get(f"{R}id")].target)
+
+                if shape.tag == f"{P}sp" and "text" in fields:
+                    texts.append(_pptx_text_body(shape.find(f"{P}txBody")))
+                elif shape.tag == f"{P}pic" and "images" in fields:
+                    blip = shape.find(f"{P}blipFill/{A}blip")
+                    rel = rels.get(blip.get(f"{R}embed")) if blip is not None else None
+                    blob = self.read_part(rel) if rel is not None else None
+                    if blob is not None:
+                        images.append(blob)
+                elif shape.tag == f"{P}graphicFrame" and "tables" in fields:
+                    table = shape.find(f"{A}graphic/{A}graphicData/{A}tbl")
+                    if table is not None:
+                        tables.append([
+                            [_pptx_text_body(tc.find(f"{A}txBody")) for tc in tr.findall(f"{A}tc")]
+                            for tr in table.findall(f"{A}tr")
+                        ])
+            yield index, texts, links, images, tables
@@ -1,5 +1,12 @@
-from src.loaders.file_loader import FileLoader
-import fitz  # PyMuPDF
+import logging
+from typing import TYPE_CHECKING
+from src.loaders.file_loader import LOAD_ERRORS, DocumentData, FileLoader, read_signature
+from src.instrumentation.metrics import count_file, instrumented
+
+if TYPE_CHECKING:
+    import fitz  # PyMuPDF; imported by load_file() on first use
+
+logger = logging.getLogger(__name__)
 
 class PDFLoader(FileLoader):
     """
@@ -8,34 +15,55 @@ class PDFLoader(FileLoader):
     This class validates and loads a PDF file using PyMuPDF (fitz).
     """
 
-    def __init__(self, file_path: str) -> None:
+    FORMAT = "pdf"
+    EXTENSIONS = (".pdf",)
+
+    def __init__(self, file_path: str | None = None, data: DocumentData | None = None) -> None:
         """
         Initialize the PDFLoader with a file path.
 
-        :param file_path: Path to the PDF file.
+        :param file_path: Path to the PDF file. May be omitted when data is given.
+        :param data: The PDF's contents as bytes, a buffer, an mmap, or a binary file object.
         """
-        super().__init__(file_path)  # Call parent constructor
+        super().__init__(file_path, data)  # Call parent constructor
+
+    @classmethod
+    def sniff(cls, header: bytes, content_types: str | None) -> bool:
+        """
+        PDFs carry a "%PDF-" marker, which readers accept anywhere in the first KiB.
+        """
+        return b"%PDF-" in header
 
     def validate_file(self) -> bool:
         """
         Validate if the file is a proper PDF format.
 
-        :return: True if the file is a valid PDF, False otherwise.
+        :return: True if the file starts with a PDF signature, False otherwise.
+        :raises OSError: If the file cannot be read.
         """
-        return self.file_path.lower().endswith(".pdf")  # Simple format check
+        return self.sniff(*read_signature(self.file_path, self.data))  # Magic-byte check
 
-    def load_file(self) -> fitz.Document | None:
+    @instrumented("load_file", measure=count_file)
+    def load_file(self) -> "fitz.Document | None":
         """
         Loads the PDF file and returns a PyMuPDF document object.
 
         :return: A fitz.Document object if successful, else None.
         """
+        if not self.check_signature("Not a PDF file"):
+            return None
+
         try:
-            document = fitz.open(self.file_path)  # Open PDF file
-            print("PDF successfully loaded")
+            import fitz  # PyMuPDF
+
+            if self.data is not None:
+                document = fitz.open(stream=self.data, filetype="pdf")  # Reads the buffer in place
+            else:
+                document = fitz.open(self.file_path)  # Open PDF file
+            logger.debug("PDF successfully loaded: %s", self.file_path)
             return document
-        except Exception as e:
-            print(f"Error loading PDF: {e}")  # Handle exceptions gracefully
+        except LOAD_ERRORS as e:  # fitz.FileDataError is a RuntimeError
+            self.load_failed(f"{type(e).__name__}: {e}")
             return None
 
         
@@ -1,30 +1,63 @@
 # PPT Loader
 
-from .file_loader import FileLoader
+from .file_loader import LOAD_ERRORS, FileLoader, read_signature
+from .ooxml_fast import FastPPTXDocument
+from src.instrumentation.metrics import count_file, instrumented
 
-from pptx import Presentation
-import os
+import logging
 
-class PPTLoader:
-    def __init__(self, file_path):
-        """Loads and processes a PPTX file."""
-        self.file_path = file_path
-        self.document = self.load_file()
+logger = logging.getLogger(__name__)
 
+class PPTLoader(FileLoader):
+    FORMAT = "pptx"
+    EXTENSIONS = (".pptx",)
+    ENGINES = ("python-pptx", "fast")
+
+    # Main-part content types of presentations, shows, templates, and macro-enabled presentations
+    CONTENT_TYPES = (
+        "application/vnd.openxmlformats-officedocument.presentationml.presentation.main+xml",
+        "application/vnd.openxmlformats-officedocument.presentationml.slideshow.main+xml",
+        "application/vnd.openxmlformats-officedocument.presentationml.template.main+xml",
+        "application/vnd.ms-powerpoint.presentation.macroEnabled.main+xml",
+    )
+
+    def __init__(self, file_path=None, engine="python-pptx", data=None):
+        """
+        Stores the path of a PPTX file; it is loaded on first access to document.
+
+        engine="fast" reads slides with the streaming FastPPTXDocument instead of python-pptx.
+        data holds the file's contents (bytes, a buffer, an mmap, or a binary file object)
+        when they are already in memory; file_path may then be omitted.
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unsupported PPTX engine: '{engine}'")
+        super().__init__(file_path, data)
+        self.engine = engine
+
+    @classmethod
+    def sniff(cls, header, content_types):
+        """PPTX files are ZIP packages whose content types declare a PresentationML main part."""
+        return content_types is not None and any(t in content_types for t in cls.CONTENT_TYPES)
+
+    def validate_file(self) -> bool:
+        """Checks the file's signature: a ZIP package holding a presentation."""
+        return self.sniff(*read_signature(self.file_path, self.data))
+
+    @instrumented("load_file", measure=count_file)
     def load_file(self):
-        """Loads a PPTX file, ensuring it exists before processing."""
-        if not os.path.exists(self.file_path):
-            print(f"Error: PPT file '{self.file_path}' not found! Please check the path.")
-            return None  # Return None instead of crashing
-        
-        if not self.file_path.endswith(".pptx"):
-            print(f"Error: Unsupported file format '{self.file_path}'. Convert it to .pptx")
+        """Loads a PPTX file, after checking that it exists and is a presentation."""
+        if not self.check_signature("Not a PPTX file; convert it to .pptx"):
             return None
 
         try:
-            return Presentation(self.file_path)  # Load the PPTX file
-        except Exception as e:
-            print(f"Error loading PPT: {e}")
+            source = self.open_source()
+            if self.engine == "fast":
+                return FastPPTXDocument(source)
+            from pptx import Presentation  # Imported on first use to keep start-up fast
+
+            return Presentation(source)  # Load the PPTX file
+        except LOAD_ERRORS as e:
+            self.load_failed(f"{type(e).__name__}: {e}")
             return None  # Handle corrupt files
 
 
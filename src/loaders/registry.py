@@ -0,0 +1,128 @@
+# Loader registry
+
+import os
+from typing import Dict, List, Optional, Set, Type
+from src.loaders.file_loader import DocumentData, FileLoader, as_buffer, read_signature
+from src.loaders.pdf_loader import PDFLoader
+from src.loaders.docx_loader import DOCXLoader
+from src.loaders.ppt_loader import PPTLoader
+
+
+class UnsupportedFormatError(ValueError):
+    """
+    Raised when a file's signature matches no registered loader.
+    """
+
+
+class LoaderRegistry:
+    """
+    Picks the FileLoader for a file from its magic bytes rather than its name.
+
+    Only the first KiB of the file (plus [Content_Types].xml for ZIP packages)
+    is read, so misnamed or corrupt inputs are rejected before any parser runs.
+    New formats plug in by registering a FileLoader subclass that implements
+    sniff() and sets FORMAT and EXTENSIONS.
+    """
+
+    def __init__(self) -> None:
+        self._loaders: Dict[str, Type[FileLoader]] = {}  # Format name -> loader class, in registration order
+
+    def register(self, loader_cls: Type[FileLoader]) -> Type[FileLoader]:
+        """
+        Registers a loader class under its FORMAT name.
+
+        Can be used as a class decorator.
+
+        :param loader_cls: A FileLoader subclass with FORMAT set and sniff() implemented.
+        :return: The same class.
+        :raises ValueError: If the class has no FORMAT.
+        """
+        if not loader_cls.FORMAT:
+            raise ValueError(f"{loader_cls.__name__} has no FORMAT")
+        self._loaders[loader_cls.FORMAT] = loader_cls
+        return loader_cls
+
+    @property
+    def formats(self) -> List[str]:
+        """Registered format names."""
+        return list(self._loaders)
+
+    @property
+    def extensions(self) -> Set[str]:
+        """File extensions of every registered format, lower-case with the dot."""
+        return {ext for loader_cls in self._loaders.values() for ext in loader_cls.EXTENSIONS}
+
+    def loader_class(self, format_name: str) -> Type[FileLoader]:
+        """
+        Looks up the loader registered for a format.
+
+        :param format_name: A format name, e.g. "pdf".
+        :return: The loader class.
+        :raises UnsupportedFormatError: If no loader is registered for the format.
+        """
+        try:
+            return self._loaders[format_name]
+        except KeyError:
+            raise UnsupportedFormatError(f"No loader registered for format '{format_name}'") from None
+
+    def detect(self, file_path: Optional[str], data: Optional[DocumentData] = None) -> Optional[str]:
+        """
+        Identifies a file's format from its signature.
+
+        :param file_path: Path to the file; ignored when data is given.
+        :param data: The file's contents, if already in memory. A file object passed
+                     here is consumed; loader_for() handles that case itself.
+        :return: The format name, or None if no registered loader recognizes the file.
+        :raises OSError: If the file is missing or cannot be read.
+        """
+        header, content_types = read_signature(file_path, None if data is None else as_buffer(data))
+        for format_name, loader_cls in self._loaders.items():
+            if loader_cls.sniff(header, content_types):
+                return format_name
+        return None
+
+    def loader_for(
+        self, file_path: Optional[str] = None, data: Optional[DocumentData] = None, **options
+    ) -> FileLoader:
+        """
+        Creates the loader matching a file's signature.
+
+        :param file_path: Path to the file. May be omitted when data is given.
+        :param data: The file's contents (bytes, a buffer, an mmap, or a binary file object),
+                     if already in memory.
+        :param options: Extra loader arguments, e.g. engine="fast".
+        :return: A loader instance for the file.
+        :raises UnsupportedFormatError: If the file's signature is not recognized.
+        :raises OSError: If the file is missing or cannot be read.
+        """
+        if data is not None:
+            data = as_buffer(data)  # Once, so a stream is not consumed by detection
+        format_name = self.detect(file_path, data)
+        if format_name is None:
+            extension = os.path.splitext(file_path or "")[1].lower()
+            raise UnsupportedFormatError(
+                f"Unrecognized file signature: '{file_path or '<memory>'}' ({extension or 'no extension'})"
+            )
+        return self._loaders[format_name](file_path, data=data, **options)
+
+
+# Registry with the built-in loaders, used by the batch and pipeline helpers
+registry = LoaderRegistry()
+registry.register(PDFLoader)
+registry.register(DOCXLoader)
+registry.register(PPTLoader)
+
+
+def loader_for(file_path: Optional[str] = None, data: Optional[DocumentData] = None, **options) -> FileLoader:
+    """
+    Creates the loader matching a file's signature using the default registry.
+
+    :param file_path: Path to the file. May be omitted when data is given.
+    :param data: The file's contents (bytes, a buffer, an mmap, or a binary file object),
+                 if already in memory.
+    :param options: Extra loader arguments, e.g. engine="fast".
+    :return: A loader instance for the file.
+    :raises UnsupportedFormatError: If the file's signature is not recognized.
+    :raises OSError: If the file is missing or cannot be read.
+    """
+    return registry.loader_for(file_path, data, **options)
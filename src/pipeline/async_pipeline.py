@@ -0,0 +1,192 @@
+import os
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterable, List, Optional, Union
+from src.extractors.data_extractor import DataExtractor, ExtractionResult
+from src.loaders.registry import loader_for
+from src.pipeline.batch_extractor import BatchExtractor, BatchReport
+from src.pipeline.governed import ExtractionLimits, GovernedExtractor, governed_pool
+
+logger = logging.getLogger(__name__)
+
+
+def _read_file(file_path: str) -> bytes:
+    """
+    Reads a whole file; run in a thread by the read stage.
+
+    :param file_path: Path to the document.
+    :return: The file's bytes.
+    """
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+def _extract_bytes(file_path: str, data: bytes) -> ExtractionResult:
+    """
+    Executor entry point: extracts a document from bytes already read.
+
+    :param file_path: Path the bytes were read from; used for the file type and result source.
+    :param data: The document's bytes.
+    :return: The ExtractionResult.
+    :raises ValueError: If the document cannot be opened.
+    """
+    with DataExtractor(loader_for(file_path, data)) as extractor:
+        if not extractor.document:
+            raise ValueError(extractor.file_loader.load_error or "Could not load file")
+        return extractor.extract_all()
+
+
+class AsyncPipeline:
+    """
+    Ingests documents through concurrent read, extract, and store stages.
+
+    Stages are connected by bounded asyncio queues: when a stage falls behind,
+    the queue feeding it fills up and the stages upstream wait, so memory use
+    stays bounded by the queue sizes. File reads and storage writes run in
+    threads, and extraction runs in an executor (a process pool by default),
+    so disk I/O and SQLite commits overlap with parsing.
+
+    Every extracted result is handed to each sink. A sink is any storage with
+    save_result(), such as FileStorage or SQLStorage.
+    """
+
+    def __init__(
+        self,
+        sinks: List,
+        read_concurrency: int = 4,
+        extract_concurrency: Optional[int] = None,
+        store_concurrency: int = 1,
+        queue_size: int = 8,
+        executor: Optional[Executor] = None,
+        limits: Optional[ExtractionLimits] = None,
+    ) -> None:
+        """
+        Initialize the AsyncPipeline.
+
+        :param sinks: Storages that receive every result, e.g. [FileStorage(), SQLStorage("db.sqlite")].
+        :param read_concurrency: Number of files read at the same time.
+        :param extract_concurrency: Number of documents extracted at the same time
+                                    (defaults to the CPU count).
+        :param store_concurrency: Number of concurrent writers per sink. Keep this at 1
+                                  for SQLStorage, which writes through a single connection;
+                                  ShardStorage serializes its writes and accepts several.
+        :param queue_size: Capacity of each queue between stages.
+        :param executor: Executor for extraction; a process pool sized to extract_concurrency
+                         is created and shut down per run if omitted.
+        :param limits: Per-document time, memory, page, and image-byte limits. When given,
+                       each document is extracted in its own GovernedExtractor process, driven
+                       from a thread pool (or from executor, which must then run threads).
+        """
+        self.sinks = sinks
+        self.read_concurrency = read_concurrency
+        self.extract_concurrency = extract_concurrency or os.cpu_count() or 1
+        self.store_concurrency = store_concurrency
+        self.queue_size = queue_size
+        self.executor = executor
+        self.limits = limits
+
+    def run_sync(self, source: Union[str, Iterable[str]]) -> BatchReport:
+        """
+        Runs the pipeline from synchronous code.
+
+        :param source: A directory, a glob pattern, or an iterable of file paths.
+        :return: A BatchReport listing succeeded and failed files.
+        """
+        return asyncio.run(self.run(source))
+
+    async def run(self, source: Union[str, Iterable[str]]) -> BatchReport:
+        """
+        Reads, extracts, and stores every file from the source.
+
+        A file succeeds once every sink has stored it; the first error from any
+        stage is reported for files that fail.
+
+        :param source: A directory, a glob pattern, or an iterable of file paths.
+        :return: A BatchReport listing succeeded and failed files.
+        """
+        files = BatchExtractor().collect_files(source) if isinstance(source, str) else list(source)
+        report = BatchReport()
+        stored = dict.fromkeys(files, 0)  # file path -> number of sinks that saved it
+        truncated = {}  # file path -> limit hit
+
+        paths = asyncio.Queue(self.queue_size)
+        blobs = asyncio.Queue(self.queue_size)
+        outboxes = [asyncio.Queue(self.queue_size) for _ in self.sinks]
+
+        loop = asyncio.get_running_loop()
+        if self.limits is not None:
+            executor = self.executor or governed_pool(self.extract_concurrency)
+            extract_bytes = GovernedExtractor(self.limits).extract
+        else:
+            executor = self.executor or ProcessPoolExecutor(max_workers=self.extract_concurrency)
+            extract_bytes = _extract_bytes
+
+        def fail(file_path: str, error: str) -> None:
+            if file_path not in report.failed:
+                report.failed[file_path] = error
+                logger.error("Error processing '%s': %s", file_path, error)
+
+        async def produce() -> None:
+            for file_path in files:
+                await paths.put(file_path)
+
+        async def read() -> None:
+            while (file_path := await paths.get()) is not None:
+                try:
+                    data = await asyncio.to_thread(_read_file, file_path)
+                except OSError as e:
+                    fail(file_path, f"{type(e).__name__}: {e}")
+                    continue
+                await blobs.put((file_path, data))
+
+        async def extract() -> None:
+            while (item := await blobs.get()) is not None:
+                file_path, data = item
+                try:
+                    result = await loop.run_in_executor(executor, extract_bytes, file_path, data)
+                except Exception as e:
+                    fail(file_path, f"{type(e).__name__}: {e}")
+                    continue
+                if result.truncated:
+                    truncated[file_path] = result.truncated
+                for outbox in outboxes:
+                    await outbox.put(result)
+
+        async def store(sink, outbox: asyncio.Queue) -> None:
+            while (result := await outbox.get()) is not None:
+                try:
+                    saved = await asyncio.to_thread(sink.save_result, result)
+                except Exception as e:
+                    fail(result.source, f"{type(e).__name__}: {e}")
+                    continue
+                if saved:
+                    stored[result.source] += 1
+                else:
+                    fail(result.source, "Storage rejected result")
+
+        async def stage(workers: list, queues: List[asyncio.Queue], consumers: int) -> None:
+            # Once every worker of a stage is done, tell each consumer downstream to stop
+            await asyncio.gather(*workers)
+            for queue in queues:
+                for _ in range(consumers):
+                    await queue.put(None)
+
+        try:
+            await asyncio.gather(
+                stage([produce()], [paths], self.read_concurrency),
+                stage([read() for _ in range(self.read_concurrency)], [blobs], self.extract_concurrency),
+                stage([extract() for _ in range(self.extract_concurrency)], outboxes, self.store_concurrency),
+                *(store(sink, outbox) for sink, outbox in zip(self.sinks, outboxes) for _ in range(self.store_concurrency)),
+            )
+        finally:
+            if self.executor is None:
+                executor.shutdown()
+
+        report.succeeded = [
+            file_path for file_path in files
+            if file_path not in report.failed and stored[file_path] == len(self.sinks)
+        ]
+        report.truncated = {file_path: truncated[file_path] for file_path in report.succeeded if file_path in truncated}
+        logger.info("Pipeline finished: %d succeeded, %d failed", len(report.succeeded), len(report.failed))
+        return report
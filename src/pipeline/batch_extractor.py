@@ -0,0 +1,170 @@
+import os
+import glob
+import logging
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.extractors.data_extractor import DataExtractor, ExtractionResult
+from src.loaders.registry import loader_for, registry
+from src.pipeline.governed import ExtractionLimits, GovernedExtractor, governed_pool
+
+logger = logging.getLogger(__name__)
+
+
+def _extract_file(file_path: str) -> Tuple[str, Optional[ExtractionResult], Optional[str]]:
+    """
+    Worker entry point: loads and extracts a single file.
+
+    Errors are returned as strings rather than raised so one bad file
+    never takes down the pool.
+
+    :param file_path: Path to the document.
+    :return: Tuple of (file path, result or None, error message or None).
+    """
+    try:
+        extractor = DataExtractor(loader_for(file_path))
+        if not extractor.document:
+            return file_path, None, extractor.file_loader.load_error or "Could not load file"
+        return file_path, extractor.extract_all(), None
+    except Exception as e:
+        return file_path, None, f"{type(e).__name__}: {e}"
+
+
+def _extract_governed(
+    governed: GovernedExtractor, file_path: str
+) -> Tuple[str, Optional[ExtractionResult], Optional[str]]:
+    """
+    Thread entry point: extracts a single file in its own governed worker process.
+
+    :param governed: The GovernedExtractor applying the batch's limits.
+    :param file_path: Path to the document.
+    :return: Tuple of (file path, result or None, error message or None).
+    """
+    try:
+        return file_path, governed.extract(file_path), None
+    except Exception as e:
+        return file_path, None, f"{type(e).__name__}: {e}"
+
+
+@dataclass
+class BatchReport:
+    """
+    Outcome of a batch run.
+    """
+
+    succeeded: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)  # file path -> error message
+    truncated: Dict[str, str] = field(default_factory=dict)  # file path -> limit hit; also in succeeded
+
+
+class BatchExtractor:
+    """
+    Extracts many documents in parallel using a process pool.
+
+    PyMuPDF, python-docx and python-pptx parsing is CPU-bound and holds the GIL,
+    so files are fanned out to worker processes. Results come back to the calling
+    process, which is the single writer to the storage backend.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        limits: Optional[ExtractionLimits] = None,
+    ) -> None:
+        """
+        Initialize the BatchExtractor.
+
+        :param max_workers: Number of worker processes (defaults to the CPU count).
+        :param max_in_flight: Maximum number of files submitted but not yet collected
+                              (defaults to twice the number of workers).
+        :param limits: Per-document time, memory, page, and image-byte limits. When given,
+                       each file is extracted in its own GovernedExtractor process, which is
+                       stopped when a limit is hit, and the partial result is kept.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or 2 * self.max_workers
+        self.limits = limits
+
+    def collect_files(self, source: str) -> List[str]:
+        """
+        Lists the supported documents under a directory or matching a glob pattern.
+
+        Files are picked by extension here; each file's signature is checked when
+        its loader is created, so misnamed files fail fast in the worker.
+
+        :param source: A directory (searched recursively) or a glob pattern.
+        :return: Sorted list of file paths.
+        """
+        if os.path.isdir(source):
+            paths = [
+                os.path.join(root, name)
+                for root, _, names in os.walk(source)
+                for name in names
+            ]
+        else:
+            paths = glob.glob(source, recursive=True)
+
+        return sorted(
+            path for path in paths
+            if os.path.isfile(path) and os.path.splitext(path)[1].lower() in registry.extensions
+        )
+
+    def iter_results(self, source: str) -> Iterator[Tuple[str, Optional[ExtractionResult], Optional[str]]]:
+        """
+        Extracts every file from the source, yielding results as they complete.
+
+        At most max_in_flight files are queued at a time, so memory use does not
+        grow with the size of the batch.
+
+        :param source: A directory or glob pattern.
+        :return: Iterator of (file path, result or None, error message or None).
+        """
+        files = iter(self.collect_files(source))
+        if self.limits is not None:
+            pool = governed_pool(self.max_workers)
+            governed = GovernedExtractor(self.limits)
+            submit = lambda file_path: pool.submit(_extract_governed, governed, file_path)  # noqa: E731
+        else:
+            pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            submit = lambda file_path: pool.submit(_extract_file, file_path)  # noqa: E731
+
+        with pool:
+            pending = set()
+            for file_path in files:
+                pending.add(submit(file_path))
+                if len(pending) >= self.max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+
+            for future in wait(pending).done:
+                yield future.result()
+
+    def run(self, source: str, storage) -> BatchReport:
+        """
+        Extracts every file from the source and saves the results.
+
+        :param source: A directory or glob pattern.
+        :param storage: A FileStorage or SQLStorage (anything with save_result()).
+        :return: A BatchReport listing succeeded and failed files.
+        """
+        report = BatchReport()
+        for file_path, result, error in self.iter_results(source):
+            if error is None:
+                try:
+                    if not storage.save_result(result):
+                        error = "Storage rejected result"
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+
+            if error is None:
+                report.succeeded.append(file_path)
+                if result.truncated:
+                    report.truncated[file_path] = result.truncated
+            else:
+                report.failed[file_path] = error
+                logger.error("Error processing '%s': %s", file_path, error)
+
+        logger.info("Batch finished: %d succeeded, %d failed", len(report.succeeded), len(report.failed))
+        return report
@@ -0,0 +1,261 @@
+import os
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from src.extractors.data_extractor import DataExtractor, ExtractionResult
+from src.extractors.records import field_mask
+from src.loaders.registry import loader_for
+
+logger = logging.getLogger(__name__)
+
+# Seconds between the parent's checks of the worker's run time and memory
+POLL_INTERVAL = 0.05
+
+# Reasons reported in ExtractionResult.truncated
+TIMEOUT = "timeout"
+MEMORY = "memory"
+MAX_PAGES = "max_pages"
+MAX_IMAGE_BYTES = "max_image_bytes"
+CRASHED = "crashed"
+
+# Modules the fork server imports once, so each governed worker forked from it starts warm
+FORKSERVER_PRELOAD = ["fitz", "docx", "pptx", "src.pipeline.governed"]
+
+
+@dataclass
+class ExtractionLimits:
+    """
+    Per-document resource limits. None disables a limit.
+    """
+
+    max_seconds: Optional[float] = None  # Wall-clock time for the whole document
+    max_rss_mb: Optional[float] = None  # Resident memory of the worker process
+    max_pages: Optional[int] = None  # Pages or slides extracted
+    max_image_bytes: Optional[int] = None  # Total size of the images kept
+
+
+def process_rss(pid: int) -> Optional[int]:
+    """
+    Returns the current resident set size of a process.
+
+    :param pid: Process ID.
+    :return: RSS in bytes, or None where /proc is not available.
+    """
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _page_budget(handler, pages: Optional[List[int]], max_pages: Optional[int]) -> Tuple[Optional[List[int]], bool]:
+    """
+    Narrows a page selection to the page limit, so no page past it is parsed.
+
+    :param handler: FormatHandler of the loaded document.
+    :param pages: Sorted page indices to extract, or None for all pages.
+    :param max_pages: The page limit, or None.
+    :return: Tuple of (page indices to extract or None for all, whether the limit cut pages off).
+    """
+    if max_pages is None or handler.page_count is None:
+        return pages, False
+    available = range(handler.page_count) if pages is None else [i for i in pages if 0 <= i < handler.page_count]
+    if len(available) <= max_pages:
+        return pages, False
+    return list(available[:max_pages]), True
+
+
+def _governed_worker(conn, file_path, data, pages, fields, limits: ExtractionLimits) -> None:
+    """
+    Worker process entry point: streams page records to the parent as they are extracted.
+
+    Page and image-byte budgets are enforced here, between pages. Time and
+    memory are watched by the parent, which kills this process when they run
+    out; the pages already sent survive that.
+
+    Messages are ("paged", whether the records are real pages), then
+    ("page", PageRecord) per page, ("done", truncation reason or None), and
+    ("error", message).
+    """
+    if limits.max_rss_mb is not None and process_rss(os.getpid()) is None and resource is not None:
+        # The parent cannot watch RSS without /proc; cap the address space instead
+        cap = int(limits.max_rss_mb * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_AS, (cap, cap))
+
+    truncated = None
+    try:
+        with DataExtractor(loader_for(file_path, data)) as extractor:
+            if not extractor.document:
+                conn.send(("error", extractor.file_loader.load_error or "Could not load file"))
+                return
+            conn.send(("paged", extractor.handler.paged))
+            pages, cut = _page_budget(extractor.handler, pages, limits.max_pages)
+            page_count = image_bytes = 0
+            for record in extractor.iter_pages(pages=pages, fields=fields):
+                if limits.max_pages is not None and page_count >= limits.max_pages:
+                    # Only for handlers that cannot count their pages up front
+                    truncated = MAX_PAGES
+                    break
+                if limits.max_image_bytes is not None and record.images:
+                    kept = []
+                    for image in record.images:
+                        if truncated or image_bytes + len(image) > limits.max_image_bytes:
+                            truncated = MAX_IMAGE_BYTES  # Keep extracting the other fields
+                            break
+                        image_bytes += len(image)
+                        kept.append(image)
+                    record.images = kept
+                conn.send(("page", record))
+                page_count += 1
+            if cut and truncated is None:
+                truncated = MAX_PAGES
+        conn.send(("done", truncated))
+    except MemoryError:
+        conn.send(("done", MEMORY))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+class GovernedExtractor:
+    """
+    Extracts documents in worker processes under per-document resource limits.
+
+    Each document is extracted in its own subprocess, which sends page records
+    back as they are produced. The parent stops the worker when the document
+    exceeds its time or memory limit, and the worker itself stops once the page
+    limit is reached or stops keeping images once the image-byte budget is
+    spent. Either way the pages extracted so far are returned, with
+    ExtractionResult.truncated naming the limit that was hit, so one hostile or
+    broken file cannot stall a batch.
+    """
+
+    def __init__(self, limits: ExtractionLimits, start_method: Optional[str] = None) -> None:
+        """
+        Initialize the GovernedExtractor.
+
+        :param limits: The limits applied to every document.
+        :param start_method: multiprocessing start method for the workers. Defaults to "forkserver"
+                             where available and "spawn" elsewhere, because callers start workers
+                             from threads and a plain fork could copy a lock another thread holds.
+        """
+        self.limits = limits
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            self.context.set_forkserver_preload(FORKSERVER_PRELOAD)
+
+    def extract(
+        self,
+        file_path: Optional[str] = None,
+        data: Optional[bytes] = None,
+        pages: Optional[Iterable[int]] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> ExtractionResult:
+        """
+        Extracts a document under the limits.
+
+        :param file_path: Path to the document. When data is given it only names the document.
+        :param data: The document's bytes, instead of reading file_path.
+        :param pages: Zero-based page or slide indices to extract; all pages if omitted.
+        :param fields: Names of the fields to extract, e.g. ["text"]; all if omitted.
+        :return: The ExtractionResult, with truncated set if a limit was hit.
+        :raises ValueError: If the document cannot be opened or extraction failed before the first page.
+        :raises RuntimeError: If the worker died before extracting any page.
+        """
+        mask = field_mask(fields)
+        pages = None if pages is None else sorted(set(pages))
+        receiver, sender = self.context.Pipe(duplex=False)
+        worker = self.context.Process(
+            target=_governed_worker, args=(sender, file_path, data, pages, sorted(mask), self.limits), daemon=True
+        )
+        worker.start()
+        sender.close()  # Only the worker writes; recv() raises EOFError once it is gone
+
+        result = ExtractionResult(source=file_path)
+        texts = []
+        page_count = 0
+        paged = False
+        error = None
+        deadline = time.monotonic() + self.limits.max_seconds if self.limits.max_seconds is not None else None
+        max_rss = self.limits.max_rss_mb * 1024 * 1024 if self.limits.max_rss_mb is not None else None
+        try:
+            while True:
+                timeout = POLL_INTERVAL
+                if deadline is not None:
+                    timeout = min(timeout, deadline - time.monotonic())
+                    if timeout <= 0:
+                        result.truncated = TIMEOUT
+                        break
+                if max_rss is not None and (process_rss(worker.pid) or 0) > max_rss:
+                    result.truncated = MEMORY
+                    break
+                if not receiver.poll(timeout):
+                    continue
+
+                try:
+                    kind, payload = receiver.recv()
+                except EOFError:
+                    worker.join()
+                    if not page_count:
+                        raise RuntimeError(f"Extraction worker exited with code {worker.exitcode}") from None
+                    result.truncated = CRASHED
+                    break
+                if kind == "page":
+                    texts.append(payload.text)
+                    result.links.extend(payload.links)
+                    result.images.extend(payload.images)
+                    result.tables.extend(payload.tables)
+                    if paged:
+                        result.pages.append(payload)
+                    page_count += 1
+                elif kind == "paged":
+                    paged = payload
+                elif kind == "done":
+                    result.truncated = payload
+                    break
+                else:
+                    error = payload
+                    break
+        finally:
+            receiver.close()
+            if worker.is_alive():
+                worker.kill()
+            worker.join()
+
+        if error is not None:
+            if not page_count:
+                raise ValueError(error)
+            logger.error("Extraction of '%s' failed part-way: %s", file_path or "<memory>", error)
+            result.truncated = CRASHED
+        if "text" in mask:
+            result.text = "\n".join(texts)
+        if result.truncated:
+            logger.warning(
+                "Extraction of '%s' truncated (%s) after %d page(s)", file_path or "<memory>", result.truncated, page_count
+            )
+        return result
+
+
+def governed_pool(max_workers: int) -> ThreadPoolExecutor:
+    """
+    Creates the executor that runs GovernedExtractor.extract() calls in parallel.
+
+    Each call only waits on its own worker process, which can be killed on its
+    own, so threads are enough to keep max_workers documents extracting.
+
+    :param max_workers: Number of documents extracted at the same time.
+    :return: A ThreadPoolExecutor.
+    """
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="governed")
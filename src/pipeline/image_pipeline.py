@@ -0,0 +1,306 @@
+import io
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Iterable, Iterator, List, Optional, Tuple, TypeVar
+from src.extractors.records import ExtractionResult, PageRecord
+from src.instrumentation.metrics import instrumented
+
+logger = logging.getLogger(__name__)
+
+# Pillow format names for the encodings images can be normalized to
+OUTPUT_FORMATS = {"webp": "WEBP", "jpeg": "JPEG", "jpg": "JPEG", "png": "PNG"}
+
+Record = TypeVar("Record", ExtractionResult, PageRecord)
+
+
+@dataclass
+class ImageStats:
+    """
+    Running totals of what an ImagePipeline processed.
+    """
+
+    images_in: int = 0
+    bytes_in: int = 0
+    images_out: int = 0
+    bytes_out: int = 0
+    dropped: int = 0  # Images below the size thresholds
+    resized: int = 0
+    reencoded: int = 0
+    undecodable: int = 0  # Formats Pillow cannot open (EMF, WMF, JBIG2, ...), kept as they are
+    seconds: float = 0.0  # Wall-clock time spent in process()
+
+    @property
+    def images_per_second(self) -> Optional[float]:
+        """Input images processed per second of wall-clock time."""
+        return self.images_in / self.seconds if self.seconds else None
+
+    @property
+    def megabytes_per_second(self) -> Optional[float]:
+        """Input megabytes processed per second of wall-clock time."""
+        return self.bytes_in / self.seconds / 1e6 if self.seconds else None
+
+
+class ImagePipeline:
+    """
+    Optional post-processing of extracted images, run in a thread pool.
+
+    Images smaller than min_bytes or min_side pixels (spacer GIFs, bullets,
+    hairlines) are dropped, images larger than max_side are scaled down to
+    fit, and images can be re-encoded to WebP or JPEG at a chosen quality.
+    A re-encoded image is only kept when it is smaller than the original, or
+    when it had to be scaled down. Images Pillow cannot decode are passed
+    through unchanged.
+
+    Pillow releases the GIL while decoding, resizing, and encoding, so a
+    thread pool spreads the work over several cores without the pickling
+    cost of a process pool.
+    """
+
+    def __init__(
+        self,
+        min_bytes: int = 0,
+        min_side: int = 0,
+        max_side: Optional[int] = None,
+        output_format: Optional[str] = None,
+        quality: int = 80,
+        workers: int = 4,
+    ) -> None:
+        """
+        Initialize the ImagePipeline.
+
+        :param min_bytes: Drop images whose encoded size is below this many bytes.
+        :param min_side: Drop images whose width or height is below this many pixels.
+        :param max_side: Scale images down so neither side exceeds this many pixels; None keeps the size.
+        :param output_format: "webp", "jpeg", or "png" to re-encode images; None keeps the original encoding
+                              except for resized images, which are written back in their own format.
+        :param quality: Encoder quality for WebP and JPEG, 1-100.
+        :param workers: Number of threads processing images.
+        :raises ValueError: If output_format is unknown or not supported by the installed Pillow.
+        """
+        if output_format is not None:
+            output_format = output_format.lower()
+            if output_format not in OUTPUT_FORMATS:
+                raise ValueError(f"Unsupported output format: '{output_format}'; expected one of {sorted(OUTPUT_FORMATS)}")
+            if output_format == "webp":
+                from PIL import features
+
+                if not features.check("webp"):
+                    raise ValueError("This Pillow build has no WebP support")
+        self.min_bytes = min_bytes
+        self.min_side = min_side
+        self.max_side = max_side
+        self.output_format = output_format
+        self.quality = quality
+        self.workers = workers
+        self.stats = ImageStats()
+        self._stats_lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def process(self, images: Iterable[bytes]) -> List[bytes]:
+        """
+        Filters, resizes, and re-encodes images in the thread pool.
+
+        :param images: Image byte data, e.g. DataExtractor.extract_images().
+        :return: The kept images, processed, in their original order.
+        """
+        images = [image for image in images if isinstance(image, bytes)]
+        processed = [image for image in self._process_all(images) if image is not None]
+        logger.debug("Kept %d of %d image(s)", len(processed), len(images))
+        return processed
+
+    @instrumented("image_pipeline.process")
+    def _process_all(self, images: List[bytes]) -> List[Optional[bytes]]:
+        """
+        Runs process_image() over images in the thread pool.
+
+        :param images: Image byte data.
+        :return: One outcome per image, in order; None where the image was dropped.
+        """
+        if not images:
+            return []
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="image-pipeline")
+
+        start = time.perf_counter()
+        outcomes = list(self._pool.map(self.process_image, images))
+        with self._stats_lock:
+            self.stats.seconds += time.perf_counter() - start
+        return outcomes
+
+    def process_result(self, record: Record) -> Record:
+        """
+        Returns a copy of an ExtractionResult or PageRecord with its images processed.
+
+        The page records of a result are processed with it, in one batch, and
+        the result's images are rebuilt from them.
+
+        :param record: The extracted result or page.
+        :return: A copy whose images went through process().
+        """
+        if not isinstance(record, ExtractionResult) or not record.pages:
+            return replace(record, images=self.process(record.images))
+
+        pages = [replace(page, images=[image for image in page.images if isinstance(image, bytes)]) for page in record.pages]
+        outcomes = iter(self._process_all([image for page in pages for image in page.images]))
+        for page in pages:
+            page.images = [image for image in (next(outcomes) for _ in page.images) if image is not None]
+        return replace(record, images=[image for page in pages for image in page.images], pages=pages)
+
+    def process_records(self, records: Iterable[Record]) -> Iterator[Record]:
+        """
+        Processes the images of a stream of page records, e.g. DataExtractor.iter_pages().
+
+        :param records: Page records or results.
+        :return: An iterator of copies with processed images.
+        """
+        for record in records:
+            yield self.process_result(record)
+
+    def wrap(self, storage) -> "ImageProcessingSink":
+        """
+        Wraps a storage so every result it saves has its images processed first.
+
+        :param storage: Anything with save_result(), e.g. FileStorage, SQLStorage, or ShardStorage.
+        :return: A sink usable wherever the storage was, e.g. in AsyncPipeline or BatchExtractor.
+        """
+        return ImageProcessingSink(self, storage)
+
+    def process_image(self, data: bytes) -> Optional[bytes]:
+        """
+        Processes a single image; called from the pool threads.
+
+        :param data: Image byte data.
+        :return: The processed image, or None if it was dropped.
+        """
+        size, kept, resized, reencoded, undecodable = len(data), data, False, False, False
+        if size < self.min_bytes:
+            kept = None
+        else:
+            try:
+                kept, resized, reencoded = self._transform(data)
+            except Exception as e:  # Pillow raises a range of errors for formats it cannot read
+                logger.debug("Passing through image Pillow cannot process: %s", e)
+                undecodable = True
+
+        with self._stats_lock:
+            stats = self.stats
+            stats.images_in += 1
+            stats.bytes_in += size
+            if kept is None:
+                stats.dropped += 1
+            else:
+                stats.images_out += 1
+                stats.bytes_out += len(kept)
+            stats.resized += resized
+            stats.reencoded += reencoded
+            stats.undecodable += undecodable
+        return kept
+
+    def _transform(self, data: bytes) -> Tuple[Optional[bytes], bool, bool]:
+        """
+        Applies the pixel-size filter, the resize, and the re-encoding to a decodable image.
+
+        :param data: Image byte data.
+        :return: Tuple of (image or None if dropped, whether it was resized, whether it was re-encoded).
+        :raises Exception: Whatever Pillow raises for data it cannot decode.
+        """
+        from PIL import Image
+
+        with Image.open(io.BytesIO(data)) as image:
+            # Only the header has been read so far; filtering costs no decode
+            if min(image.size) < self.min_side:
+                return None, False, False
+            too_large = self.max_side is not None and max(image.size) > self.max_side
+            if not too_large and self.output_format is None:
+                return data, False, False
+
+            source_format = image.format
+            if too_large:
+                image.draft("RGB", (self.max_side, self.max_side))  # JPEG: decode at a reduced scale
+                image = image.copy()
+                image.thumbnail((self.max_side, self.max_side))
+            fmt = OUTPUT_FORMATS[self.output_format] if self.output_format else source_format or "PNG"
+            encoded = self._encode(image, fmt)
+
+        if not too_large and len(encoded) >= len(data):
+            return data, False, False
+        return encoded, too_large, fmt != source_format
+
+    def _encode(self, image, fmt: str) -> bytes:
+        """
+        Encodes an image, converting its mode to one the format supports.
+
+        :param image: A Pillow image.
+        :param fmt: Pillow format name, e.g. "WEBP".
+        :return: Encoded byte data.
+        """
+        if fmt == "JPEG" and image.mode not in ("RGB", "L", "CMYK"):
+            image = image.convert("RGB")
+        elif fmt == "WEBP" and image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+        buffer = io.BytesIO()
+        options = {"quality": self.quality} if fmt in ("WEBP", "JPEG") else {"optimize": True}
+        image.save(buffer, fmt, **options)
+        return buffer.getvalue()
+
+    def close(self) -> None:
+        """
+        Shuts the thread pool down.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> "ImagePipeline":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class ImageProcessingSink:
+    """
+    Storage wrapper that runs each result's images through an ImagePipeline before saving it.
+    """
+
+    def __init__(self, pipeline: ImagePipeline, storage) -> None:
+        """
+        Initialize the ImageProcessingSink.
+
+        :param pipeline: The ImagePipeline to apply.
+        :param storage: Storage receiving the processed results.
+        """
+        self.pipeline = pipeline
+        self.storage = storage
+
+    def save_result(self, result: ExtractionResult) -> bool:
+        """
+        Processes a result's images and saves it.
+
+        :param result: An ExtractionResult produced by DataExtractor.extract_all().
+        :return: What the wrapped storage's save_result() returned.
+        """
+        return self.storage.save_result(self.pipeline.process_result(result))
+
+    def save_stream(
+        self,
+        records: Optional[Iterable[PageRecord]] = None,
+        pages: Optional[Iterable[int]] = None,
+        fields: Optional[Iterable[str]] = None,
+        **kwargs,
+    ) -> bool:
+        """
+        Processes page records' images as they stream into the wrapped storage.
+
+        :param records: Page records to save; defaults to the wrapped storage's extractor's iter_pages().
+        :param pages: Zero-based page or slide indices to extract when records is omitted.
+        :param fields: Names of the fields to extract when records is omitted, e.g. ["text", "images"].
+        :param kwargs: Passed on to the storage's save_stream(), e.g. source for SQLStorage.
+        :return: What the wrapped storage's save_stream() returned.
+        """
+        if records is None:
+            records = self.storage.extractor.iter_pages(pages=pages, fields=fields)
+        return self.storage.save_stream(self.pipeline.process_records(records), **kwargs)
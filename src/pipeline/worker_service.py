@@ -0,0 +1,570 @@
+# Resident extraction worker service
+
+import os
+import sys
+import json
+import base64
+import socket
+import logging
+import argparse
+import threading
+import http.client
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+from urllib.parse import parse_qs, urlencode, urlparse
+from src.extractors.data_extractor import DataExtractor, ExtractionResult, link_url
+from src.extractors.records import field_mask
+from src.loaders.registry import loader_for
+from src.pipeline.governed import ExtractionLimits, GovernedExtractor, governed_pool
+
+logger = logging.getLogger(__name__)
+
+# Largest document accepted in a request body
+MAX_BODY_SIZE = 256 * 1024 * 1024
+
+
+def parse_pages(spec: Union[None, str, Sequence[int]]) -> Optional[List[int]]:
+    """
+    Parses a page selection such as "0-4,7" (zero-based, inclusive ranges).
+
+    :param spec: A selection string, a list of page indices, or None for all pages.
+    :return: Sorted page indices, or None for all pages.
+    :raises ValueError: If the selection is malformed.
+    """
+    if spec is None or spec == "":
+        return None
+    if not isinstance(spec, str):
+        return sorted({int(page) for page in spec})
+    pages = set()
+    for part in spec.split(","):
+        start, _, stop = part.strip().partition("-")
+        pages.update(range(int(start), int(stop or start) + 1))
+    return sorted(pages)
+
+
+def result_payload(result: ExtractionResult, error: Optional[str] = None) -> dict:
+    """
+    Converts an extraction result into the JSON object sent to clients.
+
+    Links are reduced to their URLs and images are base64-encoded.
+
+    :param result: The ExtractionResult.
+    :param error: Error message if the job failed.
+    :return: A JSON-serializable dictionary.
+    """
+    return {
+        "source": result.source,
+        "text": result.text,
+        "links": [url for url in map(link_url, result.links) if url],
+        "images": [base64.b64encode(image).decode("ascii") for image in result.images],
+        "tables": result.tables,
+        "truncated": result.truncated,
+        "error": error,
+    }
+
+
+def _warm_worker() -> None:
+    """
+    Pool initializer: imports the parsers so the first job does not pay for them.
+
+    The package imports format libraries on first use, which keeps the service
+    process itself light; each worker imports them here at start-up instead.
+    """
+    import fitz  # noqa: F401
+    import docx  # noqa: F401
+    import pptx  # noqa: F401
+
+
+def _run_job(
+    file_path: Optional[str], data: Optional[bytes], pages: Optional[List[int]], fields: Optional[List[str]]
+) -> ExtractionResult:
+    """
+    Worker entry point: extracts one document from a path or from its bytes.
+
+    :param file_path: Path to the document; names it when data is given.
+    :param data: The document's bytes, or None to read file_path.
+    :param pages: Page or slide indices to extract, or None for all.
+    :param fields: Field names to extract, or None for all.
+    :return: The ExtractionResult.
+    :raises ValueError: If the document cannot be opened.
+    """
+    with DataExtractor(loader_for(file_path, data)) as extractor:
+        if not extractor.document:
+            raise ValueError(extractor.file_loader.load_error or "Could not load file")
+        return extractor.extract_all(pages=pages, fields=fields)
+
+
+class _ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    """
+    HTTP server listening on a Unix domain socket, one thread per connection.
+    """
+
+    daemon_threads = True
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the worker service API.
+
+    GET /health reports the pool size. POST /extract accepts either a JSON job
+    ({"files": [...], "pages": "0-4", "fields": ["text"], "store": false}) or a
+    raw document body with the same options in the query string (plus name).
+    Results are streamed back as newline-delimited JSON, one object per
+    document, in the order the documents finish.
+
+    The API has no authentication: any client that can connect can have the
+    service read files it has access to. Listen only on loopback, a Unix
+    socket, or another trusted interface, and set the service's root to
+    confine the paths jobs may name.
+    """
+
+    protocol_version = "HTTP/1.1"  # Needed for chunked responses
+    server_version = "ExtractionWorker/1.0"
+
+    @property
+    def service(self) -> "WorkerService":
+        return self.server.service
+
+    def address_string(self) -> str:
+        # Unix socket peers have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self) -> None:
+        if urlparse(self.path).path == "/health":
+            self._send_json(200, {"status": "ok", "workers": self.service.workers})
+        else:
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/extract":
+            self._send_json(404, {"error": f"Unknown path: {url.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length > MAX_BODY_SIZE:
+                self._send_json(413, {"error": f"Request body exceeds {MAX_BODY_SIZE} bytes"})
+                return
+            body = self.rfile.read(length)
+            if self.headers.get_content_type() == "application/json":
+                job = json.loads(body or b"{}")
+                files, data = list(job.get("files", [])), None
+            else:
+                job = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                files, data = [job.get("name")], body
+                if not body:
+                    raise ValueError("empty document body")
+                if isinstance(job.get("fields"), str):
+                    job["fields"] = job["fields"].split(",")
+            pages = parse_pages(job.get("pages"))
+            fields = sorted(field_mask(job.get("fields")))
+            store = str(job.get("store", "")).lower() in ("1", "true", "yes")
+            if data is None:
+                for file_path in files:
+                    self.service.check_path(file_path)
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {"error": f"Bad request: {e}"})
+            return
+        except PermissionError as e:
+            self._send_json(403, {"error": str(e)})
+            return
+
+        jobs = [(file_path, data, pages, fields) for file_path in files]
+        futures = {self.service.submit(*job): job for job in jobs}
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for future in as_completed(futures):
+            payload = self.service.finish(futures[future], future, store)
+            self._write_chunk(json.dumps(payload).encode("utf-8") + b"\n")
+        self._write_chunk(b"")  # End of the chunked response
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class WorkerService:
+    """
+    Long-running extraction service backed by a pool of warm worker processes.
+
+    Running file_storage.py or sql_storage.py per document pays interpreter
+    start-up, the fitz/docx/pptx imports, and SQLite connection setup each
+    time. The service pays them once: worker processes are started and
+    preloaded before the first request, and storages passed as sinks stay
+    open for its whole lifetime, so each job costs only its parse time.
+
+    Jobs arrive over a local HTTP API on a TCP port or a Unix socket (see
+    _RequestHandler) and results are streamed back as each document finishes.
+    If a worker process dies, the pool is replaced and the jobs it took down
+    are retried once, so one crash does not disable the service.
+
+    With limits set, each job is instead extracted in its own GovernedExtractor
+    process, driven from a pool of threads; the processes are forked from a
+    fork server that has the parsers preloaded, so they still start warm.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        sinks: Optional[List] = None,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        socket_path: Optional[str] = None,
+        root: Optional[str] = None,
+        limits: Optional[ExtractionLimits] = None,
+    ) -> None:
+        """
+        Initialize the WorkerService.
+
+        :param workers: Number of worker processes (defaults to the CPU count).
+        :param sinks: Storages with save_result(), e.g. [SQLStorage("db.sqlite")], that receive
+                      the results of jobs submitted with store=true.
+        :param host: Interface to listen on when serving over TCP.
+        :param port: TCP port; 0 picks a free one (see address).
+        :param socket_path: Path of a Unix socket to listen on instead of TCP.
+        :param root: Directory that files named in jobs must be inside; None allows any path the
+                     service can read, so only use it on trusted interfaces.
+        :param limits: Per-document time, memory, page, and image-byte limits applied to every job;
+                       truncated results report the limit hit in their "truncated" field.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.sinks = sinks or []
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.root = os.path.realpath(root) if root else None
+        self.limits = limits
+        self._extract = GovernedExtractor(limits).extract if limits is not None else _run_job
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._store_lock = threading.Lock()  # Sinks such as SQLStorage take one writer at a time
+
+    @property
+    def address(self) -> Union[str, tuple]:
+        """The Unix socket path, or the (host, port) the service is bound to."""
+        if self._server is None:
+            return self.socket_path or (self.host, self.port)
+        return self._server.server_address
+
+    def start(self) -> "WorkerService":
+        """
+        Starts the worker processes, waits until they are warm, and begins
+        serving requests in a background thread.
+
+        :return: The service itself.
+        """
+        self._pool = self._new_pool()
+        # One task per worker makes the pool start every process now rather than on demand
+        for future in [self._pool.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)  # Left over from a previous run
+            self._server = _ThreadingUnixHTTPServer(self.socket_path, _RequestHandler)
+        else:
+            self._server = ThreadingHTTPServer((self.host, self.port), _RequestHandler)
+        self._server.service = self
+
+        self._thread = threading.Thread(target=self._server.serve_forever, name="worker-service", daemon=True)
+        self._thread.start()
+        logger.info("Worker service listening on %s with %d workers", self.address, self.workers)
+        return self
+
+    def _new_pool(self) -> Executor:
+        if self.limits is not None:
+            return governed_pool(self.workers)
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+
+    def _replace_pool(self, broken: Executor) -> Executor:
+        """
+        Replaces a pool that lost a worker process, unless another thread already did.
+
+        :param broken: The pool that raised BrokenProcessPool.
+        :return: The current, working pool.
+        """
+        with self._pool_lock:
+            if self._pool is broken:
+                logger.warning("A worker process died; restarting the worker pool")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._new_pool()
+            return self._pool
+
+    def check_path(self, file_path: str) -> None:
+        """
+        Checks that a job may read a path.
+
+        :param file_path: Path named in a job.
+        :raises PermissionError: If a root is set and the path resolves outside it.
+        """
+        if self.root is None:
+            return
+        path = os.path.realpath(file_path or "")
+        if os.path.commonpath([path, self.root]) != self.root:
+            raise PermissionError(f"'{file_path}' is outside the service root")
+
+    def submit(
+        self, file_path: Optional[str], data: Optional[bytes], pages: Optional[List[int]], fields: Optional[List[str]]
+    ) -> Future:
+        """
+        Queues one extraction job on the worker pool, restarting the pool if it is broken.
+
+        :param file_path: Path to the document, or the name of the document held in data.
+        :param data: The document's bytes, or None to read file_path.
+        :param pages: Page or slide indices to extract, or None for all.
+        :param fields: Field names to extract, or None for all.
+        :return: A Future resolving to the ExtractionResult.
+        """
+        pool = self._pool
+        try:
+            return pool.submit(self._extract, file_path, data or None, pages, fields)
+        except BrokenProcessPool:
+            return self._replace_pool(pool).submit(self._extract, file_path, data or None, pages, fields)
+
+    def finish(self, job: tuple, future: Future, store: bool = False) -> dict:
+        """
+        Collects a finished job, stores it in the sinks if asked, and builds its payload.
+
+        A job whose worker process died is submitted again, once, to a fresh pool.
+
+        :param job: The (file_path, data, pages, fields) arguments the job was submitted with.
+        :param future: The job's Future.
+        :param store: Save the result to every sink.
+        :return: The JSON payload for the client; its "error" is set if the job or a sink failed.
+        """
+        file_path = job[0]
+        try:
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                logger.warning("Worker died while processing '%s'; retrying", file_path)
+                result = self.submit(*job).result()
+        except Exception as e:
+            logger.error("Error processing '%s': %s", file_path, e)
+            return result_payload(ExtractionResult(source=file_path), f"{type(e).__name__}: {e}")
+
+        if store:
+            with self._store_lock:
+                for sink in self.sinks:
+                    try:
+                        saved = sink.save_result(result)
+                    except Exception as e:
+                        logger.error("Error storing '%s' in %s: %s", file_path, type(sink).__name__, e)
+                        return result_payload(result, f"{type(e).__name__}: {e}")
+                    if not saved:
+                        return result_payload(result, f"{type(sink).__name__} rejected result")
+        return result_payload(result)
+
+    def serve_forever(self) -> None:
+        """
+        Starts the service if needed and blocks until interrupted.
+        """
+        if self._server is None:
+            self.start()
+        try:
+            self._thread.join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        """
+        Stops accepting requests and shuts down the worker processes.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            if self.socket_path and os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            self._server = None
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> "WorkerService":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.shutdown()
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    HTTPConnection over a Unix domain socket.
+    """
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class WorkerClient:
+    """
+    Client for a running WorkerService.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        socket_path: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        :param host: Host of a service listening on TCP.
+        :param port: Port of a service listening on TCP.
+        :param socket_path: Unix socket of the service; used instead of host and port if set.
+        :param timeout: Socket timeout in seconds.
+        """
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self.socket_path:
+            return _UnixHTTPConnection(self.socket_path, self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def health(self) -> dict:
+        """
+        :return: The service's health report, e.g. {"status": "ok", "workers": 4}.
+        """
+        connection = self._connection()
+        try:
+            connection.request("GET", "/health")
+            return json.loads(connection.getresponse().read())
+        finally:
+            connection.close()
+
+    def extract(
+        self,
+        files: List[str],
+        pages: Union[None, str, Sequence[int]] = None,
+        fields: Optional[List[str]] = None,
+        store: bool = False,
+    ) -> Iterator[dict]:
+        """
+        Extracts files the service can read from disk.
+
+        :param files: Paths to the documents, as seen by the service.
+        :param pages: Page selection, e.g. "0-4" or [0, 1]; all pages if omitted.
+        :param fields: Field names to extract; all if omitted.
+        :param store: Save the results in the service's sinks.
+        :return: An iterator of result payloads (see result_payload()), in completion order.
+        """
+        job: Dict = {"files": list(files), "store": store}
+        if pages is not None:
+            job["pages"] = pages if isinstance(pages, str) else list(pages)
+        if fields is not None:
+            job["fields"] = list(fields)
+        yield from self._stream("/extract", json.dumps(job).encode("utf-8"), "application/json")
+
+    def extract_data(
+        self,
+        data: bytes,
+        name: Optional[str] = None,
+        pages: Union[None, str, Sequence[int]] = None,
+        fields: Optional[List[str]] = None,
+        store: bool = False,
+    ) -> dict:
+        """
+        Extracts a document sent in the request body.
+
+        :param data: The document's bytes.
+        :param name: Name recorded as the result's source.
+        :param pages: Page selection, e.g. "0-4" or [0, 1]; all pages if omitted.
+        :param fields: Field names to extract; all if omitted.
+        :param store: Save the result in the service's sinks.
+        :return: The result payload.
+        """
+        query = {"store": "true" if store else "false"}
+        if name:
+            query["name"] = name
+        if pages is not None:
+            query["pages"] = pages if isinstance(pages, str) else ",".join(map(str, pages))
+        if fields is not None:
+            query["fields"] = ",".join(fields)
+        return next(self._stream(f"/extract?{urlencode(query)}", data, "application/octet-stream"))
+
+    def _stream(self, path: str, body: bytes, content_type: str) -> Iterator[dict]:
+        """
+        Posts a job and yields each newline-delimited JSON object as it arrives.
+
+        :raises RuntimeError: If the service rejects the request.
+        """
+        connection = self._connection()
+        try:
+            connection.request("POST", path, body=body, headers={"Content-Type": content_type})
+            response = connection.getresponse()
+            if response.status != 200:
+                raise RuntimeError(f"Worker service error {response.status}: {response.read().decode('utf-8')}")
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            connection.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve document extraction from a pool of warm worker processes.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument("--socket", help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--root", help="Only serve files inside this directory")
+    parser.add_argument("--max-seconds", type=float, help="Stop extracting a document after this many seconds")
+    parser.add_argument("--max-rss-mb", type=float, help="Stop extracting a document once its worker uses this much memory")
+    parser.add_argument("--max-pages", type=int, help="Extract at most this many pages or slides per document")
+    parser.add_argument("--max-image-bytes", type=int, help="Keep at most this many bytes of images per document")
+    parser.add_argument("--db", help="SQLite database receiving results of jobs sent with store=true")
+    parser.add_argument("--output", help="Folder receiving results of jobs sent with store=true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    sinks = []
+    if args.db:
+        from src.storage.sql_storage import SQLStorage
+        sinks.append(SQLStorage(args.db))
+    if args.output:
+        from src.storage.file_storage import FileStorage
+        sinks.append(FileStorage(output_folder=args.output, per_document=True))
+
+    limits = ExtractionLimits(args.max_seconds, args.max_rss_mb, args.max_pages, args.max_image_bytes)
+    if limits == ExtractionLimits():
+        limits = None
+    WorkerService(args.workers, sinks, args.host, args.port, args.socket, args.root, limits).serve_forever()
+    for sink in sinks:
+        if hasattr(sink, "close"):
+            sink.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
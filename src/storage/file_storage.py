@@ -1,10 +1,13 @@
 import os
 import csv
-from typing import Optional
-from src.extractors.data_extractor import DataExtractor
-from src.loaders.docx_loader import DOCXLoader
-from src.loaders.pdf_loader import PDFLoader
-from src.loaders.ppt_loader import PPTLoader
+import hashlib
+import logging
+from typing import Iterable, List, Optional
+from src.extractors.data_extractor import DataExtractor, ExtractionResult, PageRecord, link_url
+from src.storage.image_store import ImageStore
+from src.instrumentation.metrics import count_written, instrumented
+
+logger = logging.getLogger(__name__)
 
 
 class FileStorage:
@@ -12,91 +15,247 @@ class FileStorage:
     Handles the storage of extracted data (text, links, images, and tables) into files.
     """
 
-    def __init__(self, extractor: DataExtractor, output_folder: str = "output") -> None:
+    def __init__(
+        self, extractor: Optional[DataExtractor] = None, output_folder: str = "output", per_document: bool = False
+    ) -> None:
         """
         Initializes FileStorage with an extractor and output directory.
 
-        :param extractor: An instance of DataExtractor containing extracted data.
+        :param extractor: An instance of DataExtractor containing extracted data. May be omitted
+                          when results are only passed in through save_result().
         :param output_folder: Directory where extracted files will be saved.
+        :param per_document: Write each result into its own subfolder, named by folder_name(),
+                             so results from many documents do not overwrite each other.
         """
         self.extractor = extractor
         self.output_folder = output_folder
+        self.per_document = per_document
         os.makedirs(self.output_folder, exist_ok=True)  # Ensure output directory exists
+        # Shared by every document, so an image is stored once however often it appears
+        self.image_store = ImageStore(os.path.join(self.output_folder, "images"))
 
     def save_text(self) -> None:
         """
         Saves extracted text into a text file.
         """
-        text: Optional[str] = self.extractor.extract_text()
-        if text:
-            with open(os.path.join(self.output_folder, "extracted_text.txt"), "w", encoding="utf-8") as f:
-                f.write(text)
-            print("Text saved successfully.")
+        self._write_text(self.extractor.extract_text(), self.output_folder)
 
     def save_links(self) -> None:
         """
         Saves extracted hyperlinks into a text file.
         """
-        links = self.extractor.extract_links()
-        if links:
-            with open(os.path.join(self.output_folder, "extracted_links.txt"), "w", encoding="utf-8") as f:
-                f.write("\n".join(links))
-            print("Links saved successfully.")
+        self._write_links(self.extractor.extract_links(), self.output_folder)
 
     def save_images(self) -> None:
         """
-        Saves extracted images as separate PNG files.
+        Saves extracted images into the content-addressed image store.
+        """
+        self._write_images(self.extractor.extract_images(), self.output_folder)
+
+    def save_tables(self) -> None:
+        """
+        Saves extracted tables into CSV files.
+        """
+        self._write_tables(self.extractor.extract_tables(), self.output_folder)
+
+    @instrumented("file_storage.save_result", measure=count_written)
+    def save_result(self, result: ExtractionResult) -> bool:
+        """
+        Saves an already extracted result without walking the document again.
+
+        :param result: An ExtractionResult produced by DataExtractor.extract_all().
+        :return: True once all data has been written.
+        """
+        folder = self._folder_for(result)
+        self._write_text(result.text, folder)
+        self._write_links(result.links, folder)
+        self._write_images(result.images, folder)
+        self._write_tables(result.tables, folder)
+        logger.info("Data saved to files in %s", folder)
+        return True
+
+    @instrumented("file_storage.save_stream")
+    def save_stream(
+        self,
+        records: Optional[Iterable[PageRecord]] = None,
+        pages: Optional[Iterable[int]] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """
+        Saves page records as they are produced, holding only one page in memory.
+
+        Text and links are appended to their files page by page, and each page's
+        images and tables are written out before the next page is extracted.
+
+        :param records: Page records to save; defaults to the extractor's iter_pages().
+        :param pages: Zero-based page or slide indices to extract when records is omitted.
+        :param fields: Names of the fields to extract when records is omitted, e.g. ["text"].
+        :return: True once all data has been written, False if the document could not be loaded.
+        """
+        if records is None:
+            error = self.extractor.load_error
+            if error:
+                logger.error("Error saving data to files: %s", error)
+                return False
+            records = self.extractor.iter_pages(pages=pages, fields=fields)
+
+        text_path = os.path.join(self.output_folder, "extracted_text.txt")
+        links_path = os.path.join(self.output_folder, "extracted_links.txt")
+        images_path = os.path.join(self.output_folder, "extracted_images.txt")
+        if os.path.exists(images_path):
+            os.remove(images_path)  # Pages append to the image list below
+        table_count = link_count = page_count = 0
+        with open(text_path, "w", encoding="utf-8") as text_file, \
+                open(links_path, "w", encoding="utf-8") as links_file:
+            for record in records:
+                text_file.write(("\n" if page_count else "") + record.text)
+                for url in filter(None, map(link_url, record.links)):
+                    links_file.write(("\n" if link_count else "") + url)
+                    link_count += 1
+                self._write_images(record.images, self.output_folder, mode="a")
+                self._write_tables(record.tables, self.output_folder, start=table_count)
+                table_count += len(record.tables)
+                page_count += 1
+
+        # Match save_data(), which only creates the links file when there are links
+        if not link_count:
+            os.remove(links_path)
+        logger.info("Streamed %d pages to files in %s", page_count, self.output_folder)
+        return True
+
+    def save_data(self, pages: Optional[Iterable[int]] = None, fields: Optional[Iterable[str]] = None) -> bool:
+        """
+        Saves extracted data and returns True if successful.
+
+        :param pages: Zero-based page or slide indices to save, e.g. range(5); all pages if omitted.
+        :param fields: Names of the fields to save, e.g. ["text", "links"]; all if omitted.
+                       Fields left out are not extracted at all.
+        :return: True once all data has been written, False if the document could not be loaded.
+        """
+        error = self.extractor.load_error
+        if error:
+            logger.error("Error saving data to files: %s", error)
+            return False
+        # One pass over the document instead of one per data type
+        return self.save_result(self.extractor.extract_all(pages=pages, fields=fields))
+
+    def _folder_for(self, result: ExtractionResult) -> str:
+        """
+        Returns the folder a result should be written to, creating it if needed.
+
+        :param result: The ExtractionResult being saved.
+        :return: Path of the output folder for this result.
+        """
+        if not self.per_document or not result.source:
+            return self.output_folder
+        folder = os.path.join(self.output_folder, self.folder_name(result.source))
+        os.makedirs(folder, exist_ok=True)
+        return folder
+
+    @staticmethod
+    def folder_name(source: str) -> str:
+        """
+        Returns the per-document folder name of a source file.
+
+        The file name is kept for readability and suffixed with a hash of the
+        absolute path, so a/report.pdf and b/report.pdf get separate folders.
+
+        :param source: Path of the source file.
+        :return: Folder name, e.g. "report.pdf-3f9a1c2b7d4e".
+        """
+        digest = hashlib.blake2b(os.path.abspath(source).encode("utf-8"), digest_size=6).hexdigest()
+        return f"{os.path.basename(source)}-{digest}"
+
+    @instrumented("file_storage.write_text", measure=count_written)
+    def _write_text(self, text: Optional[str], folder: str) -> None:
+        """
+        Writes text into a text file.
+
+        :param text: Extracted text, or None if there is nothing to write.
+        :param folder: Directory to write into.
         """
-        images = self.extractor.extract_images()
+        if text:
+            with open(os.path.join(folder, "extracted_text.txt"), "w", encoding="utf-8") as f:
+                f.write(text)
+            logger.debug("Text saved successfully.")
+
+    @instrumented("file_storage.write_links", measure=count_written)
+    def _write_links(self, links: List[str], folder: str) -> None:
+        """
+        Writes hyperlinks into a text file.
+
+        :param links: Extracted hyperlinks.
+        :param folder: Directory to write into.
+        """
+        urls = [url for url in map(link_url, links) if url]
+        if urls:
+            with open(os.path.join(folder, "extracted_links.txt"), "w", encoding="utf-8") as f:
+                f.write("\n".join(urls))
+            logger.debug("Links saved successfully.")
+
+    @instrumented("file_storage.write_images", measure=count_written)
+    def _write_images(self, images: List[bytes], folder: str, mode: str = "w") -> None:
+        """
+        Writes images into the shared content-addressed image store.
+
+        Each distinct image is stored once, with an extension matching its real
+        format. The document's folder gets an extracted_images.txt listing the
+        path of every image it references.
+
+        :param images: Extracted image byte data.
+        :param folder: Directory of the document referencing the images.
+        :param mode: "w" to replace the image list, "a" to append to it.
+        """
+        references = []
         for idx, img_data in enumerate(images):
             try:
                 # Ensure image data is in bytes
                 if isinstance(img_data, bytes):
-                    img_path = os.path.join(self.output_folder, f"image_{idx}.png")
-                    with open(img_path, "wb") as f:
-                        f.write(img_data)
-                    print(f"Image saved: {img_path}")
+                    relative_path, is_new = self.image_store.put(img_data)
+                    references.append(os.path.relpath(self.image_store.path(relative_path), folder))
+                    if is_new:
+                        logger.debug("Image saved: %s", self.image_store.path(relative_path))
                 else:
-                    print(f"⚠️ Skipped image {idx} - Invalid data format")
-            except Exception as e:
-                print(f"Error saving image {idx}: {e}")
+                    logger.warning("Skipped image %d - Invalid data format", idx)
+            except OSError as e:
+                logger.error("Error saving image %d: %s", idx, e)
 
-    def save_tables(self) -> None:
+        if references:
+            with open(os.path.join(folder, "extracted_images.txt"), mode, encoding="utf-8") as f:
+                f.writelines(f"{reference}\n" for reference in references)
+
+    @instrumented("file_storage.write_tables", measure=count_written)
+    def _write_tables(self, tables: List[List[List[str]]], folder: str, start: int = 0) -> None:
         """
-        Saves extracted tables into CSV files.
+        Writes tables into CSV files.
+
+        :param tables: Extracted tables, each a list of rows.
+        :param folder: Directory to write into.
+        :param start: Index of the first table, used to number the files.
         """
-        tables = self.extractor.extract_tables()
-        for idx, table in enumerate(tables):
-            csv_path = os.path.join(self.output_folder, f"table_{idx}.csv")
+        for idx, table in enumerate(tables, start):
+            csv_path = os.path.join(folder, f"table_{idx}.csv")
             try:
                 with open(csv_path, "w", newline="", encoding="utf-8") as f:
                     writer = csv.writer(f)
                     writer.writerows(table)
-                print(f"Table saved: {csv_path}")
+                logger.debug("Table saved: %s", csv_path)
             except Exception as e:
-                print(f"Error saving table {idx}: {e}")
-
-    def save_data(self):
-        """Saves all extracted data and returns True if successful."""
-        self.save_text()
-        self.save_links()
-        self.save_images()
-        self.save_tables()
-        print("✅ Data saved to files")
-        return True  # Ensure return value for unit test assertion
-
+                logger.error("Error saving table %d: %s", idx, e)
 
 
-# Example Usage: Test FileStorage with DOCX, PDF, and PPTX
+# Example Usage: python -m src.storage.file_storage
+if __name__ == "__main__":
+    from src.loaders.docx_loader import DOCXLoader
 
-print("\nProcessing DOCX file...")
-docx_test = FileStorage(DataExtractor(DOCXLoader("data/sample.docx")))
-docx_test.save_data()
+    print("\nProcessing DOCX file...")
+    docx_test = FileStorage(DataExtractor(DOCXLoader("data/sample.docx")))
+    docx_test.save_data()
 
-# print("\nProcessing PDF file...")
-# pdf_test = FileStorage(DataExtractor(PDFLoader("data/sample.pdf")))
-# pdf_test.save_data()
+    # print("\nProcessing PDF file...")
+    # pdf_test = FileStorage(DataExtractor(PDFLoader("data/sample.pdf")))
+    # pdf_test.save_data()
 
-# print("\nProcessing PPT file...")
-# ppt_test = FileStorage(DataExtractor(PPTLoader("data/sample.pptx")))
-# ppt_test.save_data()
+    # print("\nProcessing PPT file...")
+    # ppt_test = FileStorage(DataExtractor(PPTLoader("data/sample.pptx")))
+    # ppt_test.save_data()
@@ -0,0 +1,102 @@
+import os
+import hashlib
+import tempfile
+from typing import Tuple
+
+
+# Leading bytes of the image formats found in PDF, DOCX, and PPTX files
+IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+    (b"II*\x00", "tif"),
+    (b"MM\x00*", "tif"),
+    (b"\x00\x00\x00\x0cjP  \r\n\x87\n", "jp2"),
+    (b"\xff\x4f\xff\x51", "jpx"),
+    (b"\x97JB2\r\n\x1a\n", "jb2"),
+    (b"\x01\x00\x00\x00", "emf"),
+    (b"\xd7\xcd\xc6\x9a", "wmf"),
+)
+
+
+def image_extension(data: bytes) -> str:
+    """
+    Guesses an image's file extension from its leading bytes.
+
+    :param data: Image byte data.
+    :return: File extension without the dot, or "bin" if the format is unknown.
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    for signature, extension in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return extension
+    if data.lstrip()[:5] in (b"<?xml", b"<svg "):
+        return "svg"
+    return "bin"
+
+
+def image_hash(data: bytes) -> str:
+    """
+    Returns the content hash that identifies an image.
+
+    :param data: Image byte data.
+    :return: SHA-256 hex digest.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+class ImageStore:
+    """
+    Content-addressed store for extracted images.
+
+    Each distinct image is written once, as <root>/<aa>/<hash>.<ext>, where the
+    hash is the SHA-256 of its bytes and the extension matches its real format.
+    Saving the same logo from a thousand slides costs one file.
+    """
+
+    def __init__(self, root: str) -> None:
+        """
+        Initialize the ImageStore.
+
+        :param root: Directory holding the stored images.
+        """
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def put(self, data: bytes) -> Tuple[str, bool]:
+        """
+        Stores an image unless an identical one is already present.
+
+        :param data: Image byte data.
+        :return: Tuple of (path relative to the store root, True if the image was newly written).
+        :raises OSError: If the image cannot be written.
+        """
+        digest = image_hash(data)
+        relative_path = os.path.join(digest[:2], f"{digest}.{image_extension(data)}")
+        path = os.path.join(self.root, relative_path)
+        if os.path.exists(path):
+            return relative_path, False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A unique temporary file per call, so threads and processes writing the same image never share one
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)  # Atomic, so concurrent writers never expose a partial file
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return relative_path, True
+
+    def path(self, relative_path: str) -> str:
+        """
+        Returns the absolute location of a stored image.
+
+        :param relative_path: Path returned by put().
+        :return: Path to the image file.
+        """
+        return os.path.join(self.root, relative_path)
@@ -0,0 +1,352 @@
+import os
+import gzip
+import json
+import bisect
+import logging
+import threading
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterable, Iterator, List, Optional
+from src.extractors.data_extractor import DataExtractor, ExtractionResult, link_url
+from src.storage.image_store import ImageStore
+from src.instrumentation.metrics import count_written, instrumented
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the shard or index layout changes
+SHARD_FORMAT_VERSION = 1
+
+COMPRESSIONS = ("gzip", "zstd")
+
+
+@dataclass
+class ChunkEntry:
+    """
+    Location of one compressed chunk of consecutive documents.
+    """
+
+    shard: str  # Shard file name, relative to the export folder
+    offset: int  # Byte offset of the compressed chunk in the shard
+    length: int  # Compressed size in bytes
+    first_id: int  # Document ID of the chunk's first record
+    count: int  # Number of records in the chunk
+
+
+def _codec(compression: str) -> tuple:
+    """
+    Returns the (compress, decompress) functions for a compression name.
+
+    zstd needs the optional zstandard package; gzip is always available.
+
+    :param compression: "gzip" or "zstd".
+    :return: Tuple of (compress(bytes) -> bytes, decompress(bytes) -> bytes).
+    :raises ValueError: If the compression is unknown or its package is not installed.
+    """
+    if compression == "gzip":
+        return (lambda data: gzip.compress(data, compresslevel=6)), gzip.decompress
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd compression needs the 'zstandard' package") from None
+        return zstandard.ZstdCompressor(level=3).compress, zstandard.ZstdDecompressor().decompress
+    raise ValueError(f"Unsupported compression: '{compression}'; expected one of {list(COMPRESSIONS)}")
+
+
+class ShardStorage:
+    """
+    Exports extracted documents into compressed, append-only shard files.
+
+    Each document becomes one JSON record (id, source, text, links, tables, and
+    image references) and records are grouped into chunks of chunk_size
+    documents. Every chunk is compressed on its own and appended to the current
+    shard file, which rolls over once it reaches shard_size bytes. An append-only
+    index (index.jsonl) records where each chunk starts, so a document is read
+    back by ID by decompressing just its chunk, and a scan streams the shards
+    front to back. Images go to the same content-addressed store FileStorage
+    uses, under images/.
+
+    Thousands of documents end up in a handful of large files instead of a
+    folder of small files per document, and nothing is ever rewritten.
+
+    save_result(), flush(), and close() may be called from several threads:
+    images are stored concurrently, while IDs, the pending chunk, and the
+    shard and index appends are serialized by a lock.
+    """
+
+    def __init__(
+        self,
+        output_folder: str = "export",
+        extractor: Optional[DataExtractor] = None,
+        compression: str = "gzip",
+        chunk_size: int = 64,
+        shard_size: int = 256 * 1024 * 1024,
+    ) -> None:
+        """
+        Opens (or creates) an export folder.
+
+        :param output_folder: Folder holding the shards, the index, and images/.
+        :param extractor: DataExtractor used by save_data(). May be omitted when results
+                          are only passed in through save_result().
+        :param compression: "gzip", or "zstd" if the zstandard package is installed. An existing
+                            export keeps the compression it was created with.
+        :param chunk_size: Documents per compressed chunk; larger chunks compress better,
+                           smaller ones make random access cheaper.
+        :param shard_size: Size in bytes after which a new shard file is started.
+        :raises ValueError: If the compression is not available.
+        """
+        self.output_folder = output_folder
+        self.extractor = extractor
+        self.chunk_size = chunk_size
+        self.shard_size = shard_size
+        os.makedirs(self.output_folder, exist_ok=True)
+        self.image_store = ImageStore(os.path.join(self.output_folder, "images"))
+
+        self.compression = self._read_manifest(compression)
+        self._compress, self._decompress = _codec(self.compression)
+        self.chunks: List[ChunkEntry] = self._read_index()
+        self._first_ids = [chunk.first_id for chunk in self.chunks]
+        self._next_id = self.chunks[-1].first_id + self.chunks[-1].count if self.chunks else 0
+        self._pending: List[dict] = []  # Records not yet written as a chunk
+        self.last_document_id: Optional[int] = None
+        self._lock = threading.RLock()  # Guards _next_id, _pending, and the shard and index appends
+        self._truncate_unindexed()
+
+    def _read_manifest(self, compression: str) -> str:
+        """
+        Loads the export's manifest, or writes one for a new export.
+
+        :param compression: Compression requested by the caller.
+        :return: The compression the export uses.
+        """
+        path = os.path.join(self.output_folder, "manifest.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("format") != SHARD_FORMAT_VERSION:
+                raise ValueError(f"Unsupported shard format {manifest.get('format')} in '{self.output_folder}'")
+            if manifest["compression"] != compression:
+                logger.info("Export '%s' uses %s compression", self.output_folder, manifest["compression"])
+            return manifest["compression"]
+
+        _codec(compression)  # Fail before anything is written
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"format": SHARD_FORMAT_VERSION, "compression": compression}, f)
+        return compression
+
+    def _read_index(self) -> List[ChunkEntry]:
+        """
+        Loads the chunk index. A torn last line from an interrupted write is ignored.
+
+        :return: Chunk entries in document ID order.
+        """
+        path = os.path.join(self.output_folder, "index.jsonl")
+        chunks = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        chunks.append(ChunkEntry(**json.loads(line)))
+                    except (ValueError, TypeError):
+                        logger.warning("Ignoring damaged index line in '%s'", path)
+                        break
+        return chunks
+
+    def _truncate_unindexed(self) -> None:
+        """
+        Cuts off bytes appended to the last shard after its last indexed chunk.
+
+        A chunk is indexed only after it has been written, so such bytes come
+        from a write that was interrupted and would otherwise be unreachable.
+        """
+        if not self.chunks:
+            return
+        last = self.chunks[-1]
+        path = os.path.join(self.output_folder, last.shard)
+        end = last.offset + last.length
+        if os.path.getsize(path) > end:
+            logger.warning("Truncating unindexed data at the end of '%s'", path)
+            with open(path, "r+b") as f:
+                f.truncate(end)
+
+    def _record(self, result: ExtractionResult) -> dict:
+        """
+        Builds the stored record for a result, writing its images to the image store.
+
+        :param result: The ExtractionResult.
+        :return: A JSON-serializable record; save_result() assigns its document ID.
+        """
+        images = [self.image_store.put(image)[0] for image in result.images if isinstance(image, bytes)]
+        return {
+            "id": None,
+            "source": result.source,
+            "text": result.text,
+            "links": [url for url in map(link_url, result.links) if url],
+            "tables": result.tables,
+            "images": [path.replace(os.sep, "/") for path in images],
+        }
+
+    @instrumented("shard_storage.save_result", measure=count_written)
+    def save_result(self, result: ExtractionResult) -> bool:
+        """
+        Appends an already extracted result to the export.
+
+        The record is buffered until chunk_size records are pending; call flush()
+        or close() to write out the last partial chunk.
+
+        :param result: An ExtractionResult produced by DataExtractor.extract_all().
+        :return: True once the record has been accepted.
+        """
+        record = self._record(result)
+        with self._lock:
+            record["id"] = self._next_id
+            self._next_id += 1
+            self._pending.append(record)
+            self.last_document_id = record["id"]
+            if len(self._pending) >= self.chunk_size:
+                self.flush()
+        return True
+
+    def save_results(self, results: Iterable[ExtractionResult]) -> bool:
+        """
+        Appends many extracted results.
+
+        :param results: ExtractionResults to store.
+        :return: True once all records have been accepted.
+        """
+        for result in results:
+            self.save_result(result)
+        return True
+
+    def save_data(self, pages: Optional[Iterable[int]] = None, fields: Optional[Iterable[str]] = None) -> bool:
+        """
+        Extracts the extractor's document and appends it to the export.
+
+        :param pages: Zero-based page or slide indices to export; all pages if omitted.
+        :param fields: Names of the fields to extract, e.g. ["text"]; all if omitted.
+        :return: True once the record has been accepted, False if the document could not be loaded.
+        """
+        error = self.extractor.load_error
+        if error:
+            logger.error("Error exporting data: %s", error)
+            return False
+        return self.save_result(self.extractor.extract_all(pages=pages, fields=fields))
+
+    def flush(self) -> None:
+        """
+        Compresses pending records into a chunk and appends it to the current shard.
+
+        The chunk's index entry is written only after the chunk itself.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in self._pending)
+            compressed = self._compress(data.encode("utf-8"))
+
+            shard = self._current_shard(len(compressed))
+            path = os.path.join(self.output_folder, shard)
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(compressed)
+            chunk = ChunkEntry(shard, offset, len(compressed), self._pending[0]["id"], len(self._pending))
+            with open(os.path.join(self.output_folder, "index.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(chunk)) + "\n")
+
+            self.chunks.append(chunk)
+            self._first_ids.append(chunk.first_id)
+            logger.debug("Wrote %d record(s) to %s at offset %d", chunk.count, shard, offset)
+            self._pending = []
+
+    def _current_shard(self, incoming: int) -> str:
+        """
+        Picks the shard the next chunk goes to, starting a new one when the current one is full.
+
+        :param incoming: Size of the chunk about to be written.
+        :return: Shard file name.
+        """
+        extension = "gz" if self.compression == "gzip" else "zst"
+        if self.chunks:
+            last = self.chunks[-1]
+            if last.offset + last.length + incoming <= self.shard_size:
+                return last.shard
+            number = int(last.shard.split("-")[1].split(".")[0]) + 1
+        else:
+            number = 0
+        return f"shard-{number:05d}.jsonl.{extension}"
+
+    def __len__(self) -> int:
+        """Number of documents in the export, including ones not flushed yet."""
+        return self._next_id
+
+    def get(self, document_id: int) -> Optional[dict]:
+        """
+        Reads one document by ID, decompressing only the chunk that holds it.
+
+        :param document_id: ID assigned when the document was saved.
+        :return: The document's record, or None if there is no such document.
+        """
+        with self._lock:
+            pending = self._pending
+        if pending and document_id >= pending[0]["id"]:
+            index = document_id - pending[0]["id"]
+            return pending[index] if index < len(pending) else None
+
+        position = bisect.bisect_right(self._first_ids, document_id) - 1
+        if position < 0 or document_id >= self.chunks[position].first_id + self.chunks[position].count:
+            return None
+        chunk = self.chunks[position]
+        with open(os.path.join(self.output_folder, chunk.shard), "rb") as f:
+            f.seek(chunk.offset)
+            lines = self._decompress(f.read(chunk.length)).splitlines()
+        return json.loads(lines[document_id - chunk.first_id])
+
+    def scan(self, fields: Optional[Iterable[str]] = None) -> Iterator[dict]:
+        """
+        Streams every flushed document in ID order, reading each shard front to back.
+
+        Only one chunk is decompressed and held in memory at a time.
+
+        :param fields: Record keys to keep, e.g. ["id", "text"]; all keys if omitted.
+        :return: An iterator of records.
+        """
+        keep: Optional[Callable[[dict], dict]] = None
+        if fields is not None:
+            names = list(fields)
+            keep = lambda record: {name: record.get(name) for name in names}  # noqa: E731
+
+        handle, shard = None, None
+        try:
+            for chunk in self.chunks:
+                if chunk.shard != shard:
+                    if handle is not None:
+                        handle.close()
+                    shard = chunk.shard
+                    handle = open(os.path.join(self.output_folder, shard), "rb")
+                handle.seek(chunk.offset)
+                for line in self._decompress(handle.read(chunk.length)).splitlines():
+                    record = json.loads(line)
+                    yield keep(record) if keep else record
+        finally:
+            if handle is not None:
+                handle.close()
+
+    def image_path(self, reference: str) -> str:
+        """
+        Resolves an image reference from a record to a file path.
+
+        :param reference: An entry of a record's "images" list.
+        :return: Path of the image file.
+        """
+        return self.image_store.path(reference)
+
+    def close(self) -> None:
+        """
+        Writes out any pending records.
+        """
+        self.flush()
+
+    def __enter__(self) -> "ShardStorage":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -0,0 +1,357 @@
+import os
+import json
+import heapq
+import hashlib
+import itertools
+import logging
+import sqlite3
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from src.extractors.data_extractor import DataExtractor, ExtractionResult, PageRecord
+from src.storage.sql_storage import ManifestEntry, SearchHit, SQLStorage
+from src.storage.sql_reader import SQLReader, StoredDocument
+from src.instrumentation.metrics import instrumented
+
+logger = logging.getLogger(__name__)
+
+# Columns of each per-document table, as exposed by the merged views of attach()
+VIEW_COLUMNS = {
+    "text_data": "page, content",
+    "links": "page, url",
+    "images": "page, hash",
+    "tables": "page, content",
+}
+
+
+class ShardedSQLStorage:
+    """
+    Spreads documents over several SQLite databases so writers do not share one write lock.
+
+    Each document is assigned to a shard by a hash of its source path, and
+    each shard is an ordinary SQLStorage database (shard-NN.sqlite) with its
+    own connection and lock. Writers touching different shards commit in
+    parallel, and a batch of results is committed with one transaction per
+    shard.
+
+    Document IDs handed out by this class are global: shard-local ID times the
+    shard count plus the shard number. Reads go either through the federated
+    helpers (document(), search(), query()) or through attach(), which opens
+    one connection with every shard attached and merged views over them.
+    """
+
+    def __init__(self, folder: str, shards: int = 4, extractor: Optional[DataExtractor] = None) -> None:
+        """
+        Opens (or creates) a sharded store.
+
+        :param folder: Folder holding the shard databases.
+        :param shards: Number of shards for a new store. An existing store keeps its shard count,
+                       since documents are located by hashing into it.
+        :param extractor: DataExtractor used by save() and save_stream(). May be omitted
+                          when results are only passed in through save_result().
+        :raises ValueError: If shards is less than 1.
+        """
+        if shards < 1:
+            raise ValueError(f"shards must be at least 1, got {shards}")
+        self.folder = folder
+        self.extractor = extractor
+        os.makedirs(self.folder, exist_ok=True)
+        self.shard_count = self._read_layout(shards)
+        self.last_document_id: Optional[int] = None  # Global ID of the most recently saved document
+
+        self.shards: List[SQLStorage] = [SQLStorage(self.shard_path(index)) for index in range(self.shard_count)]
+        self._locks = [threading.Lock() for _ in self.shards]
+        self._readers: Dict[int, SQLReader] = {}
+        # Numbers documents without a source; next() on a count is atomic, so threads never share a turn
+        self._round_robin = itertools.count()
+
+    def _read_layout(self, shards: int) -> int:
+        """
+        Loads the shard count of an existing store, or records it for a new one.
+
+        :param shards: Shard count requested by the caller.
+        :return: The shard count the store uses.
+        """
+        path = os.path.join(self.folder, "shards.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                count = json.load(f)["shards"]
+            if count != shards:
+                logger.info("Store '%s' has %d shards; ignoring shards=%d", self.folder, count, shards)
+            return count
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"shards": shards}, f)
+        return shards
+
+    def shard_path(self, index: int) -> str:
+        """
+        Returns the path of a shard database.
+
+        :param index: Shard number.
+        :return: Path of the shard's SQLite file.
+        """
+        return os.path.join(self.folder, f"shard-{index:02d}.sqlite")
+
+    def shard_for(self, source: Optional[str]) -> int:
+        """
+        Picks the shard a document belongs to.
+
+        The hash is stable across processes and runs (unlike hash()), so every
+        copy of a source lands in the same shard. Documents without a source are
+        spread round-robin.
+
+        :param source: Path of the document, if known.
+        :return: Shard number.
+        """
+        if source is None:
+            return next(self._round_robin) % self.shard_count
+        digest = hashlib.blake2b(source.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % self.shard_count
+
+    def global_id(self, shard: int, local_id: int) -> int:
+        """
+        Turns a shard-local document ID into a global one.
+        """
+        return local_id * self.shard_count + shard
+
+    def split_id(self, document_id: int) -> Tuple[int, int]:
+        """
+        Turns a global document ID into (shard, local ID).
+        """
+        return document_id % self.shard_count, document_id // self.shard_count
+
+    def save(self, pages: Optional[Iterable[int]] = None, fields: Optional[Iterable[str]] = None) -> bool:
+        """
+        Extracts the extractor's document and streams it into its shard.
+
+        :param pages: Zero-based page or slide indices to store; all pages if omitted.
+        :param fields: Names of the fields to store, e.g. ["text"]; all if omitted.
+        :return: True if the data was committed, False otherwise.
+        """
+        return self.save_stream(pages=pages, fields=fields)
+
+    def save_result(self, result: ExtractionResult) -> bool:
+        """
+        Stores an already extracted result in its shard.
+
+        Safe to call from several threads; calls for different shards run in parallel.
+
+        :param result: An ExtractionResult produced by DataExtractor.extract_all().
+        :return: True if the data was committed, False otherwise.
+        """
+        shard = self.shard_for(result.source)
+        return self._write(shard, lambda storage: storage.save_results([result]))
+
+    @instrumented("sharded_sql_storage.save_results")
+    def save_results(self, results: Iterable[ExtractionResult]) -> bool:
+        """
+        Stores many results, one transaction per shard, with the shards written in parallel.
+
+        :param results: ExtractionResults to store.
+        :return: True if every shard committed, False otherwise.
+        """
+        batches: Dict[int, List[ExtractionResult]] = {}
+        last_shard = None
+        for result in results:
+            last_shard = self.shard_for(result.source)
+            batches.setdefault(last_shard, []).append(result)
+        if len(batches) <= 1:
+            return all(self._write(shard, lambda s, b=batch: s.save_results(b)) for shard, batch in batches.items())
+
+        with ThreadPoolExecutor(max_workers=len(batches)) as pool:
+            futures = [
+                pool.submit(self._write, shard, lambda s, b=batch: s.save_results(b))
+                for shard, batch in batches.items()
+            ]
+            saved = all([future.result() for future in futures])
+        # Shards finish in any order; point last_document_id at the batch's last result
+        self.last_document_id = self.global_id(last_shard, self.shards[last_shard].last_document_id)
+        return saved
+
+    def save_stream(
+        self,
+        records: Optional[Iterable[PageRecord]] = None,
+        source: Optional[str] = None,
+        pages: Optional[Iterable[int]] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """
+        Stores page records in the shard of their source, as SQLStorage.save_stream() does.
+
+        :param records: Page records to save; defaults to the extractor's iter_pages().
+        :param source: Path of the document; defaults to the extractor's file path.
+        :param pages: Zero-based page or slide indices to extract when records is omitted.
+        :param fields: Names of the fields to extract when records is omitted, e.g. ["text"].
+        :return: True if the data was committed, False if it was not or the document could not be loaded.
+        """
+        if records is None:
+            error = self.extractor.load_error
+            if error:
+                logger.error("Error saving data to database: %s", error)
+                return False
+            records = self.extractor.iter_pages(pages=pages, fields=fields)
+        if source is None and self.extractor is not None:
+            source = self.extractor.file_loader.file_path
+        return self._write(self.shard_for(source), lambda storage: storage.save_stream(records, source))
+
+    def manifest_entry(self, source: str) -> Optional[ManifestEntry]:
+        """
+        Looks up a file's manifest entry in its shard; its document_id is shard-local.
+
+        With replace_document() and upsert_pages() this lets IncrementalIngestor
+        use a sharded store like a single database.
+
+        :param source: Path of the file.
+        :return: The ManifestEntry, or None if the file was never ingested incrementally.
+        """
+        shard = self.shard_for(source)
+        with self._locks[shard]:
+            return self.shards[shard].manifest_entry(source)
+
+    def save_manifest_entry(self, entry: ManifestEntry) -> None:
+        """
+        Records a manifest entry in the shard of its source.
+        """
+        shard = self.shard_for(entry.source)
+        with self._locks[shard]:
+            self.shards[shard].save_manifest_entry(entry)
+
+    def replace_document(self, entry: ManifestEntry, records: Iterable[PageRecord]) -> bool:
+        """
+        Replaces every stored copy of a source in its shard; see SQLStorage.replace_document().
+        """
+        return self._write(self.shard_for(entry.source), lambda storage: storage.replace_document(entry, records))
+
+    def upsert_pages(self, entry: ManifestEntry, records: Iterable[PageRecord], page_count: int) -> bool:
+        """
+        Replaces some pages of a stored document in its shard; see SQLStorage.upsert_pages().
+        """
+        return self._write(
+            self.shard_for(entry.source), lambda storage: storage.upsert_pages(entry, records, page_count)
+        )
+
+    def _write(self, shard: int, write) -> bool:
+        """
+        Runs a write against one shard under that shard's lock.
+
+        :param shard: Shard number.
+        :param write: Function taking the shard's SQLStorage and returning True on success.
+        :return: What write returned.
+        """
+        storage = self.shards[shard]
+        with self._locks[shard]:
+            saved = write(storage)
+            if saved and storage.last_document_id is not None:
+                self.last_document_id = self.global_id(shard, storage.last_document_id)
+        return saved
+
+    def document(
+        self, document_id: int, pages: Optional[Iterable[int]] = None, fields: Optional[Iterable[str]] = None
+    ) -> Optional[StoredDocument]:
+        """
+        Reads a stored document from its shard through a cached SQLReader.
+
+        :param document_id: Global document ID, e.g. last_document_id.
+        :param pages: Zero-based page or slide indices to read; all pages if omitted.
+        :param fields: Names of the fields to read, e.g. ["text"]; all if omitted.
+        :return: The StoredDocument, with its global document_id, or None if there is no such document.
+        """
+        shard, local_id = self.split_id(document_id)
+        if shard not in self._readers:
+            self._readers[shard] = SQLReader(self.shard_path(shard))
+        document = self._readers[shard].document(local_id, pages, fields)
+        if document is None:
+            return None
+        return StoredDocument(
+            document_id, document.source, document.file_type, document.text,
+            document.links, document.images, document.tables,
+        )
+
+    def search(self, query: str, limit: int = 10) -> List[SearchHit]:
+        """
+        Runs a full-text search on every shard and merges the hits by rank.
+
+        Ranks are FTS5 bm25() scores, which each shard computes from its own
+        term frequencies and average page length. They are only roughly
+        comparable across shards: a term that is rare in one shard but common
+        in another scores higher in the first, so the merged order is
+        approximate, especially for small shards or unevenly spread terms.
+        Within a shard the order is exact. Sort hits by other criteria when
+        an exact global order matters.
+
+        :param query: An FTS5 query, e.g. 'invoice AND "net 30"'.
+        :param limit: Maximum number of hits to return.
+        :return: Matching pages with global document IDs, best match first.
+        """
+        per_shard = []
+        for shard, storage in enumerate(self.shards):
+            with self._locks[shard]:
+                hits = storage.search(query, limit)
+            for hit in hits:
+                hit.document_id = self.global_id(shard, hit.document_id)
+            per_shard.append(hits)
+        # Each shard's hits are already sorted by rank
+        return list(heapq.merge(*per_shard, key=lambda hit: hit.rank))[:limit]
+
+    def query(self, sql: str, params: tuple = ()) -> Iterator[Tuple[int, tuple]]:
+        """
+        Runs the same read-only query on every shard.
+
+        Document IDs in the rows are shard-local; global_id() converts them.
+
+        :param sql: An SQL statement valid against the SQLStorage schema.
+        :param params: Query parameters.
+        :return: An iterator of (shard number, row).
+        """
+        for shard, storage in enumerate(self.shards):
+            with self._locks[shard]:
+                rows = storage.conn.execute(sql, params).fetchall()
+            for row in rows:
+                yield shard, row
+
+    def attach(self) -> sqlite3.Connection:
+        """
+        Opens a read-only connection with every shard attached and merged views over them.
+
+        The temporary views documents, text_data, links, images, and tables have
+        the same columns as in SQLStorage plus a shard column, and use global
+        document IDs, so ordinary SQL runs across the whole store. SQLite caps
+        attached databases (usually at 10); use query() for more shards.
+
+        :return: A new sqlite3 connection; the caller closes it.
+        :raises ValueError: If there are more shards than SQLite can attach.
+        """
+        conn = sqlite3.connect(":memory:", uri=True, check_same_thread=False)
+        limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        if self.shard_count > limit:
+            conn.close()
+            raise ValueError(f"{self.shard_count} shards exceed SQLite's limit of {limit} attached databases")
+
+        count = self.shard_count
+        for shard in range(count):
+            uri = f"file:{urllib.parse.quote(os.path.abspath(self.shard_path(shard)))}?mode=ro"
+            conn.execute("ATTACH DATABASE ? AS ?", (uri, f"s{shard}"))
+
+        conn.execute("CREATE TEMP VIEW documents AS " + " UNION ALL ".join(
+            f"SELECT id * {count} + {shard} AS id, {shard} AS shard, source, file_type, created_at "
+            f"FROM s{shard}.documents"
+            for shard in range(count)
+        ))
+        for table, columns in VIEW_COLUMNS.items():
+            conn.execute(f"CREATE TEMP VIEW {table} AS " + " UNION ALL ".join(
+                f"SELECT document_id * {count} + {shard} AS document_id, {shard} AS shard, {columns} "
+                f"FROM s{shard}.{table}"
+                for shard in range(count)
+            ))
+        return conn
+
+    def close(self) -> None:
+        """
+        Closes every shard connection and reader.
+        """
+        for reader in self._readers.values():
+            reader.close()
+        self._readers.clear()
+        for storage in self.shards:
+            storage.close()
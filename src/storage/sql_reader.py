@@ -0,0 +1,336 @@
+import os
+import json
+import logging
+import sqlite3
+import threading
+import urllib.parse
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import BinaryIO, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Union
+from src.extractors.records import field_mask
+from src.instrumentation.metrics import instrumented
+
+logger = logging.getLogger(__name__)
+
+# Bytes read per step when streaming an image blob
+BLOB_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class StoredImage:
+    """
+    Reference to an image stored in the database; the bytes are read on demand.
+    """
+
+    hash: str  # SHA-256 of the image, the key into image_blobs
+    ext: str
+    size: int  # Size of the image in bytes
+    page: Optional[int]  # None when the image was stored for the whole document
+
+
+@dataclass
+class StoredDocument:
+    """
+    Data read back for one stored document.
+
+    Fields that were not requested are left empty.
+    """
+
+    document_id: int
+    source: Optional[str] = None
+    file_type: Optional[str] = None
+    text: Optional[str] = None
+    links: List[str] = field(default_factory=list)
+    images: List[StoredImage] = field(default_factory=list)
+    tables: List[List[List[str]]] = field(default_factory=list)
+
+
+def _count_document(reader, args: tuple, result) -> Tuple[int, int]:
+    """
+    Metrics measure for document(): items and bytes of the document read back.
+    """
+    if result is None:
+        return 0, 0
+    items = len(result.links) + len(result.images) + len(result.tables)
+    return items, len(result.text or "")
+
+
+def _page_key(pages: Optional[Iterable[int]]) -> Optional[Tuple[int, ...]]:
+    """
+    Normalizes a page selection into a hashable, sorted tuple, or None for all pages.
+    """
+    if pages is None:
+        return None
+    return tuple(sorted(set(pages)))
+
+
+class SQLReader:
+    """
+    Reads extracted data back from a database written by SQLStorage.
+
+    Documents are looked up by ID, optionally limited to some pages and
+    fields. Recently read documents are kept in an in-process LRU cache, which
+    is cleared whenever another connection commits to the database. Image
+    bytes are not loaded with the document: they are read on demand, and can
+    be streamed in chunks straight from the blob.
+    """
+
+    def __init__(self, db_name: str, cache_size: int = 128) -> None:
+        """
+        Opens a database for reading.
+
+        :param db_name: Path of an SQLite database written by SQLStorage.
+        :param cache_size: Maximum number of documents kept in the cache; 0 disables it.
+        :raises sqlite3.OperationalError: If the database cannot be opened.
+        """
+        self.db_name = db_name
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[tuple, StoredDocument]" = OrderedDict()
+        self._data_version: Optional[int] = None
+        # The UI serves requests from several threads; one lock guards the connection and the cache
+        self._lock = threading.Lock()
+        uri = f"file:{urllib.parse.quote(os.path.abspath(db_name))}?mode=ro"
+        self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+    @instrumented("sql_reader.document", measure=_count_document)
+    def document(
+        self, document_id: int, pages: Optional[Iterable[int]] = None, fields: Optional[Iterable[str]] = None
+    ) -> Optional[StoredDocument]:
+        """
+        Reads a stored document.
+
+        Text is joined across pages with newlines, in page order. The returned
+        object is shared with the cache and should not be modified.
+
+        :param document_id: ID the document was stored under, e.g. SQLStorage.last_document_id.
+        :param pages: Zero-based page or slide indices to read, e.g. range(5); all pages if omitted.
+                      Data stored for the whole document (page NULL) is only returned when omitted.
+        :param fields: Names of the fields to read, e.g. ["text"]; all if omitted.
+        :return: The StoredDocument, or None if there is no document with that ID.
+        """
+        mask = field_mask(fields)
+        key = (document_id, _page_key(pages), mask)
+        with self._lock:
+            self._check_data_version()
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+
+            self.misses += 1
+            document = self._load(document_id, key[1], mask)
+            if document is not None and self.cache_size > 0:
+                self._cache[key] = document
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            return document
+
+    def text(self, document_id: int, pages: Optional[Iterable[int]] = None) -> Optional[str]:
+        """
+        Reads a document's text.
+
+        :param document_id: ID of the document.
+        :param pages: Zero-based page indices to read; all pages if omitted.
+        :return: The text, or None if the document does not exist or has no text.
+        """
+        document = self.document(document_id, pages, ["text"])
+        return document.text if document else None
+
+    def links(self, document_id: int, pages: Optional[Iterable[int]] = None) -> List[str]:
+        """
+        Reads a document's link URLs.
+
+        :param document_id: ID of the document.
+        :param pages: Zero-based page indices to read; all pages if omitted.
+        :return: URLs in page order.
+        """
+        document = self.document(document_id, pages, ["links"])
+        return document.links if document else []
+
+    def tables(self, document_id: int, pages: Optional[Iterable[int]] = None) -> List[List[List[str]]]:
+        """
+        Reads a document's tables.
+
+        :param document_id: ID of the document.
+        :param pages: Zero-based page indices to read; all pages if omitted.
+        :return: Tables in page order, each a list of rows.
+        """
+        document = self.document(document_id, pages, ["tables"])
+        return document.tables if document else []
+
+    def images(self, document_id: int, pages: Optional[Iterable[int]] = None) -> List[StoredImage]:
+        """
+        Lists a document's images without reading their bytes.
+
+        :param document_id: ID of the document.
+        :param pages: Zero-based page indices to read; all pages if omitted.
+        :return: Image references in page order.
+        """
+        document = self.document(document_id, pages, ["images"])
+        return document.images if document else []
+
+    def latest_document_id(self, source: str) -> Optional[int]:
+        """
+        Finds the most recently stored document for a source path.
+
+        :param source: Path the document was ingested from.
+        :return: The document ID, or None if the source was never stored.
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT MAX(id) FROM documents WHERE source = ?", (source,)).fetchone()
+        return row[0]
+
+    def read_image(self, image: Union[StoredImage, str]) -> bytes:
+        """
+        Reads an image's bytes in one go.
+
+        :param image: A StoredImage or its hash.
+        :return: The image data.
+        :raises KeyError: If no image with that hash is stored.
+        """
+        rowid = self._image_rowid(image)
+        with self._lock:
+            with self.conn.blobopen("image_blobs", "data", rowid, readonly=True) as blob:
+                return blob.read()
+
+    def iter_image(self, image: Union[StoredImage, str], chunk_size: int = BLOB_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Streams an image's bytes straight from its blob, chunk_size bytes at a time.
+
+        Only one chunk is held in memory, so large images can be sent to a
+        client without loading them whole.
+
+        :param image: A StoredImage or its hash.
+        :param chunk_size: Bytes per chunk.
+        :return: An iterator of byte chunks.
+        :raises KeyError: If no image with that hash is stored.
+        """
+        rowid = self._image_rowid(image)
+        offset = 0
+        while True:
+            with self._lock:
+                with self.conn.blobopen("image_blobs", "data", rowid, readonly=True) as blob:
+                    blob.seek(offset)
+                    chunk = blob.read(chunk_size)
+            if not chunk:
+                return
+            offset += len(chunk)
+            yield chunk
+
+    def open_image(self, image: Union[StoredImage, str]) -> BinaryIO:
+        """
+        Opens an image blob as a read-only, seekable file-like object.
+
+        The caller must close it (it is a context manager) and must not use
+        this reader from other threads while it is open.
+
+        :param image: A StoredImage or its hash.
+        :return: An sqlite3.Blob supporting read(), seek(), and tell().
+        :raises KeyError: If no image with that hash is stored.
+        """
+        return self.conn.blobopen("image_blobs", "data", self._image_rowid(image), readonly=True)
+
+    def clear_cache(self) -> None:
+        """
+        Drops every cached document.
+        """
+        with self._lock:
+            self._cache.clear()
+
+    def close(self) -> None:
+        """
+        Closes the database connection.
+        """
+        self.conn.close()
+
+    def __enter__(self) -> "SQLReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _check_data_version(self) -> None:
+        """
+        Clears the cache if another connection has committed since the last read.
+
+        PRAGMA data_version changes on every commit made through a different
+        connection, which covers every SQLStorage writer.
+        """
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._data_version is not None and version != self._data_version and self._cache:
+            logger.debug("Database changed; dropping %d cached document(s)", len(self._cache))
+            self._cache.clear()
+        self._data_version = version
+
+    def _image_rowid(self, image: Union[StoredImage, str]) -> int:
+        """
+        Looks up the rowid of an image blob, which blobopen() needs.
+        """
+        digest = image.hash if isinstance(image, StoredImage) else image
+        with self._lock:
+            row = self.conn.execute("SELECT rowid FROM image_blobs WHERE hash = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(f"No stored image with hash {digest}")
+        return row[0]
+
+    def _load(
+        self, document_id: int, pages: Optional[Tuple[int, ...]], mask: FrozenSet[str]
+    ) -> Optional[StoredDocument]:
+        """
+        Reads a document from the database; the caller holds the lock.
+
+        :param document_id: ID of the document.
+        :param pages: Sorted page indices, or None for all pages.
+        :param mask: Fields to read.
+        :return: The StoredDocument, or None if there is no such document.
+        """
+        row = self.conn.execute("SELECT source, file_type FROM documents WHERE id = ?", (document_id,)).fetchone()
+        if row is None:
+            return None
+        document = StoredDocument(document_id, row[0], row[1])
+        where, params = self._page_filter(document_id, pages)
+        image_where, _ = self._page_filter(document_id, pages, prefix="i.")
+
+        if "text" in mask:
+            rows = self.conn.execute(f"SELECT content FROM text_data WHERE {where} ORDER BY page, id", params)
+            texts = [content for content, in rows]
+            document.text = "\n".join(texts) if texts else None
+        if "links" in mask:
+            rows = self.conn.execute(f"SELECT url FROM links WHERE {where} ORDER BY page, id", params)
+            document.links = [url for url, in rows]
+        if "tables" in mask:
+            rows = self.conn.execute(f"SELECT content FROM tables WHERE {where} ORDER BY page, id", params)
+            document.tables = [json.loads(content) for content, in rows]
+        if "images" in mask:
+            rows = self.conn.execute(
+                f"SELECT i.hash, b.ext, b.size, i.page FROM images i JOIN image_blobs b ON b.hash = i.hash "
+                f"WHERE {image_where} ORDER BY i.page, i.id",
+                params,
+            )
+            document.images = [StoredImage(*row) for row in rows]
+        return document
+
+    @staticmethod
+    def _page_filter(document_id: int, pages: Optional[Tuple[int, ...]], prefix: str = "") -> Tuple[str, tuple]:
+        """
+        Builds the WHERE clause selecting a document's rows, optionally limited to some pages.
+
+        A contiguous run of pages becomes a BETWEEN, which uses the (document_id, page)
+        indexes as a single range scan.
+
+        :param document_id: ID of the document.
+        :param pages: Sorted page indices, or None for all pages.
+        :param prefix: Table alias prefix for the columns, e.g. "i.".
+        :return: Tuple of (SQL condition, parameters).
+        """
+        if pages is None:
+            return f"{prefix}document_id = ?", (document_id,)
+        if not pages:
+            return "0", ()
+        if pages[-1] - pages[0] + 1 == len(pages):
+            return f"{prefix}document_id = ? AND {prefix}page BETWEEN ? AND ?", (document_id, pages[0], pages[-1])
+        placeholders = ", ".join("?" * len(pages))
+        return f"{prefix}document_id = ? AND {prefix}page IN ({placeholders})", (document_id, *pages)
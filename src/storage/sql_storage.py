@@ -1,120 +1,564 @@
+import os
+import json
+import logging
 import sqlite3
-from typing import Optional
-from src.extractors.data_extractor import DataExtractor
-from src.loaders.docx_loader import DOCXLoader
-from src.loaders.pdf_loader import PDFLoader
-from src.loaders.ppt_loader import PPTLoader
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Set
+from src.extractors.data_extractor import DataExtractor, ExtractionResult, PageRecord, link_url
+from src.storage.image_store import image_extension, image_hash
+from src.instrumentation.metrics import count_written, instrumented
+
+logger = logging.getLogger(__name__)
+
+
+# Stored in PRAGMA user_version; bump whenever SCHEMA changes
+SCHEMA_VERSION = 1
+
+# Every row belongs to a document. page is the zero-based page or slide number,
+# or NULL for data that was extracted from the document as a whole.
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS documents (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source TEXT,
+        file_type TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS text_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+        page INTEGER,
+        content TEXT
+    );
+    CREATE TABLE IF NOT EXISTS links (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+        page INTEGER,
+        url TEXT
+    );
+    CREATE TABLE IF NOT EXISTS image_blobs (
+        hash TEXT PRIMARY KEY,  -- SHA-256 of data; each distinct image is stored once
+        ext TEXT,
+        size INTEGER,
+        data BLOB
+    );
+    CREATE TABLE IF NOT EXISTS images (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+        page INTEGER,
+        hash TEXT NOT NULL REFERENCES image_blobs(hash)
+    );
+    CREATE TABLE IF NOT EXISTS tables (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+        page INTEGER,
+        content TEXT  -- JSON array of rows
+    );
+    CREATE TABLE IF NOT EXISTS manifest (
+        source TEXT PRIMARY KEY,  -- Path the document was ingested from
+        document_id INTEGER REFERENCES documents(id) ON DELETE CASCADE,
+        size INTEGER,
+        mtime_ns INTEGER,
+        content_hash TEXT,  -- SHA-256 of the file
+        page_hashes TEXT  -- JSON array of per-page hashes (PDF only)
+    );
+    CREATE INDEX IF NOT EXISTS idx_documents_source ON documents(source);
+    CREATE INDEX IF NOT EXISTS idx_text_data_document ON text_data(document_id, page);
+    CREATE INDEX IF NOT EXISTS idx_links_document ON links(document_id, page);
+    CREATE INDEX IF NOT EXISTS idx_links_url ON links(url);
+    CREATE INDEX IF NOT EXISTS idx_images_document ON images(document_id, page);
+    CREATE INDEX IF NOT EXISTS idx_images_hash ON images(hash);
+    CREATE INDEX IF NOT EXISTS idx_tables_document ON tables(document_id, page);
+"""
+
+# Full-text index over text_data. It is an external-content table, so the text
+# is stored once in text_data and triggers keep the index in step with it.
+FTS_SCHEMA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS text_fts USING fts5(
+        content, content='text_data', content_rowid='id', tokenize='porter unicode61'
+    );
+    CREATE TRIGGER IF NOT EXISTS text_data_ai AFTER INSERT ON text_data BEGIN
+        INSERT INTO text_fts (rowid, content) VALUES (new.id, new.content);
+    END;
+    CREATE TRIGGER IF NOT EXISTS text_data_ad AFTER DELETE ON text_data BEGIN
+        INSERT INTO text_fts (text_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END;
+    CREATE TRIGGER IF NOT EXISTS text_data_au AFTER UPDATE ON text_data BEGIN
+        INSERT INTO text_fts (text_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO text_fts (rowid, content) VALUES (new.id, new.content);
+    END;
+"""
+
+# Tables from the original schema, which had no document_id column
+LEGACY_TABLES = ("text_data", "links", "images", "tables")
+
+# Tables holding per-page rows of a document
+PAGE_TABLES = ("text_data", "links", "images", "tables")
+
+
+def _count_page(storage, args: tuple, result):
+    """
+    Metrics measure for _insert_page(): counts the PageRecord being inserted.
+    """
+    return count_written(storage, args[1:], result)
+
+
+@dataclass
+class SearchHit:
+    """
+    A single full-text search match.
+    """
+
+    document_id: int
+    page: Optional[int]  # None when the text was stored for the whole document
+    rank: float  # BM25 score; lower is a better match
+    snippet: str
+
+
+@dataclass
+class ManifestEntry:
+    """
+    What was ingested for one source file, used to detect changes on re-ingestion.
+    """
+
+    source: str
+    size: int
+    mtime_ns: int
+    content_hash: str
+    page_hashes: List[str] = field(default_factory=list)  # PDF only
+    document_id: Optional[int] = None
 
 
 class SQLStorage:
     """
     Handles storage of extracted data into an SQLite database.
+
+    Each saved document gets a row in the documents table, and all of its text,
+    links, images, and tables reference that row. Writes are batched with
+    executemany inside a single transaction per save call.
     """
 
-    def __init__(self, db_name: str, extractor: DataExtractor) -> None:
+    def __init__(self, db_name: str, extractor: Optional[DataExtractor] = None) -> None:
         """
         Initializes the SQL storage with a database file and creates necessary tables.
 
         :param db_name: Name of the SQLite database file.
-        :param extractor: An instance of DataExtractor for extracting data.
+        :param extractor: An instance of DataExtractor for extracting data. May be omitted
+                          when results are only passed in through save_result().
         """
         self.db_name = db_name
         self.extractor = extractor
-        self.conn = sqlite3.connect(self.db_name)  # Connect to the SQLite database
+        self.last_document_id: Optional[int] = None  # ID assigned to the most recently saved document
+        self.fts_enabled = False  # Set once the full-text index is available
+        # Calls may come from a worker thread (e.g. an AsyncPipeline sink), but never concurrently
+        self.conn = sqlite3.connect(self.db_name, check_same_thread=False)
         self.cursor = self.conn.cursor()
+        self._configure_connection()
         self._create_tables()  # Ensure required tables exist
 
+    def _configure_connection(self) -> None:
+        """
+        Applies pragmas tuned for bulk ingestion.
+
+        WAL lets readers run alongside the writer, and synchronous=NORMAL stays
+        safe across application crashes without an fsync on every commit.
+        """
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+        self.cursor.execute("PRAGMA synchronous=NORMAL")
+        self.cursor.execute("PRAGMA foreign_keys=ON")
+        self.cursor.execute("PRAGMA temp_store=MEMORY")
+        self.cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+
     def _create_tables(self) -> None:
         """
-        Creates necessary tables if they do not exist in the database.
+        Creates necessary tables and indexes if they do not exist in the database.
+
+        Databases written with the original schema have their tables renamed
+        with a "_v0" suffix so the old rows are kept but out of the way.
         """
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS text_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                content TEXT
-            )
-        """)
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS links (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                url TEXT
-            )
-        """)
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS images (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                data BLOB
-            )
-        """)
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS tables (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                content TEXT
-            )
-        """)
+        version = self.cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            self._rename_legacy_tables()
+
+        self.cursor.executescript(SCHEMA)
+        self._create_fts_index()
+        self.cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         self.conn.commit()  # Save changes
 
-    def save(self) -> None:
+    def _create_fts_index(self) -> None:
+        """
+        Creates the FTS5 full-text index, if this SQLite build supports it.
+
+        Text stored before the index existed, e.g. by a SQLite build without
+        FTS5, is indexed when the index is created.
+        """
+        existed = self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'text_fts'").fetchone()
+        try:
+            self.cursor.executescript(FTS_SCHEMA)
+        except sqlite3.OperationalError as e:
+            logger.warning("Full-text search disabled: %s", e)
+            return
+
+        if not existed and self.cursor.execute("SELECT 1 FROM text_data LIMIT 1").fetchone():
+            self.cursor.execute("INSERT INTO text_fts (text_fts) VALUES ('rebuild')")
+        self.fts_enabled = True
+
+    def _rename_legacy_tables(self) -> None:
+        """
+        Moves tables from the original schema aside.
+        """
+        for table in LEGACY_TABLES:
+            columns = [row[1] for row in self.cursor.execute(f"PRAGMA table_info({table})")]
+            if columns and "document_id" not in columns:
+                self.cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_v0")
+                logger.info("Renamed legacy table '%s' to '%s_v0'", table, table)
+
+    def save(self, pages: Optional[Iterable[int]] = None, fields: Optional[Iterable[str]] = None) -> bool:
         """
         Extracts and stores text, links, images, and tables in the database.
+
+        Data is stored page by page (slide by slide for PPTX), so search hits
+        point at the page they came from.
+
+        :param pages: Zero-based page or slide indices to store, e.g. range(5); all pages if omitted.
+        :param fields: Names of the fields to store, e.g. ["text", "links"]; all if omitted.
+                       Fields left out are not extracted at all.
+        :return: True if the data was committed, False otherwise.
+        """
+        # One pass over the document instead of one per data type
+        return self.save_stream(pages=pages, fields=fields)
+
+    def save_result(self, result: ExtractionResult) -> bool:
+        """
+        Stores an already extracted result in the database.
+
+        :param result: An ExtractionResult produced by DataExtractor.extract_all().
+        :return: True if the data was committed, False otherwise.
+        """
+        return self.save_results([result])
+
+    @instrumented("sql_storage.save_results")
+    def save_results(self, results: Iterable[ExtractionResult]) -> bool:
+        """
+        Stores many extracted results in a single transaction.
+
+        Results that carry page records (PDF, PPTX) are stored page by page,
+        like save_stream() does; the others are stored as one row set with a
+        NULL page.
+
+        :param results: ExtractionResults to store.
+        :return: True if the data was committed, False otherwise.
+        """
+        try:
+            count = 0
+            with self.conn:  # Commits on success, rolls back on error
+                for result in results:
+                    document_id = self._insert_document(result.source)
+                    records = result.pages or [
+                        PageRecord(None, result.text or "", result.links, result.images, result.tables)
+                    ]
+                    for record in records:
+                        self._insert_page(document_id, record)
+                    self.last_document_id = document_id
+                    count += 1
+            logger.info("%d document(s) saved to the database successfully!", count)
+            return True
+
+        except Exception as e:
+            logger.error("Error saving data to database: %s", e)
+            return False
+
+    @instrumented("sql_storage.save_stream")
+    def save_stream(
+        self,
+        records: Optional[Iterable[PageRecord]] = None,
+        source: Optional[str] = None,
+        pages: Optional[Iterable[int]] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """
+        Stores page records as they are produced, holding only one page in memory.
+
+        Each page's rows are tagged with its page number. Everything is
+        committed in one transaction once the stream is exhausted.
+
+        :param records: Page records to save; defaults to the extractor's iter_pages().
+        :param source: Path of the document, recorded in the documents table;
+                       defaults to the extractor's file path.
+        :param pages: Zero-based page or slide indices to extract when records is omitted.
+        :param fields: Names of the fields to extract when records is omitted, e.g. ["text"].
+        :return: True if the data was committed, False if it was not or the document could not be loaded.
+        """
+        if records is None:
+            error = self.extractor.load_error
+            if error:
+                logger.error("Error saving data to database: %s", error)
+                return False
+            records = self.extractor.iter_pages(pages=pages, fields=fields)
+        if source is None and self.extractor is not None:
+            source = self.extractor.file_loader.file_path
+
+        try:
+            page_count = 0
+            with self.conn:  # Commits on success, rolls back on error
+                document_id = self._insert_document(source)
+                for record in records:
+                    self._insert_page(document_id, record)
+                    page_count += 1
+            self.last_document_id = document_id
+            logger.info("Streamed %d pages to the database successfully!", page_count)
+            return True
+
+        except Exception as e:
+            logger.error("Error saving data to database: %s", e)
+            return False
+
+    def manifest_entry(self, source: str) -> Optional[ManifestEntry]:
+        """
+        Looks up the manifest entry recorded when a file was last ingested.
+
+        :param source: Path of the file.
+        :return: The ManifestEntry, or None if the file was never ingested incrementally.
+        """
+        row = self.cursor.execute(
+            "SELECT source, size, mtime_ns, content_hash, page_hashes, document_id FROM manifest WHERE source = ?",
+            (source,),
+        ).fetchone()
+        if row is None:
+            return None
+        return ManifestEntry(row[0], row[1], row[2], row[3], json.loads(row[4] or "[]"), row[5])
+
+    def save_manifest_entry(self, entry: ManifestEntry) -> None:
+        """
+        Records a manifest entry, e.g. after a file was touched but its content is unchanged.
+
+        :param entry: The entry to store.
+        """
+        with self.conn:
+            self._write_manifest_entry(entry)
+
+    @instrumented("sql_storage.replace_document")
+    def replace_document(self, entry: ManifestEntry, records: Iterable[PageRecord]) -> bool:
+        """
+        Stores a document in place of every earlier copy from the same source.
+
+        Earlier rows for the source are deleted (their pages, links, images, and
+        tables cascade), the new pages are inserted, image blobs no document
+        references any more are dropped, and the manifest entry is updated, all
+        in one transaction.
+
+        :param entry: Manifest entry of the file; its document_id is filled in.
+        :param records: Page records of the whole document.
+        :return: True if the data was committed, False otherwise.
         """
         try:
-            text_data: Optional[str] = self.extractor.extract_text()
-            links = self.extractor.extract_links()
-            images = self.extractor.extract_images()
-            tables = self.extractor.extract_tables()
-
-            # Save extracted text
-            if text_data:
-                self.cursor.execute("INSERT INTO text_data (content) VALUES (?)", (text_data,))
-                print("Text saved successfully.")
-
-            # Save extracted links
-            for link in links:
-                self.cursor.execute("INSERT INTO links (url) VALUES (?)", (link,))
-            print("Links saved successfully.")
-
-            # Save extracted images
-            for idx, img in enumerate(images):
-                if isinstance(img, bytes):  # Ensure the image is in binary format
-                    self.cursor.execute("INSERT INTO images (data) VALUES (?)", (sqlite3.Binary(img),))
-                    print(f"Image {idx} saved successfully.")
-                else:
-                    print(f"Skipped image {idx} - Invalid format.")
-
-            # Save extracted tables
-            for idx, table in enumerate(tables):
-                table_str = str(table)  # Convert table to string format before saving
-                self.cursor.execute("INSERT INTO tables (content) VALUES (?)", (table_str,))
-                print(f"Table {idx} saved successfully.")
-
-            self.conn.commit()  # Commit changes to database
-            print("All extracted data has been saved to the database successfully!")
+            with self.conn:
+                released = {
+                    digest for digest, in self.cursor.execute(
+                        "SELECT i.hash FROM images i JOIN documents d ON d.id = i.document_id WHERE d.source = ?",
+                        (entry.source,),
+                    )
+                }
+                self.cursor.execute("DELETE FROM documents WHERE source = ?", (entry.source,))
+                document_id = self._insert_document(entry.source)
+                for record in records:
+                    self._insert_page(document_id, record)
+                self._delete_orphaned_images(released)
+                entry.document_id = document_id
+                self._write_manifest_entry(entry)
+            self.last_document_id = document_id
+            return True
 
         except Exception as e:
-            print(f"Error saving data to database: {e}")
+            logger.error("Error replacing document '%s': %s", entry.source, e)
+            return False
+
+    @instrumented("sql_storage.upsert_pages")
+    def upsert_pages(self, entry: ManifestEntry, records: Iterable[PageRecord], page_count: int) -> bool:
+        """
+        Replaces the rows of some pages of an already stored document.
+
+        Rows of each given page are deleted and re-inserted, rows of pages at or
+        beyond page_count (pages removed from the file) are deleted, orphaned
+        image blobs are dropped, and the manifest entry is updated, all in one
+        transaction.
+
+        :param entry: Manifest entry of the file, with the document_id it was stored under.
+        :param records: Page records of the changed pages.
+        :param page_count: Number of pages the document now has.
+        :return: True if the data was committed, False otherwise.
+        """
+        document_id = entry.document_id
+        try:
+            with self.conn:
+                released = set()
+                self._delete_pages(document_id, "page >= ?", page_count, released)
+                for record in records:
+                    self._delete_pages(document_id, "page = ?", record.index, released)
+                    self._insert_page(document_id, record)
+                self._delete_orphaned_images(released)
+                self._write_manifest_entry(entry)
+            self.last_document_id = document_id
+            return True
+
+        except Exception as e:
+            logger.error("Error updating pages of '%s': %s", entry.source, e)
+            return False
+
+    def _delete_pages(self, document_id: int, condition: str, page: int, released: Set[str]) -> None:
+        """
+        Deletes the rows of some pages of a document; the caller manages the transaction.
+
+        :param document_id: ID of the document.
+        :param condition: SQL condition selecting the pages, e.g. "page = ?".
+        :param page: Value bound to the condition's placeholder.
+        :param released: Updated in place with the hashes of the deleted images rows.
+        """
+        released.update(
+            digest for digest, in self.cursor.execute(
+                f"SELECT hash FROM images WHERE document_id = ? AND {condition}", (document_id, page)
+            )
+        )
+        for table in PAGE_TABLES:
+            self.cursor.execute(f"DELETE FROM {table} WHERE document_id = ? AND {condition}", (document_id, page))
+
+    def _delete_orphaned_images(self, hashes: Set[str]) -> None:
+        """
+        Deletes the given image blobs if no images row references them any more;
+        the caller manages the transaction.
+
+        Deleting a document cascades to its images rows but not to the shared
+        blobs, which other documents may still use. Only the blobs of deleted
+        rows are checked, through the index on images(hash), so the cost does
+        not grow with the number of blobs stored.
+
+        :param hashes: Hashes of the images rows that were deleted.
+        """
+        self.cursor.executemany(
+            "DELETE FROM image_blobs WHERE hash = ? AND NOT EXISTS (SELECT 1 FROM images WHERE hash = ?)",
+            [(digest, digest) for digest in hashes],
+        )
+        if self.cursor.rowcount > 0:
+            logger.debug("Deleted %d orphaned image blob(s)", self.cursor.rowcount)
+
+    def _write_manifest_entry(self, entry: ManifestEntry) -> None:
+        """
+        Inserts or replaces a manifest row; the caller manages the transaction.
+
+        :param entry: The entry to store.
+        """
+        self.cursor.execute(
+            "INSERT OR REPLACE INTO manifest (source, document_id, size, mtime_ns, content_hash, page_hashes) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (entry.source, entry.document_id, entry.size, entry.mtime_ns, entry.content_hash, json.dumps(entry.page_hashes)),
+        )
+
+    def search(self, query: str, limit: int = 10) -> List[SearchHit]:
+        """
+        Searches stored text with the FTS5 index.
+
+        :param query: An FTS5 query, e.g. 'invoice AND "net 30"' or 'lorem*'.
+        :param limit: Maximum number of hits to return.
+        :return: Matching pages, best match first.
+        """
+        if not self.fts_enabled:
+            raise RuntimeError("Full-text search is not available in this SQLite build")
+
+        rows = self.cursor.execute(
+            """
+            SELECT t.document_id, t.page, bm25(text_fts) AS rank,
+                   snippet(text_fts, 0, '[', ']', '...', 12)
+            FROM text_fts JOIN text_data t ON t.id = text_fts.rowid
+            WHERE text_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+            """,
+            (query, limit),
+        ).fetchall()
+        return [SearchHit(*row) for row in rows]
+
+    def _insert_document(self, source: Optional[str]) -> int:
+        """
+        Adds a row to the documents table.
+
+        :param source: Path of the document, if known.
+        :return: The new document ID.
+        """
+        file_type = os.path.splitext(source)[1].lstrip(".").lower() if source else None
+        self.cursor.execute("INSERT INTO documents (source, file_type) VALUES (?, ?)", (source, file_type))
+        return self.cursor.lastrowid
+
+    @instrumented("sql_storage.insert_page", measure=_count_page)
+    def _insert_page(self, document_id: int, record: PageRecord) -> None:
+        """
+        Batch-inserts the text, links, images, and tables of one page.
+
+        :param document_id: ID of the owning document.
+        :param record: The page's extracted data; an index of None means the whole document.
+        """
+        page = record.index
+        if record.text:
+            self.cursor.execute(
+                "INSERT INTO text_data (document_id, page, content) VALUES (?, ?, ?)",
+                (document_id, page, record.text),
+            )
+
+        urls = [url for url in map(link_url, record.links) if url]
+        self.cursor.executemany(
+            "INSERT INTO links (document_id, page, url) VALUES (?, ?, ?)",
+            [(document_id, page, url) for url in urls],
+        )
+
+        images: List[bytes] = [img for img in record.images if isinstance(img, bytes)]
+        if len(images) < len(record.images):
+            logger.warning("Skipped %d image(s) - Invalid format.", len(record.images) - len(images))
+        self._insert_images(document_id, page, images)
+
+        self.cursor.executemany(
+            "INSERT INTO tables (document_id, page, content) VALUES (?, ?, ?)",
+            [(document_id, page, json.dumps(table)) for table in record.tables],
+        )
+
+    def _insert_images(self, document_id: int, page: Optional[int], images: List[bytes]) -> None:
+        """
+        Stores each distinct image once and links it to the document.
+
+        :param document_id: ID of the owning document.
+        :param page: Page the images appear on, or None for the whole document.
+        :param images: Image byte data.
+        """
+        hashes = [image_hash(img) for img in images]
+        self.cursor.executemany(
+            "INSERT OR IGNORE INTO image_blobs (hash, ext, size, data) VALUES (?, ?, ?, ?)",
+            [(digest, image_extension(img), len(img), sqlite3.Binary(img)) for digest, img in zip(hashes, images)],
+        )
+        self.cursor.executemany(
+            "INSERT INTO images (document_id, page, hash) VALUES (?, ?, ?)",
+            [(document_id, page, digest) for digest in hashes],
+        )
 
     def close(self) -> None:
         """
         Closes the database connection.
         """
         self.conn.close()
-        print("Database connection closed.")
+        logger.debug("Database connection closed.")
 
 
-# Example Usage: Store extracted data from DOCX, PDF, and PPTX
+# Example Usage: python -m src.storage.sql_storage
+if __name__ == "__main__":
+    from src.loaders.docx_loader import DOCXLoader
 
-print("\nProcessing DOCX file...")
-docx_test = SQLStorage("test_db.sqlite", DataExtractor(DOCXLoader("data/sample.docx")))
-docx_test.save()
-docx_test.close()
+    print("\nProcessing DOCX file...")
+    docx_test = SQLStorage("test_db.sqlite", DataExtractor(DOCXLoader("data/sample.docx")))
+    docx_test.save()
+    docx_test.close()
 
-# print("\nProcessing PDF file...")
-# pdf_test = SQLStorage("test_db.sqlite", DataExtractor(PDFLoader("sample.pdf")))
-# pdf_test.save()
-# pdf_test.close()
+    # print("\nProcessing PDF file...")
+    # pdf_test = SQLStorage("test_db.sqlite", DataExtractor(PDFLoader("sample.pdf")))
+    # pdf_test.save()
+    # pdf_test.close()
 
-# print("\nProcessing PPT file...")
-# ppt_test = SQLStorage("test_db.sqlite", DataExtractor(PPTLoader("sample.pptx")))
-# ppt_test.save()
-# ppt_test.close()
+    # print("\nProcessing PPT file...")
+    # ppt_test = SQLStorage("test_db.sqlite", DataExtractor(PPTLoader("sample.pptx")))
+    # ppt_test.save()
+    # ppt_test.close()
@@ -1,10 +1,56 @@
+import io
+import os
+import time
+import json
+import signal
+import functools
+import mmap
+import shutil
+import sqlite3
+import tempfile
 import unittest
+import unittest.mock
+from concurrent.futures import ThreadPoolExecutor
+import fitz
+import docx
+from PIL import Image
 from src.loaders.pdf_loader import PDFLoader
 from src.loaders.docx_loader import DOCXLoader
 from src.loaders.ppt_loader import PPTLoader
-from src.extractors.data_extractor import DataExtractor
+from src.loaders.registry import UnsupportedFormatError, loader_for, registry
+from src.extractors.data_extractor import DataExtractor, ExtractionResult, PageRecord, compare_engines
 from src.storage.file_storage import FileStorage
-from src.storage.sql_storage import SQLStorage
+from src.storage.sql_storage import ManifestEntry, SQLStorage
+from src.storage.shard_storage import ShardStorage
+from src.storage.image_store import ImageStore
+from src.storage.sql_reader import SQLReader
+from src.storage.sharded_sql_storage import ShardedSQLStorage
+from src.extractors.extraction_cache import ExtractionCache
+from src.extractors.handlers import PDFHandler
+from src.extractors.pdf_tables import _has_ruling_lines
+from src.pipeline.batch_extractor import BatchExtractor
+from src.pipeline.async_pipeline import AsyncPipeline
+from src.pipeline.incremental import IncrementalIngestor
+from src.pipeline.worker_service import WorkerClient, WorkerService
+from src.pipeline.image_pipeline import ImagePipeline
+from src.pipeline.governed import ExtractionLimits, GovernedExtractor
+from src.instrumentation.metrics import InMemorySink, JSONLinesSink, PrometheusSink, metrics
+from src.instrumentation.profiling import ProfilingHook
+from benchmarks.run_benchmarks import compare, run_benchmarks
+from benchmarks.import_budget import IMPORT_BUDGET_MS, best_of
+from benchmarks.synthetic import make_pdf as make_synthetic_pdf, make_docx, make_pptx
+
+def make_pdf(path, pages, texts=None, image=None, image_pages=None):
+    """Write a simple PDF with the given number of pages, optionally overriding texts and sharing one image"""
+    document = fitz.open()
+    for number in range(pages):
+        page = document.new_page()
+        page.insert_text((72, 72), (texts or {}).get(number, f"Page {number}"))
+        if image is not None and (image_pages is None or number in image_pages):
+            page.insert_image(fitz.Rect(72, 100, 122, 150), stream=image)  # Same xref on every page
+    document.save(path)
+    document.close()
+
 
 class TestFileLoaders(unittest.TestCase):
 
@@ -26,6 +72,80 @@ class TestFileLoaders(unittest.TestCase):
         """Test if the PPT loader correctly loads a file"""
         self.assertIsNotNone(self.ppt_loader.load_file(), "PPT file should load successfully")
 
+    def test_load_errors_are_reported_and_bugs_propagate(self):
+        """Test that corrupt files record why they failed while unexpected errors are not swallowed"""
+        loader = PDFLoader("corrupt.pdf", data=b"%PDF-1.4 truncated")
+        self.assertIsNone(loader.document)
+        self.assertTrue(loader.load_error.startswith("FileDataError"), loader.load_error)
+
+        with unittest.mock.patch("fitz.open", side_effect=TypeError("bug")):
+            with self.assertRaises(TypeError):
+                PDFLoader("data/sample.pdf").load_file()
+
+        # A missing file is reported as such, not as the wrong format
+        for loader_cls in (PDFLoader, DOCXLoader, PPTLoader):
+            loader = loader_cls("missing.file")
+            self.assertIsNone(loader.document)
+            self.assertTrue(loader.load_error.startswith("FileNotFoundError"), loader.load_error)
+        loader = DOCXLoader("data/sample.pdf")
+        self.assertIsNone(loader.document)
+        self.assertEqual(loader.load_error, "Not a DOCX file")
+        with self.assertRaises(FileNotFoundError):
+            loader_for("missing.pdf")
+
+    def test_documents_open_lazily(self):
+        """Test that nothing is parsed until data is requested, and that the document is parsed once"""
+        with PPTLoader("data/sample.pptx") as loader:
+            extractor = DataExtractor(loader)
+            self.assertFalse(loader.is_loaded, "Constructing an extractor should not load the file")
+
+            document = extractor.document
+            extractor.extract_text()
+            extractor.extract_links()
+            self.assertIs(loader.document, document, "The document should be reused, not reloaded")
+        self.assertFalse(loader.is_loaded, "Leaving the with-block should close the document")
+
+    def test_registry_detects_format_from_signature(self):
+        """Test that loaders are picked by magic bytes, so misnamed and bogus files are caught before parsing"""
+        with tempfile.TemporaryDirectory() as work_dir:
+            misnamed = os.path.join(work_dir, "actually_a_pdf.docx")
+            shutil.copy("data/sample.pdf", misnamed)
+            bogus = os.path.join(work_dir, "bogus.pdf")
+            with open(bogus, "wb") as f:
+                f.write(b"plain text, not a PDF")
+
+            self.assertEqual(registry.detect("data/sample.docx"), "docx")
+            self.assertEqual(registry.detect("data/sample.pptx"), "pptx")
+            self.assertIsInstance(loader_for(misnamed), PDFLoader)
+            self.assertIsNone(DOCXLoader(misnamed).load_file(), "A PDF should be rejected by the DOCX loader")
+            with self.assertRaises(UnsupportedFormatError):
+                loader_for(bogus)
+            with open("data/sample.pptx", "rb") as f:
+                self.assertIsInstance(loader_for("upload", data=f.read()), PPTLoader)
+
+    def test_loaders_open_in_memory_data(self):
+        """Test that bytes, buffers, mmaps and file objects load without a path and extract like the file"""
+        for path, loader_cls, options in [
+            ("data/sample.pdf", PDFLoader, {}),
+            ("data/sample.docx", DOCXLoader, {}),
+            ("data/sample.docx", DOCXLoader, {"engine": "fast"}),
+            ("data/sample.pptx", PPTLoader, {}),
+            ("data/sample.pptx", PPTLoader, {"engine": "fast"}),
+        ]:
+            with DataExtractor(loader_cls(path, **options)) as extractor:
+                expected = extractor.extract_all()
+            with open(path, "rb") as f:
+                content = f.read()
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                f.seek(0)
+                sources = [content, bytearray(content), memoryview(content), mapped, io.BytesIO(content), f]
+                for data in sources:
+                    with DataExtractor(loader_cls(data=data, **options)) as extractor:
+                        result = extractor.extract_all()
+                    self.assertEqual((result.text, result.images), (expected.text, expected.images), (path, data))
+                self.assertIsInstance(loader_for(data=memoryview(content)), loader_cls)
+        self.assertRaises(ValueError, PDFLoader)
+
 
 class TestDataExtractor(unittest.TestCase):
 
@@ -64,6 +184,166 @@ class TestDataExtractor(unittest.TestCase):
         self.assertIsInstance(self.extractor_docx.extract_tables(), list, "Tables should be returned as a list")
         self.assertIsInstance(self.extractor_ppt.extract_tables(), list, "Tables should be returned as a list")
 
+    def test_extract_all_matches_individual_extractors(self):
+        """Test that the single-pass extraction returns the same data as the individual methods"""
+        for extractor in (self.extractor_pdf, self.extractor_docx, self.extractor_ppt):
+            result = extractor.extract_all()
+            self.assertEqual(result.text, extractor.extract_text())
+            self.assertEqual(result.links, extractor.extract_links())
+            self.assertEqual(result.images, extractor.extract_images())
+            self.assertEqual(result.tables, extractor.extract_tables())
+
+    def test_iter_pages_streams_each_pdf_page(self):
+        """Test that iter_pages yields one record per PDF page, in order"""
+        with tempfile.TemporaryDirectory() as work_dir:
+            pdf_path = os.path.join(work_dir, "pages.pdf")
+            make_pdf(pdf_path, 3)
+
+            extractor = DataExtractor(PDFLoader(pdf_path))
+            records = list(extractor.iter_pages())
+            self.assertEqual([record.index for record in records], [0, 1, 2])
+            self.assertEqual("\n".join(record.text for record in records), extractor.extract_text())
+            extractor.close()
+
+    def test_pdf_image_shared_by_pages_is_extracted_once(self):
+        """Test that an image object referenced from every page is only extracted once"""
+        with tempfile.TemporaryDirectory() as work_dir:
+            pdf_path = os.path.join(work_dir, "logo.pdf")
+            buffer = io.BytesIO()
+            Image.new("RGB", (8, 8), "red").save(buffer, "PNG")
+            logo = buffer.getvalue()
+            document = fitz.open()
+            xref = 0
+            for _ in range(3):
+                xref = document.new_page().insert_image(fitz.Rect(0, 0, 50, 50), stream=logo, xref=xref)
+            document.save(pdf_path)
+            document.close()
+
+            extractor = DataExtractor(PDFLoader(pdf_path))
+            self.assertEqual(len(extractor.extract_images()), 1)
+            self.assertEqual(sum(len(record.images) for record in extractor.iter_pages()), 1)
+            extractor.close()
+
+    def test_sharded_pdf_extraction_keeps_page_order(self):
+        """Test that splitting a PDF across worker processes gives the same result as a serial pass"""
+        with tempfile.TemporaryDirectory() as work_dir:
+            pdf_path = os.path.join(work_dir, "pages.pdf")
+            make_pdf(pdf_path, 7)
+
+            extractor = DataExtractor(PDFLoader(pdf_path))
+            records = list(extractor.iter_pages(workers=3, shard_size=2))
+            self.assertEqual([record.index for record in records], list(range(7)))
+            # Pages stream out per shard, and stopping early cancels the shards not yet started
+            pages = extractor.iter_pages(workers=2, shard_size=1)
+            self.assertEqual(next(pages).index, 0)
+            pages.close()
+            self.assertEqual(extractor.extract_all(workers=3), extractor.extract_all())
+            extractor.close()
+
+            # A logo shared by every page is extracted once, as in a serial pass
+            logo = io.BytesIO()
+            Image.new("RGB", (20, 20), "red").save(logo, "PNG")
+            make_pdf(pdf_path, 8, image=logo.getvalue())
+            with DataExtractor(PDFLoader(pdf_path)) as extractor:
+                sharded = extractor.extract_all(workers=4)
+                self.assertEqual(sharded, extractor.extract_all())
+                self.assertEqual(len(sharded.images), 1)
+                self.assertEqual(sharded.images, extractor.extract_images())
+
+    def test_pdf_tables_ruled_and_unruled(self):
+        """Test that PDF tables are found with and without ruling lines, and text pages yield none"""
+        rows = [["Name", "Qty", "Price"], ["Apple", "3", "1.20"], ["Pear", "10", "0.80"]]
+        with tempfile.TemporaryDirectory() as work_dir:
+            pdf_path = os.path.join(work_dir, "tables.pdf")
+            document = fitz.open()
+            ruled = document.new_page()
+            for r, row in enumerate(rows):
+                for c, value in enumerate(row):
+                    cell = fitz.Rect(72 + c * 100, 100 + r * 20, 172 + c * 100, 120 + r * 20)
+                    ruled.draw_rect(cell)
+                    ruled.insert_text((cell.x0 + 4, cell.y1 - 6), value)
+            unruled = document.new_page()
+            for r, row in enumerate(rows):
+                for c, value in enumerate(row):
+                    unruled.insert_text((72 + c * 120, 100 + r * 16), value)
+            document.new_page().insert_textbox(fitz.Rect(72, 72, 520, 700), "Lorem ipsum dolor sit amet. " * 80)
+            # A framed note and a highlight are not ruled-table evidence
+            boxed = document.new_page()
+            boxed.draw_rect(fitz.Rect(72, 72, 520, 200))
+            boxed.draw_rect(fitz.Rect(72, 220, 520, 240), color=None, fill=(1, 1, 0))
+            boxed.draw_rect(fitz.Rect(72, 260, 520, 280), color=None, fill=(1, 1, 0))
+            boxed.insert_textbox(fitz.Rect(80, 80, 510, 190), "Note: " + "prose inside a box. " * 10)
+            document.save(pdf_path)
+            document.close()
+
+            with DataExtractor(PDFLoader(pdf_path)) as extractor:
+                self.assertEqual([record.tables for record in extractor.iter_pages()], [[rows], [rows], [], []])
+                self.assertEqual(extractor.extract_tables(), [rows, rows])
+                self.assertEqual([_has_ruling_lines(page) for page in extractor.document], [True, False, False, False])
+
+    def test_fast_ooxml_engine_matches_default_engine(self):
+        """Test that the streaming DOCX/PPTX engine extracts the same data as python-docx and python-pptx"""
+        with tempfile.TemporaryDirectory() as work_dir:
+            docx_path = os.path.join(work_dir, "synthetic.docx")
+            pptx_path = os.path.join(work_dir, "synthetic.pptx")
+            make_docx(docx_path, pages=2, images=2, tables=2)
+            make_pptx(pptx_path, pages=3, images=2, tables=2)
+
+            # Merged cells and line breaks exercise the trickier python-docx text rules
+            document = docx.Document(docx_path)
+            table = document.add_table(rows=3, cols=3)
+            table.cell(0, 0).merge(table.cell(0, 1))
+            table.cell(1, 2).merge(table.cell(2, 2)).text = "merged"
+            document.add_paragraph("line").add_run().add_break()
+            document.save(docx_path)
+
+            for path in ("data/sample.docx", "data/sample.pptx", docx_path, pptx_path):
+                self.assertEqual(compare_engines(path), [], path)
+
+            with DataExtractor(PPTLoader(pptx_path, engine="fast")) as extractor:
+                records = list(extractor.iter_pages())
+                self.assertEqual([record.index for record in records], [0, 1, 2])
+                self.assertEqual(records[0].links, ["https://example.com"])
+
+    def test_page_range_and_field_mask_skip_unrequested_work(self):
+        """Test that only the requested pages and fields are extracted, for every format and both storages"""
+        with tempfile.TemporaryDirectory() as work_dir:
+            pdf_path = os.path.join(work_dir, "synthetic.pdf")
+            pptx_path = os.path.join(work_dir, "synthetic.pptx")
+            make_synthetic_pdf(pdf_path, pages=5, images=5, tables=0)
+            make_pptx(pptx_path, pages=4, images=2, tables=1)
+
+            with DataExtractor(PDFLoader(pdf_path)) as extractor:
+                with unittest.mock.patch.object(fitz.Document, "extract_image") as extract_image:
+                    result = extractor.extract_all(pages=range(2), fields=["text", "links"])
+                    records = list(extractor.iter_pages(pages=[3], fields=["text"]))
+                extract_image.assert_not_called()
+                self.assertEqual(result.images, [])
+                self.assertEqual(result.text, extractor.extract_text(pages=range(2)))
+                self.assertEqual([record.index for record in records], [3])
+                self.assertIsNone(extractor.extract_all(fields=["links"]).text)
+                self.assertRaises(ValueError, extractor.extract_all, fields=["pictures"])
+
+            for engine in ("python-pptx", "fast"):
+                with DataExtractor(PPTLoader(pptx_path, engine=engine)) as extractor:
+                    full = list(extractor.iter_pages())
+                    links = list(extractor.iter_pages(pages=range(1, 3), fields=["links"]))
+                    self.assertEqual([record.index for record in links], [1, 2], engine)
+                    self.assertEqual([record.links for record in links], [record.links for record in full[1:3]])
+                    self.assertEqual(sum(len(record.images) + len(record.tables) for record in links), 0)
+
+            output_dir = os.path.join(work_dir, "output")
+            extractor = DataExtractor(PDFLoader(pdf_path))
+            self.assertTrue(FileStorage(extractor, output_dir).save_data(pages=[0], fields=["text"]))
+            self.assertEqual(sorted(os.listdir(output_dir)), ["extracted_text.txt", "images"])
+            storage = SQLStorage(os.path.join(work_dir, "pages.sqlite"), extractor)
+            self.assertTrue(storage.save(pages=range(2), fields=["text"]))
+            rows = storage.conn.execute("SELECT page FROM text_data ORDER BY page").fetchall()
+            self.assertEqual(rows, [(0,), (1,)])
+            self.assertEqual(storage.conn.execute("SELECT COUNT(*) FROM images").fetchone()[0], 0)
+            storage.close()
+            extractor.close()
+
 
 class TestStorage(unittest.TestCase):
 
@@ -72,8 +352,14 @@ class TestStorage(unittest.TestCase):
         self.pdf_loader = PDFLoader("data/sample.pdf")
         self.extractor = DataExtractor(self.pdf_loader)
 
-        self.file_storage = FileStorage(self.extractor)
-        self.sql_storage = SQLStorage("test_db.sqlite", self.extractor)
+        self.work_dir = tempfile.mkdtemp()
+        self.file_storage = FileStorage(self.extractor, os.path.join(self.work_dir, "output"))
+        self.sql_storage = SQLStorage(os.path.join(self.work_dir, "test_db.sqlite"), self.extractor)
+
+    def tearDown(self):
+        self.sql_storage.close()
+        self.extractor.close()
+        shutil.rmtree(self.work_dir)
 
     def test_file_storage(self):
         """Test if data is correctly stored in a file"""
@@ -85,6 +371,635 @@ class TestStorage(unittest.TestCase):
         result = self.sql_storage.save()
         self.assertTrue(result, "Data should be stored in SQL database successfully")
 
+    def test_stream_storage(self):
+        """Test that page records can be streamed into both storage backends"""
+        with tempfile.TemporaryDirectory() as work_dir:
+            file_storage = FileStorage(self.extractor, work_dir)
+            self.assertTrue(file_storage.save_stream())
+            with open(os.path.join(work_dir, "extracted_text.txt"), encoding="utf-8") as f:
+                self.assertEqual(f.read(), self.extractor.extract_text())
+
+        sql_storage = SQLStorage(":memory:", self.extractor)
+        self.assertTrue(sql_storage.save_stream())
+        sql_storage.close()
+
+        missing = SQLStorage(":memory:", DataExtractor(PDFLoader("missing.pdf")))
+        self.assertFalse(missing.save())
+        self.assertEqual(missing.cursor.execute("SELECT COUNT(*) FROM documents").fetchone()[0], 0)
+        missing.close()
+
+    def test_storages_reject_documents_that_fail_to_load(self):
+        """Test that every storage returns False and writes nothing for a document that cannot be loaded"""
+        missing = DataExtractor(PDFLoader(os.path.join(self.work_dir, "missing.pdf")))
+        file_storage = FileStorage(missing, os.path.join(self.work_dir, "missing"))
+        self.assertFalse(file_storage.save_data())
+        self.assertFalse(file_storage.save_stream())
+        self.assertEqual(os.listdir(file_storage.output_folder), ["images"])
+
+        with ShardStorage(os.path.join(self.work_dir, "export"), missing) as shard_storage:
+            self.assertFalse(shard_storage.save_data())
+            self.assertEqual(len(shard_storage), 0)
+
+        sharded = ShardedSQLStorage(os.path.join(self.work_dir, "shards"), shards=2, extractor=missing)
+        self.assertFalse(sharded.save_stream())
+        sharded.close()
+
+    def test_file_storage_writes_pdf_link_urls(self):
+        """Test that PyMuPDF link dictionaries are written out as their URLs"""
+        with tempfile.TemporaryDirectory() as work_dir:
+            pdf_path = os.path.join(work_dir, "links.pdf")
+            make_synthetic_pdf(pdf_path, pages=2, images=0, tables=0)
+            with DataExtractor(PDFLoader(pdf_path)) as extractor:
+                self.assertTrue(FileStorage(extractor, work_dir).save_data())
+            with open(os.path.join(work_dir, "extracted_links.txt"), encoding="utf-8") as f:
+                self.assertEqual(f.read().splitlines(), ["https://example.com"] * 2)
+
+    def test_sql_storage_keeps_documents_apart(self):
+        """Test that rows from different documents are linked to their own document ID"""
+        storage = SQLStorage(":memory:")
+        docx_result = DataExtractor(DOCXLoader("data/sample.docx")).extract_all()
+        ppt_result = DataExtractor(PPTLoader("data/sample.pptx")).extract_all()
+        self.assertTrue(storage.save_results([docx_result, ppt_result]))
+
+        ppt_id = storage.last_document_id
+        rows = storage.cursor.execute("SELECT content FROM tables WHERE document_id = ?", (ppt_id,)).fetchall()
+        self.assertEqual([json.loads(content) for content, in rows], ppt_result.tables)
+        self.assertEqual(storage.cursor.execute("SELECT COUNT(*) FROM documents").fetchone()[0], 2)
+        storage.close()
+
+    def test_images_are_stored_once_by_content(self):
+        """Test that identical images are stored once in both backends, with their real extension"""
+        extractor = DataExtractor(PPTLoader("data/sample.pptx"))
+        images = extractor.extract_images()
+        distinct = len(set(images))
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            file_storage = FileStorage(extractor, work_dir)
+            self.assertTrue(file_storage.save_data())
+            self.assertTrue(file_storage.save_data())
+            stored = [name for _, _, names in os.walk(os.path.join(work_dir, "images")) for name in names]
+            self.assertEqual(len(stored), distinct)
+            self.assertTrue(all(not name.endswith(".bin") for name in stored))
+            with open(os.path.join(work_dir, "extracted_images.txt"), encoding="utf-8") as f:
+                self.assertEqual(len(f.read().splitlines()), len(images))
+
+            # Threads racing to store the same new image each use their own temporary file
+            store = ImageStore(os.path.join(work_dir, "race"))
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                paths = set(pool.map(lambda _: store.put(images[0])[0], range(32)))
+            relative_path, = paths
+            self.assertEqual(os.listdir(os.path.dirname(store.path(relative_path))), [os.path.basename(relative_path)])
+
+        sql_storage = SQLStorage(":memory:", extractor)
+        self.assertTrue(sql_storage.save())
+        self.assertTrue(sql_storage.save())
+        self.assertEqual(sql_storage.cursor.execute("SELECT COUNT(*) FROM image_blobs").fetchone()[0], distinct)
+        self.assertEqual(sql_storage.cursor.execute("SELECT COUNT(*) FROM images").fetchone()[0], 2 * len(images))
+
+        # Blobs another document still uses survive a replace; the last reference takes them along
+        copy = extractor.extract_all()
+        copy.source = "copy.pptx"
+        self.assertTrue(sql_storage.save_result(copy))
+        entry = ManifestEntry("data/sample.pptx", 0, 0, "")
+        self.assertTrue(sql_storage.replace_document(entry, [PageRecord(0, "No images left", [], [], [])]))
+        self.assertEqual(sql_storage.cursor.execute("SELECT COUNT(*) FROM image_blobs").fetchone()[0], distinct)
+        entry = ManifestEntry("copy.pptx", 0, 0, "")
+        self.assertTrue(sql_storage.replace_document(entry, [PageRecord(0, "No images left", [], [], [])]))
+        self.assertEqual(sql_storage.cursor.execute("SELECT COUNT(*) FROM image_blobs").fetchone()[0], 0)
+        sql_storage.close()
+
+    def test_full_text_search_returns_ranked_pages(self):
+        """Test that saved text is searchable at slide level, best match first"""
+        storage = SQLStorage(":memory:", DataExtractor(PPTLoader("data/sample.pptx")))
+        self.assertTrue(storage.save())
+
+        hits = storage.search("lorem")
+        self.assertTrue(hits, "Search should find the sample text")
+        self.assertTrue(all(hit.document_id == storage.last_document_id for hit in hits))
+        self.assertTrue(all(hit.page is not None for hit in hits))
+        self.assertEqual([hit.rank for hit in hits], sorted(hit.rank for hit in hits))
+        self.assertIn("[Lorem]", hits[0].snippet)
+        self.assertEqual(storage.search("nonexistentword"), [])
+
+    def test_sql_reader_reads_back_pages_and_streams_images(self):
+        """Test that stored documents are read back by page, cached, and refreshed after a write"""
+        extractor = DataExtractor(PPTLoader("data/sample.pptx"))
+        pages = list(extractor.iter_pages())
+        with tempfile.TemporaryDirectory() as work_dir:
+            db_path = os.path.join(work_dir, "read.sqlite")
+            storage = SQLStorage(db_path, extractor)
+            self.assertTrue(storage.save())
+            document_id = storage.last_document_id
+
+            with SQLReader(db_path, cache_size=4) as reader:
+                document = reader.document(document_id)
+                self.assertEqual(document.source, "data/sample.pptx")
+                self.assertEqual(document.tables, extractor.extract_tables())
+                self.assertEqual(reader.text(document_id, [1]), pages[1].text)
+                self.assertEqual(reader.text(document_id, range(0, 2)), pages[0].text + "\n" + pages[1].text)
+                self.assertIsNone(reader.document(document_id + 1))
+
+                self.assertIs(reader.document(document_id), document)
+                self.assertEqual(reader.hits, 1)
+                self.assertTrue(storage.save())  # Another connection commits: the cache is dropped
+                self.assertIsNot(reader.document(document_id), document)
+
+                image = reader.images(document_id, [pages[1].index])[0]
+                data = next(img for img in pages[1].images)
+                self.assertEqual(reader.read_image(image), data)
+                self.assertEqual(b"".join(reader.iter_image(image, chunk_size=1000)), data)
+                with reader.open_image(image.hash) as blob:
+                    blob.seek(4)
+                    self.assertEqual(blob.read(4), data[4:8])
+            storage.close()
+
+    def test_sharded_sql_storage_partitions_and_merges(self):
+        """Test that documents spread over shard databases are found through the merged views"""
+        results = [
+            ExtractionResult(f"doc{index}.docx", f"ledger entry {index}", [f"https://example.com/{index}"], [], [])
+            for index in range(12)
+        ]
+        with tempfile.TemporaryDirectory() as work_dir:
+            storage = ShardedSQLStorage(work_dir, shards=3)
+            self.assertTrue(storage.save_results(results))
+            self.assertEqual(storage.document(storage.last_document_id).source, "doc11.docx")
+            self.assertEqual(len([name for name in os.listdir(work_dir) if name.endswith(".sqlite")]), 3)
+
+            conn = storage.attach()
+            shards = conn.execute("SELECT COUNT(DISTINCT shard) FROM documents").fetchone()[0]
+            self.assertEqual(shards, 3)
+            document_id, text = conn.execute(
+                "SELECT d.id, t.content FROM documents d JOIN text_data t ON t.document_id = d.id "
+                "WHERE d.source = 'doc5.docx'"
+            ).fetchone()
+            conn.close()
+            self.assertEqual(text, "ledger entry 5")
+            self.assertEqual(storage.document(document_id).links, ["https://example.com/5"])
+
+            hits = storage.search("ledger", limit=20)
+            self.assertEqual(len(hits), 12)
+            self.assertEqual(len({hit.document_id for hit in hits}), 12)
+
+            # A source always goes to the same shard, so incremental re-ingestion works per shard
+            report = IncrementalIngestor(storage).run("data/sample.docx")
+            self.assertEqual(report.added, ["data/sample.docx"])
+            self.assertEqual(IncrementalIngestor(storage).run("data/sample.docx").unchanged, ["data/sample.docx"])
+
+            # Documents without a source are dealt out evenly, even from several threads
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                picks = list(pool.map(lambda _: storage.shard_for(None), range(30)))
+            self.assertEqual(sorted(picks.count(shard) for shard in range(3)), [10, 10, 10])
+            storage.close()
+
+    def test_shard_storage_appends_compressed_chunks(self):
+        """Test that the shard export reads documents back by ID and in order after reopening and threaded writes"""
+        results = [
+            DataExtractor(DOCXLoader("data/sample.docx")).extract_all(),
+            DataExtractor(PPTLoader("data/sample.pptx")).extract_all(),
+            self.extractor.extract_all(),
+        ]
+        with tempfile.TemporaryDirectory() as work_dir:
+            with ShardStorage(work_dir, chunk_size=2) as storage:
+                self.assertTrue(storage.save_results(results))
+                self.assertEqual(storage.get(2)["text"], results[2].text)  # Still pending
+            with open(os.path.join(work_dir, "shard-00000.jsonl.gz"), "rb") as f:
+                self.assertEqual(f.read(2), b"\x1f\x8b")
+
+            storage = ShardStorage(work_dir, chunk_size=2)
+            self.assertEqual(len(storage.chunks), 2)
+            self.assertTrue(storage.save_result(results[0]))
+            storage.close()
+            reopened = ShardStorage(work_dir)
+            self.assertEqual(len(reopened), 4)
+            self.assertEqual(reopened.get(1)["tables"], results[1].tables)
+            self.assertIsNone(reopened.get(4))
+            self.assertEqual([record["id"] for record in reopened.scan(["id"])], [0, 1, 2, 3])
+            self.assertEqual([record["text"] for record in reopened.scan()], [r.text for r in results + results[:1]])
+            for reference in reopened.get(1)["images"]:
+                self.assertTrue(os.path.exists(reopened.image_path(reference)))
+
+            # Concurrent writers get distinct IDs and every chunk is indexed once
+            with ShardStorage(work_dir, chunk_size=3) as threaded:
+                with ThreadPoolExecutor(max_workers=4) as pool:
+                    list(pool.map(threaded.save_result, results * 10))
+            reopened = ShardStorage(work_dir)
+            self.assertEqual([record["id"] for record in reopened.scan(["id"])], list(range(34)))
+        storage.close()
+
+    def test_sql_storage_moves_legacy_tables_aside(self):
+        """Test that a database using the original schema is upgraded without losing rows"""
+        with tempfile.TemporaryDirectory() as work_dir:
+            db_path = os.path.join(work_dir, "legacy.sqlite")
+            conn = sqlite3.connect(db_path)
+            conn.execute("CREATE TABLE links (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT)")
+            conn.execute("INSERT INTO links (url) VALUES ('https://example.com')")
+            conn.commit()
+            conn.close()
+
+            storage = SQLStorage(db_path)
+            self.assertEqual(storage.cursor.execute("SELECT url FROM links_v0").fetchall(), [("https://example.com",)])
+            self.assertTrue(storage.save_result(DataExtractor(DOCXLoader("data/sample.docx")).extract_all()))
+            storage.close()
+
+
+class TestExtractionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_cache_hit_skips_parsing(self):
+        """Test that a second extractor for the same content is served from the cache"""
+        cache = ExtractionCache(self.cache_dir)
+        expected = DataExtractor(DOCXLoader("data/sample.docx"), cache).extract_all()
+
+        extractor = DataExtractor(DOCXLoader("data/sample.docx"), cache)
+        self.assertEqual(extractor.extract_all(), expected)
+        self.assertFalse(extractor.file_loader.is_loaded, "A cache hit should not parse the document")
+        self.assertEqual(extractor.extract_tables(), expected.tables)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted once the size cap is exceeded"""
+        cache = ExtractionCache(self.cache_dir, max_bytes=2500)
+        cache.put("a", "x" * 1000)
+        cache.put("b", "x" * 1000)
+        cache.get("a")
+        cache.put("c", "x" * 1000)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_shared_cache_dir_counts_other_processes_entries(self):
+        """Test that entries written by another cache on the same directory are served and count towards the cap"""
+        first = ExtractionCache(self.cache_dir, max_bytes=2500)
+        second = ExtractionCache(self.cache_dir, max_bytes=2500)
+        first.put("a", "x" * 1000)
+        second.put("b", "x" * 1000)
+        self.assertIsNotNone(first.get("b"))
+        first.put("c", "x" * 1000)
+
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ["b.pkl", "c.pkl"])
+        self.assertIsNone(second.get("a"))
+
+    def test_concurrent_puts_use_separate_temp_files(self):
+        """Test that threads writing the same entry neither clash nor leave temporary files behind"""
+        cache = ExtractionCache(self.cache_dir)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda i: cache.put("same", "x" * 100000), range(32)))
+
+        self.assertEqual(os.listdir(self.cache_dir), ["same.pkl"])
+        self.assertEqual(cache.get("same"), "x" * 100000)
+        self.assertEqual(cache.total_bytes, os.path.getsize(os.path.join(self.cache_dir, "same.pkl")))
+
+    def test_puts_under_the_cap_skip_the_directory_scan(self):
+        """Test that the cache directory is only rescanned once the running total passes the cap"""
+        cache = ExtractionCache(self.cache_dir, max_bytes=2500)
+        with unittest.mock.patch.object(cache, "_rescan", wraps=cache._rescan) as rescan:
+            cache.put("a", "x" * 1000)
+            cache.put("b", "x" * 1000)
+            self.assertEqual(rescan.call_count, 0)
+            cache.put("c", "x" * 1000)
+            self.assertEqual(rescan.call_count, 1)
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ["b.pkl", "c.pkl"])
+
+
+class TestBatchExtractor(unittest.TestCase):
+
+    def setUp(self):
+        """Copy the sample files plus a corrupt one into a scratch directory"""
+        self.work_dir = tempfile.mkdtemp()
+        for name in ("sample.pdf", "sample.docx", "sample.pptx"):
+            shutil.copy(os.path.join("data", name), self.work_dir)
+        with open(os.path.join(self.work_dir, "broken.pdf"), "wb") as f:
+            f.write(b"not a pdf")
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_batch_reports_failures_without_stopping(self):
+        """Test that a batch saves every good file and reports the bad one"""
+        storage = FileStorage(output_folder=os.path.join(self.work_dir, "out"), per_document=True)
+        report = BatchExtractor(max_workers=2).run(self.work_dir, storage)
+
+        self.assertEqual(len(report.succeeded), 3)
+        self.assertIn(os.path.join(self.work_dir, "broken.pdf"), report.failed)
+        folder = FileStorage.folder_name(os.path.join(self.work_dir, "sample.docx"))
+        self.assertTrue(os.path.exists(os.path.join(self.work_dir, "out", folder, "extracted_text.txt")))
+
+    def test_per_document_folders_keep_same_named_files_apart(self):
+        """Test that files with the same name in different directories are saved to separate folders"""
+        storage = FileStorage(output_folder=os.path.join(self.work_dir, "out"), per_document=True)
+        for name in ("a", "b"):
+            os.makedirs(os.path.join(self.work_dir, name))
+            storage.save_result(ExtractionResult(source=os.path.join(self.work_dir, name, "report.pdf"), text=name))
+
+        folders = sorted(name for name in os.listdir(os.path.join(self.work_dir, "out")) if name != "images")
+        self.assertEqual(len(folders), 2)
+        self.assertTrue(all(folder.startswith("report.pdf-") for folder in folders))
+        texts = set()
+        for folder in folders:
+            with open(os.path.join(self.work_dir, "out", folder, "extracted_text.txt"), encoding="utf-8") as f:
+                texts.add(f.read())
+        self.assertEqual(texts, {"a", "b"})
+
+    def test_async_pipeline_feeds_every_sink(self):
+        """Test that the asyncio pipeline stores each good file in both backends and reports the bad one"""
+        file_storage = FileStorage(output_folder=os.path.join(self.work_dir, "out"), per_document=True)
+        sql_storage = SQLStorage(os.path.join(self.work_dir, "pipeline.sqlite"))
+        pipeline = AsyncPipeline([file_storage, sql_storage], read_concurrency=2, extract_concurrency=2, queue_size=1)
+        report = pipeline.run_sync(self.work_dir)
+
+        self.assertEqual(len(report.succeeded), 3)
+        self.assertIn(os.path.join(self.work_dir, "broken.pdf"), report.failed)
+        self.assertEqual(sql_storage.cursor.execute("SELECT COUNT(*) FROM documents").fetchone()[0], 3)
+        folder = FileStorage.folder_name(os.path.join(self.work_dir, "sample.pptx"))
+        self.assertTrue(os.path.exists(os.path.join(self.work_dir, "out", folder, "extracted_text.txt")))
+        # Results keep their page numbers; only DOCX, which has no pages, is stored with page NULL
+        rows = sql_storage.cursor.execute(
+            "SELECT d.file_type, COUNT(*) - COUNT(t.page) FROM text_data t JOIN documents d ON d.id = t.document_id "
+            "GROUP BY d.file_type"
+        ).fetchall()
+        self.assertEqual(dict(rows), {"docx": 1, "pdf": 0, "pptx": 0})
+        sql_storage.close()
+
+    def test_worker_service_streams_results_from_warm_workers(self):
+        """Test that the worker service extracts paths and uploaded bytes over TCP and a Unix socket"""
+        sql_storage = SQLStorage(os.path.join(self.work_dir, "service.sqlite"))
+        with WorkerService(workers=2, sinks=[sql_storage], port=0) as service:
+            client = WorkerClient(*service.address)
+            self.assertEqual(client.health()["workers"], 2)
+            files = [os.path.join(self.work_dir, name) for name in sorted(os.listdir(self.work_dir))]
+            results = {r["source"]: r for r in client.extract(files, fields=["text", "links"], store=True)}
+            self.assertEqual(set(results), set(files))
+            self.assertIsNotNone(results[os.path.join(self.work_dir, "broken.pdf")]["error"])
+            self.assertEqual(results[os.path.join(self.work_dir, "sample.pdf")]["images"], [])
+
+        with open("data/sample.pptx", "rb") as f:
+            data = f.read()
+        socket_path = os.path.join(self.work_dir, "service.sock")
+        with WorkerService(workers=1, socket_path=socket_path):
+            result = WorkerClient(socket_path=socket_path).extract_data(data, name="upload.pptx", pages=[0])
+        self.assertEqual((result["source"], result["error"]), ("upload.pptx", None))
+        self.assertIn("Presentation Title", result["text"])
+        self.assertEqual(sql_storage.cursor.execute("SELECT COUNT(*) FROM documents").fetchone()[0], 3)
+        sql_storage.close()
+
+    def test_worker_service_survives_worker_death_and_sink_errors(self):
+        """Test that a killed worker is replaced, a failing sink yields an error payload, and the root is enforced"""
+        class FailingSink:
+            def save_result(self, result):
+                raise OSError("disk full")
+
+        pdf_path = os.path.join(self.work_dir, "sample.pdf")
+        with WorkerService(workers=1, sinks=[FailingSink()], port=0, root=self.work_dir) as service:
+            client = WorkerClient(*service.address)
+            os.kill(service._pool.submit(os.getpid).result(), signal.SIGKILL)
+            result, = client.extract([pdf_path], fields=["text"])
+            self.assertIsNone(result["error"])
+            self.assertTrue(result["text"])
+
+            result, = client.extract([pdf_path], fields=["text"], store=True)
+            self.assertEqual(result["error"], "OSError: disk full")
+            with self.assertRaisesRegex(RuntimeError, "403"):
+                list(client.extract([os.path.abspath("data/sample.pdf")]))
+
+    def test_image_pipeline_filters_thumbnails_and_reencodes(self):
+        """Test that tiny images are dropped, large ones shrunk to WebP, and unknown formats kept"""
+        def encode(image, fmt):
+            buffer = io.BytesIO()
+            image.save(buffer, fmt)
+            return buffer.getvalue()
+
+        spacer = encode(Image.new("L", (1, 1)), "GIF")
+        scan = encode(Image.linear_gradient("L").resize((1600, 1200)).convert("RGB"), "JPEG")
+        images = DataExtractor(PPTLoader(os.path.join(self.work_dir, "sample.pptx"))).extract_images()
+        emf = next(image for image in images if image.startswith(b"\x01\x00\x00\x00"))
+
+        with ImagePipeline(min_side=8, max_side=512, output_format="webp", quality=70, workers=2) as pipeline:
+            processed = pipeline.process([spacer, scan, emf])
+            self.assertEqual(len(processed), 2)
+            self.assertEqual(processed[0][8:12], b"WEBP")
+            self.assertEqual(Image.open(io.BytesIO(processed[0])).size, (512, 384))
+            self.assertIs(processed[1], emf)
+            self.assertEqual((pipeline.stats.dropped, pipeline.stats.resized, pipeline.stats.undecodable), (1, 1, 1))
+            self.assertLess(pipeline.stats.bytes_out, pipeline.stats.bytes_in)
+
+            sql_storage = SQLStorage(":memory:")
+            result = ExtractionResult("scan.pdf", "scanned", [], [scan, spacer], [])
+            self.assertTrue(pipeline.wrap(sql_storage).save_result(result))
+            ext, = sql_storage.cursor.execute("SELECT ext FROM image_blobs").fetchone()
+            self.assertEqual(ext, "webp")
+            sql_storage.close()
+
+    def test_governed_extraction_returns_truncated_partial_results(self):
+        """Test that page, image, time, and memory limits stop extraction in every pipeline and keep what was extracted"""
+        pdf_path = os.path.join(self.work_dir, "large.pdf")
+        make_synthetic_pdf(pdf_path, pages=6, images=6, tables=0)
+        with DataExtractor(PDFLoader(pdf_path)) as extractor:
+            full = extractor.extract_all()
+            pages = list(extractor.iter_pages(fields=["text"]))
+
+        result = GovernedExtractor(ExtractionLimits(max_pages=2)).extract(pdf_path)
+        self.assertEqual((result.truncated, result.text), ("max_pages", pages[0].text + "\n" + pages[1].text))
+        # The page after the limit is never parsed
+        original_page_record = PDFHandler.page_record
+
+        def refuse_third_page(handler, page, *args, **kwargs):
+            if page.number >= 2:
+                raise RuntimeError("parsed a page past the limit")
+            return original_page_record(handler, page, *args, **kwargs)
+
+        with unittest.mock.patch.object(PDFHandler, "page_record", refuse_third_page):
+            result = GovernedExtractor(ExtractionLimits(max_pages=2), start_method="fork").extract(pdf_path)
+        self.assertEqual(result.truncated, "max_pages")
+        budget = len(full.images[0]) + len(full.images[1])
+        result = GovernedExtractor(ExtractionLimits(max_image_bytes=budget)).extract(pdf_path)
+        self.assertEqual((result.truncated, result.images, result.text), ("max_image_bytes", full.images[:2], full.text))
+        self.assertIsNone(GovernedExtractor(ExtractionLimits(max_seconds=60)).extract(pdf_path).truncated)
+
+        original = DataExtractor.iter_pages
+
+        def stall_after_first_page(extractor, *args, allocate=0, **kwargs):
+            for record in original(extractor, *args, **kwargs):
+                yield record
+                ballast = b"x" * allocate  # noqa: F841 - resident until the worker is killed
+                time.sleep(60)
+
+        # The forked worker inherits the patched method
+        governed = GovernedExtractor(ExtractionLimits(max_seconds=1, max_rss_mb=2048), start_method="fork")
+        with unittest.mock.patch.object(DataExtractor, "iter_pages", stall_after_first_page):
+            result = governed.extract(pdf_path)
+        self.assertEqual((result.truncated, result.text), ("timeout", pages[0].text))
+
+        hog = functools.partialmethod(stall_after_first_page, allocate=512 * 1024 * 1024)
+        governed = GovernedExtractor(ExtractionLimits(max_seconds=30, max_rss_mb=256), start_method="fork")
+        started = time.monotonic()
+        with unittest.mock.patch.object(DataExtractor, "iter_pages", hog):
+            result = governed.extract(pdf_path)
+        self.assertEqual(result.truncated, "memory")
+        self.assertLess(time.monotonic() - started, 10)
+
+        report = BatchExtractor(max_workers=2, limits=ExtractionLimits(max_pages=1)).run(self.work_dir, SQLStorage(":memory:"))
+        self.assertEqual(report.truncated, {pdf_path: "max_pages", os.path.join(self.work_dir, "sample.pptx"): "max_pages"})
+        self.assertIn("Unrecognized file signature", report.failed[os.path.join(self.work_dir, "broken.pdf")])
+
+        pipeline = AsyncPipeline([SQLStorage(":memory:")], extract_concurrency=2, limits=ExtractionLimits(max_pages=1))
+        self.assertEqual(pipeline.run_sync(self.work_dir).truncated, report.truncated)
+        with WorkerService(workers=2, port=0, limits=ExtractionLimits(max_pages=2)) as service:
+            result, = WorkerClient(*service.address).extract([pdf_path], fields=["text"])
+        self.assertEqual((result["truncated"], result["text"]), ("max_pages", pages[0].text + "\n" + pages[1].text))
+
+
+class TestIncrementalIngestion(unittest.TestCase):
+
+    def test_reingestion_skips_unchanged_files_and_upserts_changed_pages(self):
+        """Test that re-ingestion skips untouched files and re-extracts only the edited PDF page"""
+        with tempfile.TemporaryDirectory() as work_dir:
+            pdf_path = os.path.join(work_dir, "report.pdf")
+            logo = io.BytesIO()
+            Image.new("RGB", (20, 20), "red").save(logo, "PNG")
+            make_pdf(pdf_path, 3, image=logo.getvalue())
+            shutil.copy("data/sample.docx", work_dir)
+            storage = SQLStorage(os.path.join(work_dir, "ingest.sqlite"))
+            ingestor = IncrementalIngestor(storage)
+
+            first = ingestor.run(work_dir)
+            self.assertEqual(len(first.added), 2)
+            second = ingestor.run(work_dir)
+            self.assertEqual(len(second.unchanged), 2)
+            self.assertEqual(second.pages_extracted, 0)
+
+            # Rewrite the PDF with a different second page and a later mtime
+            make_pdf(pdf_path, 3, texts={1: "Page one, edited"}, image=logo.getvalue())
+            os.utime(pdf_path, ns=(os.stat(pdf_path).st_atime_ns, os.stat(pdf_path).st_mtime_ns + 10**9))
+
+            third = ingestor.run(work_dir)
+            self.assertEqual(third.updated, [pdf_path])
+            self.assertEqual(third.pages_extracted, 1)
+
+            rows = storage.cursor.execute(
+                "SELECT t.page, t.content FROM text_data t JOIN documents d ON d.id = t.document_id "
+                "WHERE d.source = ? ORDER BY t.page", (pdf_path,)
+            ).fetchall()
+            self.assertEqual([page for page, _ in rows], [0, 1, 2])
+            self.assertIn("edited", rows[1][1])
+            # The logo first appears on page 0, so the re-extracted page 1 must not store it again
+            images = storage.cursor.execute(
+                "SELECT i.page FROM images i JOIN documents d ON d.id = i.document_id WHERE d.source = ?", (pdf_path,)
+            ).fetchall()
+            self.assertEqual(images, [(0,)])
+            self.assertEqual(storage.cursor.execute("SELECT COUNT(*) FROM documents").fetchone()[0], 2)
+            storage.close()
+
+    def test_reingestion_moves_shared_images_to_their_new_first_page(self):
+        """Test that a shared image stays stored exactly once when the page it first appears on changes"""
+        with tempfile.TemporaryDirectory() as work_dir:
+            pdf_path = os.path.join(work_dir, "report.pdf")
+            logo = io.BytesIO()
+            Image.new("RGB", (20, 20), "red").save(logo, "PNG")
+            storage = SQLStorage(os.path.join(work_dir, "ingest.sqlite"))
+            ingestor = IncrementalIngestor(storage)
+
+            def reingest(image_pages):
+                make_pdf(pdf_path, 3, texts={0: f"Logo on {image_pages}"}, image=logo.getvalue(), image_pages=image_pages)
+                stat = os.stat(pdf_path)
+                os.utime(pdf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9 * len(image_pages)))
+                ingestor.run([pdf_path])
+                images = storage.cursor.execute("SELECT page FROM images ORDER BY page").fetchall()
+                blobs = storage.cursor.execute("SELECT COUNT(*) FROM image_blobs").fetchone()[0]
+                return images, blobs
+
+            self.assertEqual(reingest([0, 1, 2]), ([(0,)], 1))
+            # Page 0 stops drawing the logo, so unchanged page 1 now holds it
+            self.assertEqual(reingest([1, 2]), ([(1,)], 1))
+            # Page 0 draws it again, so page 1 must give it up
+            self.assertEqual(reingest([0, 1, 2]), ([(0,)], 1))
+            storage.close()
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.memory = metrics.add_sink(InMemorySink())
+        self.prometheus = metrics.add_sink(PrometheusSink())
+        self.jsonl_path = os.path.join(self.work_dir, "metrics.jsonl")
+        self.jsonl = metrics.add_sink(JSONLinesSink(self.jsonl_path))
+
+    def tearDown(self):
+        for sink in (self.memory, self.prometheus, self.jsonl):
+            metrics.remove_sink(sink)
+        metrics.profiler = None
+        shutil.rmtree(self.work_dir)
+
+    def test_sinks_record_loads_extraction_and_storage(self):
+        """Test that timings, item counts, and byte counts reach every sink"""
+        extractor = DataExtractor(DOCXLoader("data/sample.docx"))
+        images = extractor.extract_images()
+        storage = SQLStorage(":memory:", extractor)
+        storage.save()
+        storage.close()
+
+        totals = self.memory.snapshot()
+        self.assertEqual(totals[("load_file", "docx")]["bytes"], os.path.getsize("data/sample.docx"))
+        self.assertEqual(totals[("extract_images", "docx")]["items"], len(images))
+        self.assertEqual(totals[("extract_images", "docx")]["bytes"], sum(len(img) for img in images))
+        self.assertEqual(totals[("sql_storage.insert_page", "docx")]["calls"], 1)
+
+        self.assertIn('docextract_operation_calls_total{operation="extract_images",doc_type="docx"} 1',
+                      self.prometheus.render())
+        with open(self.jsonl_path, encoding="utf-8") as f:
+            operations = [json.loads(line)["operation"] for line in f]
+        self.assertIn("sql_storage.save_stream", operations)
+
+    def test_profiling_hook_profiles_sampled_calls(self):
+        """Test that sampled calls are written as cProfile dumps with their peak allocation"""
+        metrics.profiler = ProfilingHook(self.work_dir, sample_rate=1.0, use_tracemalloc=True)
+        DataExtractor(PPTLoader("data/sample.pptx")).extract_all()
+
+        self.assertEqual(len(metrics.profiler.profiles), 1)
+        self.assertTrue(os.path.exists(metrics.profiler.profiles[0]))
+        with open(self.jsonl_path, encoding="utf-8") as f:
+            events = [json.loads(line) for line in f]
+        extract_event = next(event for event in events if event["operation"] == "extract_all")
+        self.assertGreater(extract_event["peak_alloc_bytes"], 0)
+
+        # Streaming calls are profiled too, over the whole iteration
+        records = list(DataExtractor(PDFLoader("data/sample.pdf")).iter_pages())
+        self.assertEqual(len(metrics.profiler.profiles), 2)
+        totals = self.memory.snapshot()[("iter_pages", "pdf")]
+        self.assertEqual((totals["calls"], totals["items"]), (1, len(records)))
+
+    def test_delegating_extract_methods_report_one_call(self):
+        """Test that extract_text(pages) is counted once, not also as extract_all"""
+        DataExtractor(PDFLoader("data/sample.pdf")).extract_text(pages=[0])
+        totals = self.memory.snapshot()
+        self.assertEqual(totals[("extract_text", "pdf")]["calls"], 1)
+        self.assertNotIn(("extract_all", "pdf"), totals)
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_benchmark_report(self):
+        """Test that a tiny benchmark run times every stage and compares cleanly against itself"""
+        report = run_benchmarks(pages=2, images=1, tables=1, repeat=1, formats=["pdf", "docx", "pptx"])
+        for fmt in ("pdf", "docx", "pptx"):
+            for stage in ("load", "extract_all", "file_storage", "sql_storage"):
+                self.assertIn("p99_ms", report["results"][f"{fmt}.{stage}"])
+            # Measured per stage, not the process's ever-growing high-water mark
+            self.assertGreater(report["results"][f"{fmt}.extract_all"]["peak_alloc_kb"], 0)
+        self.assertEqual(compare(report, report, tolerance=0.0), [])
+
+    def test_import_time_budget(self):
+        """Test that entry modules import no format library and stay within the import-time budget"""
+        report = best_of(3)
+        self.assertEqual(report.heavy, [], "Format libraries should only be imported when first used")
+        self.assertLessEqual(report.total_ms, IMPORT_BUDGET_MS, report.slowest(5))
+
 
 if __name__ == "__main__":
     unittest.main()